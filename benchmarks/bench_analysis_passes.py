@@ -0,0 +1,421 @@
+"""
+分析汇总扫描次数基准测试：各自扫描 vs 共享汇总
+====================================
+
+改造前 basic_statistics、exploratory_analysis、generate_summary_report 各自对完整数据调用
+describe / value_counts / groupby / mean / median / min / max / std / corr 和绘图函数，同一列被反复扫描；
+现在由 AnalysisSummary.from_frames 一次计算全部统计量，三者都只读取汇总结果。
+
+本脚本用合成数据（见 bench_storage.synthetic_day_frames）分别运行两种实现，统计“对完整数据的扫描次数”：
+调用 pandas Series/DataFrame 的聚合方法、np.unique 或 matplotlib 绘图函数时，若输入行数等于数据集行数则计一次
+（嵌套调用只计最外层，例如 describe 内部对每列的 count/mean/std/min/quantile/max 各计一次）。
+同时报告耗时（默认含四张图的绘制），并校验两种实现的报告文件和基础统计输出一致。
+
+使用方法:
+    python benchmarks/bench_analysis_passes.py                 # 1M 行
+    python benchmarks/bench_analysis_passes.py --rows 200000 --breakdown
+    python benchmarks/bench_analysis_passes.py --no-charts     # 只比较统计和报告
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.axes import Axes
+
+import config
+from bench_feature_engineering import load_analysis
+from bench_storage import synthetic_day_frames
+
+SERIES_METHODS = ['mean', 'median', 'min', 'max', 'std', 'sum', 'count', 'quantile', 'value_counts', 'nunique',
+                  'unique', 'isnull', 'isna', 'dropna', 'groupby', 'corr']
+FRAME_METHODS = ['isnull', 'isna', 'corr', 'groupby', 'to_numpy']
+AXES_METHODS = ['hist', 'boxplot', 'bxp', 'scatter']
+
+
+class PassCounter:
+    """统计对完整数据（长度等于 rows）的扫描次数，按操作名分类"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.counts = Counter()
+        self.depth = 0
+        self.patched = []
+
+    def _wrap(self, owner, name, label, size):
+        original = getattr(owner, name)
+        counter = self
+
+        def wrapper(*args, **kwargs):
+            if counter.depth == 0 and size(args) == counter.rows:
+                counter.counts[label] += 1
+            counter.depth += 1
+            try:
+                return original(*args, **kwargs)
+            finally:
+                counter.depth -= 1
+
+        self.patched.append((owner, name, original))
+        setattr(owner, name, wrapper)
+
+    def __enter__(self):
+        for name in SERIES_METHODS:
+            self._wrap(pd.Series, name, f'Series.{name}', lambda args: len(args[0]))
+        for name in FRAME_METHODS:
+            self._wrap(pd.DataFrame, name, f'DataFrame.{name}', lambda args: len(args[0]))
+        for name in AXES_METHODS:
+            self._wrap(Axes, name, f'Axes.{name}', lambda args: len(args[1]) if len(args) > 1 else 0)
+        self._wrap(np, 'unique', 'np.unique', lambda args: len(args[0]))
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, original in reversed(self.patched):
+            setattr(owner, name, original)
+        self.patched = []
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+def legacy_basic_statistics(df):
+    """改造前的 basic_statistics"""
+    print("\n" + "="*80)
+    print("基础统计信息")
+    print("="*80)
+
+    print("\n数据类型:")
+    print(df.dtypes)
+
+    print("\n缺失值统计:")
+    print(df.isnull().sum())
+
+    print("\n数值型字段统计:")
+    print(df.describe())
+
+    print("\n分类字段统计:")
+    categorical_cols = ['航司', '类型', '中转地']
+    for col in categorical_cols:
+        if col in df.columns:
+            print(f"\n{col} 分布:")
+            print(df[col].value_counts().head(10))
+
+
+def legacy_exploratory_analysis(df, df_featured, output_dir):
+    """改造前的 exploratory_analysis（输出目录改为参数）"""
+    print("\n" + "="*80)
+    print("探索性数据分析")
+    print("="*80)
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # 1. 价格分布分析
+    print("\n[1] 价格分布分析...")
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+
+    # 价格直方图
+    axes[0, 0].hist(df['价格'], bins=30, edgecolor='black', alpha=0.7)
+    axes[0, 0].set_title('价格分布直方图')
+    axes[0, 0].set_xlabel('价格 (元)')
+    axes[0, 0].set_ylabel('频数')
+
+    # 价格箱线图
+    axes[0, 1].boxplot(df['价格'])
+    axes[0, 1].set_title('价格箱线图')
+    axes[0, 1].set_ylabel('价格 (元)')
+
+    # 按航司的价格分布
+    airline_prices = df.groupby('航司')['价格'].mean().sort_values(ascending=False).head(10)
+    axes[1, 0].barh(range(len(airline_prices)), airline_prices.values)
+    axes[1, 0].set_yticks(range(len(airline_prices)))
+    axes[1, 0].set_yticklabels(airline_prices.index)
+    axes[1, 0].set_title('各航司平均价格')
+    axes[1, 0].set_xlabel('平均价格 (元)')
+
+    # 提前天数 vs 价格
+    axes[1, 1].scatter(df['提前天数'], df['价格'], alpha=0.5)
+    axes[1, 1].set_title('提前天数 vs 价格')
+    axes[1, 1].set_xlabel('提前天数')
+    axes[1, 1].set_ylabel('价格 (元)')
+
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/price_analysis.png', dpi=300, bbox_inches='tight')
+    print(f"保存: {output_dir}/price_analysis.png")
+    plt.close()
+
+    # 2. 时间特征分析
+    print("[2] 时间特征分析...")
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+
+    # 起飞时段分布
+    if '起飞时段' in df_featured.columns:
+        df_featured['起飞时段'].value_counts().plot(kind='bar', ax=axes[0, 0])
+        axes[0, 0].set_title('起飞时段分布')
+        axes[0, 0].set_xlabel('起飞时段')
+        axes[0, 0].set_ylabel('航班数')
+        axes[0, 0].tick_params(axis='x', rotation=45)
+
+    # 飞行时长分布
+    if '飞行时长_分钟' in df_featured.columns:
+        axes[0, 1].hist(df_featured['飞行时长_分钟'], bins=30, edgecolor='black', alpha=0.7)
+        axes[0, 1].set_title('飞行时长分布')
+        axes[0, 1].set_xlabel('飞行时长 (分钟)')
+        axes[0, 1].set_ylabel('频数')
+
+    # 中转次数分布
+    if '中转次数' in df_featured.columns:
+        df_featured['中转次数'].value_counts().sort_index().plot(kind='bar', ax=axes[1, 0])
+        axes[1, 0].set_title('中转次数分布')
+        axes[1, 0].set_xlabel('中转次数')
+        axes[1, 0].set_ylabel('航班数')
+        axes[1, 0].tick_params(axis='x', rotation=0)
+
+    # 剩余座位分布
+    axes[1, 1].hist(df['剩余座位'], bins=20, edgecolor='black', alpha=0.7)
+    axes[1, 1].set_title('剩余座位分布')
+    axes[1, 1].set_xlabel('剩余座位数')
+    axes[1, 1].set_ylabel('频数')
+
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/time_analysis.png', dpi=300, bbox_inches='tight')
+    print(f"保存: {output_dir}/time_analysis.png")
+    plt.close()
+
+    # 3. 相关性分析
+    print("[3] 相关性分析...")
+    numerical_cols = ['提前天数', '剩余座位', '价格', '飞行时长_分钟', '中转时长_分钟', '中转次数', '性价比']
+    numerical_cols = [col for col in numerical_cols if col in df_featured.columns]
+
+    if len(numerical_cols) > 1:
+        correlation_matrix = df_featured[numerical_cols].corr()
+
+        plt.figure(figsize=(10, 8))
+        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
+                    square=True, linewidths=1, cbar_kws={"shrink": 0.8})
+        plt.title('特征相关性热力图')
+        plt.tight_layout()
+        plt.savefig(f'{output_dir}/correlation_heatmap.png', dpi=300, bbox_inches='tight')
+        print(f"保存: {output_dir}/correlation_heatmap.png")
+        plt.close()
+
+    # 4. 综合分析图
+    print("[4] 生成综合分析图...")
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+
+    # 航司市场份额
+    if '航司' in df.columns:
+        df['航司'].value_counts().head(10).plot(kind='pie', ax=axes[0, 0], autopct='%1.1f%%')
+        axes[0, 0].set_title('航司市场份额 (前10)')
+        axes[0, 0].set_ylabel('')
+
+    # 价格区间分布
+    if '价格区间' in df_featured.columns:
+        df_featured['价格区间'].value_counts().plot(kind='bar', ax=axes[0, 1])
+        axes[0, 1].set_title('价格区间分布')
+        axes[0, 1].set_xlabel('价格区间')
+        axes[0, 1].set_ylabel('航班数')
+        axes[0, 1].tick_params(axis='x', rotation=45)
+
+    # 座位状态分布
+    if '座位状态' in df_featured.columns:
+        df_featured['座位状态'].value_counts().plot(kind='bar', ax=axes[1, 0])
+        axes[1, 0].set_title('座位状态分布')
+        axes[1, 0].set_xlabel('座位状态')
+        axes[1, 0].set_ylabel('航班数')
+        axes[1, 0].tick_params(axis='x', rotation=45)
+
+    # 效率评分分布
+    if '效率评分' in df_featured.columns:
+        axes[1, 1].hist(df_featured['效率评分'], bins=30, edgecolor='black', alpha=0.7)
+        axes[1, 1].set_title('效率评分分布')
+        axes[1, 1].set_xlabel('效率评分')
+        axes[1, 1].set_ylabel('频数')
+
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/comprehensive_analysis.png', dpi=300, bbox_inches='tight')
+    print(f"保存: {output_dir}/comprehensive_analysis.png")
+    plt.close()
+
+    return output_dir
+
+
+def legacy_generate_summary_report(df, df_featured, output_dir):
+    """改造前的 generate_summary_report"""
+    print("\n" + "="*80)
+    print("生成分析报告")
+    print("="*80)
+
+    report_path = f'{output_dir}/analysis_report.txt'
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write("="*80 + "\n")
+        f.write("航班数据分析报告\n")
+        f.write("="*80 + "\n\n")
+
+        # 1. 数据概览
+        f.write("一、数据概览\n")
+        f.write("-"*80 + "\n")
+        f.write(f"数据集大小: {df.shape[0]} 行 x {df.shape[1]} 列\n")
+        f.write(f"数据采集时间范围: {df['采集日期'].min()} 至 {df['采集日期'].max()}\n")
+        f.write(f"航班起飞时间范围: {df['起飞日期'].min()} 至 {df['起飞日期'].max()}\n\n")
+
+        # 2. 价格分析
+        f.write("二、价格分析\n")
+        f.write("-"*80 + "\n")
+        f.write(f"平均价格: {df['价格'].mean():.2f} 元\n")
+        f.write(f"价格中位数: {df['价格'].median():.2f} 元\n")
+        f.write(f"最低价格: {df['价格'].min():.2f} 元\n")
+        f.write(f"最高价格: {df['价格'].max():.2f} 元\n")
+        f.write(f"价格标准差: {df['价格'].std():.2f} 元\n\n")
+
+        # 3. 航司分析
+        f.write("三、航司分析\n")
+        f.write("-"*80 + "\n")
+        f.write(f"航司数量: {df['航司'].nunique()}\n")
+        f.write(f"\n航司航班数量排名 (前5):\n")
+        for i, (airline, count) in enumerate(df['航司'].value_counts().head(5).items(), 1):
+            f.write(f"  {i}. {airline}: {count} 个航班\n")
+        f.write(f"\n航司平均价格排名 (前5):\n")
+        for i, (airline, price) in enumerate(df.groupby('航司')['价格'].mean().sort_values(ascending=False).head(5).items(), 1):
+            f.write(f"  {i}. {airline}: {price:.2f} 元\n\n")
+
+        # 4. 时间特征分析
+        if '飞行时长_分钟' in df_featured.columns:
+            f.write("四、时间特征分析\n")
+            f.write("-"*80 + "\n")
+            f.write(f"平均飞行时长: {df_featured['飞行时长_分钟'].mean()/60:.2f} 小时\n")
+            f.write(f"最短飞行时长: {df_featured['飞行时长_分钟'].min()/60:.2f} 小时\n")
+            f.write(f"最长飞行时长: {df_featured['飞行时长_分钟'].max()/60:.2f} 小时\n\n")
+
+        # 5. 中转分析
+        if '中转次数' in df_featured.columns:
+            f.write("五、中转分析\n")
+            f.write("-"*80 + "\n")
+            f.write(f"中转航班占比: {(df_featured['中转次数'] > 0).sum() / len(df) * 100:.2f}%\n")
+            f.write(f"\n中转次数分布:\n")
+            for transfer_count, count in df_featured['中转次数'].value_counts().sort_index().items():
+                f.write(f"  {transfer_count} 次中转: {count} 个航班 ({count/len(df)*100:.2f}%)\n")
+            f.write("\n")
+
+        # 6. 座位分析
+        f.write("六、座位分析\n")
+        f.write("-"*80 + "\n")
+        f.write(f"平均剩余座位: {df['剩余座位'].mean():.2f}\n")
+        f.write(f"最少剩余座位: {df['剩余座位'].min()}\n")
+        f.write(f"最多剩余座位: {df['剩余座位'].max()}\n")
+        if '座位状态' in df_featured.columns:
+            f.write(f"\n座位状态分布:\n")
+            for status, count in df_featured['座位状态'].value_counts().items():
+                f.write(f"  {status}: {count} 个航班 ({count/len(df)*100:.2f}%)\n")
+        f.write("\n")
+
+        # 7. 提前预订分析
+        f.write("七、提前预订分析\n")
+        f.write("-"*80 + "\n")
+        f.write(f"平均提前天数: {df['提前天数'].mean():.2f} 天\n")
+        f.write(f"最短提前天数: {df['提前天数'].min()} 天\n")
+        f.write(f"最长提前天数: {df['提前天数'].max()} 天\n\n")
+
+        # 8. 提取的特征列表
+        f.write("八、特征工程总结\n")
+        f.write("-"*80 + "\n")
+        f.write(f"原始特征数量: {len(df.columns)}\n")
+        f.write(f"新增特征数量: {len(df_featured.columns) - len(df.columns)}\n")
+        f.write(f"总特征数量: {len(df_featured.columns)}\n\n")
+        f.write("新增特征列表:\n")
+        new_features = set(df_featured.columns) - set(df.columns)
+        for i, feature in enumerate(sorted(new_features), 1):
+            f.write(f"  {i}. {feature}\n")
+
+        f.write("\n" + "="*80 + "\n")
+        f.write("报告生成完毕\n")
+        f.write("="*80 + "\n")
+
+    print(f"分析报告已保存: {report_path}")
+    return report_path
+
+
+def run_legacy(df, df_featured, output_dir, charts):
+    legacy_basic_statistics(df)
+    if charts:
+        legacy_exploratory_analysis(df, df_featured, output_dir)
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+    return legacy_generate_summary_report(df, df_featured, output_dir)
+
+
+def run_shared(analysis, df, df_featured, output_dir, charts):
+    summary = analysis.AnalysisSummary.from_frames(df, df_featured)
+    analysis.basic_statistics(summary)
+    if charts:
+        analysis.exploratory_analysis(summary, output_dir)
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+    return analysis.generate_summary_report(summary, output_dir)
+
+
+def measure(fn, rows):
+    stdout = io.StringIO()
+    with PassCounter(rows) as counter, contextlib.redirect_stdout(stdout):
+        start = time.perf_counter()
+        report = fn()
+        seconds = time.perf_counter() - start
+    with open(report, encoding='utf-8') as f:
+        text = f.read()
+    value = stdout.getvalue()
+    basic = value[value.index('基础统计信息'):value.index('分类字段统计')]
+    return counter, seconds, text, basic
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分析汇总扫描次数基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='数据行数')
+    parser.add_argument('--breakdown', action='store_true', help='列出每种操作的扫描次数')
+    parser.add_argument('--no-charts', action='store_true', help='不绘图，只比较统计和报告')
+    args = parser.parse_args()
+
+    # 在当前进程中绘图，绘图调用才能被计数
+    config.CHART_WORKERS = 1
+    analysis = load_analysis()
+    df = pd.concat(synthetic_day_frames(args.rows), ignore_index=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_featured = analysis.feature_engineering(df)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        charts = not args.no_charts
+        legacy = measure(lambda: run_legacy(df, df_featured, os.path.join(work_dir, 'legacy'), charts), args.rows)
+        shared = measure(lambda: run_shared(analysis, df, df_featured, os.path.join(work_dir, 'shared'), charts),
+                         args.rows)
+
+    print("\n" + "=" * 72)
+    print(f"{args.rows:,} 行：基础统计{'' if args.no_charts else ' + 四张图'} + 文本报告")
+    print("=" * 72)
+    print(f"{'':12s} {'扫描次数':>8s} {'耗时':>10s}")
+    print(f"{'各自扫描':10s} {legacy[0].total:>10d} {legacy[1]:8.2f} 秒")
+    print(f"{'共享汇总':10s} {shared[0].total:>10d} {shared[1]:8.2f} 秒")
+    print(f"报告一致: {'✅' if legacy[2] == shared[2] else '❌'}   基础统计输出一致: "
+          f"{'✅' if legacy[3] == shared[3] else '❌'}")
+    if args.breakdown:
+        for title, (counter, *_rest) in (('各自扫描', legacy), ('共享汇总', shared)):
+            print(f"\n{title}:")
+            for label, count in counter.counts.most_common():
+                print(f"  {label:24s} {count:>4d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+批量预测基准测试：逐行 predict vs 整列编码的 predict_batch
+====================================
+
+用分析器的特征工程把合成原始数据（见 bench_storage.synthetic_day_frames）生成特征数据，
+按预测器的方式（read_flight_csv，分类特征为 category）读回后训练随机森林，然后对比：
+
+- 改造前：iterrows() 逐行构造单行 DataFrame、逐行 LabelEncoder.transform、逐行 model.predict
+- 改造后：predict_batch 按块查表编码整列，每块调用一次 model.predict
+
+改造前的实现逐行调用模型，大数据量下要运行数小时，因此只在前 --legacy-rows 行上计时一次，
+吞吐量按行数外推；并校验这些行上两种实现的预测值相同。
+
+使用方法:
+    python benchmarks/bench_batch_predict.py                         # 1k / 100k / 1M 行
+    python benchmarks/bench_batch_predict.py --rows 1000 100000 --legacy-rows 500
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from bench_feature_engineering import load_analysis
+from bench_storage import synthetic_day_frames
+
+
+def load_predictor():
+    spec = importlib.util.spec_from_file_location(
+        'predictor', os.path.join(PROJECT_ROOT, 'src', 'predictors', '2_predictor.py'))
+    predictor = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = predictor
+    spec.loader.exec_module(predictor)
+    return predictor
+
+
+def featured_data(rows, work_dir, predictor_module):
+    """生成 rows 行特征数据，写出模型用到的列后按预测器的方式读回"""
+    analysis = load_analysis()
+    df = pd.concat(synthetic_day_frames(rows), ignore_index=True).iloc[:rows]
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_featured = analysis.feature_engineering(df)
+    columns = predictor_module.NUMERICAL_FEATURES + predictor_module.CATEGORICAL_FEATURES + ['价格']
+    path = os.path.join(work_dir, 'featured.csv')
+    df_featured[columns].to_csv(path, index=False, encoding='utf-8-sig')
+    with contextlib.redirect_stdout(io.StringIO()):
+        return predictor_module.FlightPricePredictor().load_data(path)
+
+
+def train_model(predictor_module, df):
+    with contextlib.redirect_stdout(io.StringIO()):
+        predictor = predictor_module.FlightPricePredictor()
+        X, y = predictor.prepare_features(df)
+        predictor.train(X, y)
+    return predictor
+
+
+def legacy_predict(predictor, input_data):
+    """改造前的 FlightPricePredictor.predict"""
+    if isinstance(input_data, dict):
+        input_df = pd.DataFrame([input_data])
+    else:
+        input_df = input_data.copy()
+
+    for col in predictor.feature_columns:
+        if col not in input_df.columns:
+            input_df[col] = 0
+
+    X = input_df[predictor.feature_columns]
+
+    for col, encoder in predictor.label_encoders.items():
+        if col in X.columns:
+            if X[col].dtype == 'object':
+                unique_values = set(X[col].unique())
+                known_values = set(encoder.classes_)
+                unknown_values = unique_values - known_values
+
+                if unknown_values:
+                    most_common = encoder.classes_[0]
+                    X[col] = X[col].apply(lambda x: most_common if x not in known_values else x)
+
+            X[col] = encoder.transform(X[col].astype(str))
+
+    prediction = predictor.model.predict(X)
+
+    return prediction[0]
+
+
+def legacy_predict_batch(predictor, input_data):
+    """改造前的 FlightPricePredictor.predict_batch"""
+    predictions = []
+    for idx, row in input_data.iterrows():
+        pred = legacy_predict(predictor, row.to_dict())
+        predictions.append(pred)
+    return np.array(predictions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量预测基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 100_000, 1_000_000], help='预测行数')
+    parser.add_argument('--train-rows', type=int, default=50_000, help='训练数据行数')
+    parser.add_argument('--legacy-rows', type=int, default=1_000, help='改造前实现最多计时的行数')
+    args = parser.parse_args()
+
+    predictor_module = load_predictor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        df = featured_data(max(max(args.rows), args.train_rows), work_dir, predictor_module)
+    start = time.perf_counter()
+    predictor = train_model(predictor_module, df.iloc[:args.train_rows])
+    print(f"\n训练 {args.train_rows:,} 行: {time.perf_counter() - start:.1f} 秒，"
+          f"{len(predictor.model.estimators_)} 棵树，CPU 核数 {os.cpu_count()}")
+    features = df.drop(columns=['价格'])
+    legacy_data = features.iloc[:args.legacy_rows]
+    start = time.perf_counter()
+    expected = legacy_predict_batch(predictor, legacy_data)
+    legacy_rate = len(legacy_data) / (time.perf_counter() - start)
+
+    print("\n" + "=" * 100)
+    print(f"{'行数':>10s} {'改造前':>18s} {'改造后':>18s} {'加速':>10s}   预测值一致")
+    print("=" * 100)
+    for rows in args.rows:
+        data = features.iloc[:rows]
+        start = time.perf_counter()
+        predictions = predictor.predict_batch(data)
+        batch_rate = rows / (time.perf_counter() - start)
+
+        checked = min(rows, len(expected))
+        diff = np.abs(predictions[:checked] - expected[:checked]).max()
+        estimated = '*' if rows > len(legacy_data) else ''
+        print(f"{rows:>12,} {legacy_rate:>12,.0f} 行/秒{estimated:1s} {batch_rate:>12,.0f} 行/秒 "
+              f"{batch_rate / legacy_rate:>9,.0f}x   {'✅' if diff == 0 else '❌'} (最大差 {diff:.3g})",
+              flush=True)
+    print(f"\n* 改造前的实现只在前 {args.legacy_rows:,} 行上计时")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+分析图表渲染基准测试：依次绘制 vs 进程池并行 vs 缓存命中
+====================================
+
+用合成数据（见 bench_storage.synthetic_day_frames）生成汇总统计量后，分别：
+
+- 冷启动、在当前进程中依次绘制四张图（workers=1，与改造前相同）
+- 冷启动、进程池并行绘制（--workers 中的每个进程数）
+- 输入未变化时再次运行（全部命中 figure_cache.json，不重新绘制）
+
+报告总耗时和每张图的渲染耗时，并校验并行绘制的图片与依次绘制的逐字节相同。
+注意并行加速取决于 CPU 核数；单核机器上进程池只会增加开销。
+
+使用方法:
+    python benchmarks/bench_chart_rendering.py                       # 1M 行，2 / 4 进程
+    python benchmarks/bench_chart_rendering.py --rows 60000 --workers 4
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from bench_feature_engineering import load_analysis
+from bench_storage import synthetic_day_frames
+from src.utils.analysis_figures import FIGURES, render_figures
+
+
+def image_digests(output_dir):
+    digests = {}
+    for name, _ in FIGURES:
+        with open(os.path.join(output_dir, name), 'rb') as f:
+            digests[name] = hashlib.sha256(f.read()).hexdigest()
+    return digests
+
+
+def timed_render(summary, output_dir, dpi, workers):
+    start = time.perf_counter()
+    results = render_figures(summary, output_dir, dpi=dpi, workers=workers)
+    return results, time.perf_counter() - start
+
+
+def describe(results):
+    return '  '.join(f"{name.split('_')[0]} {'缓存' if status == 'cached' else f'{seconds:.2f}s'}"
+                     for name, status, seconds in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分析图表渲染基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='数据行数')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4], help='并行绘图进程数')
+    parser.add_argument('--dpi', type=int, default=300, help='图片分辨率')
+    args = parser.parse_args()
+
+    analysis = load_analysis()
+    df = pd.concat(synthetic_day_frames(args.rows), ignore_index=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_featured = analysis.feature_engineering(df)
+    summary = analysis.AnalysisSummary.from_frames(df, df_featured)
+    del df, df_featured
+
+    print("\n" + "=" * 100)
+    print(f"{args.rows:,} 行，dpi={args.dpi}，CPU 核数 {os.cpu_count()}")
+    print("=" * 100)
+    with tempfile.TemporaryDirectory() as work_dir:
+        serial_dir = os.path.join(work_dir, 'serial')
+        results, serial_s = timed_render(summary, serial_dir, args.dpi, 1)
+        print(f"{'依次绘制':12s} {serial_s:7.2f} 秒   {describe(results)}")
+        expected = image_digests(serial_dir)
+
+        for workers in args.workers:
+            output_dir = os.path.join(work_dir, f'workers_{workers}')
+            results, seconds = timed_render(summary, output_dir, args.dpi, workers)
+            identical = image_digests(output_dir) == expected
+            print(f"{f'{workers} 进程并行':10s} {seconds:7.2f} 秒   {describe(results)}   "
+                  f"({serial_s / seconds:.2f}x，图片一致: {'✅' if identical else '❌'})")
+
+        results, cached_s = timed_render(summary, serial_dir, args.dpi, 1)
+        print(f"{'输入未变化':10s} {cached_s:7.2f} 秒   {describe(results)}   ({serial_s / cached_s:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
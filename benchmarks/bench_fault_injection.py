@@ -0,0 +1,75 @@
+"""
+故障注入演练：重试、退避与熔断
+====================================
+
+在注入故障的本地模拟 Amadeus 服务上扫描两条航线：
+
+- SZX->YIH: 随机返回 429（带 Retry-After）或 503
+- SZX->PEK: 始终返回 500，用于验证熔断器停止请求该航线
+
+分别以“不重试”和“重试 + 熔断”两种方式运行，比较数据空洞数、请求数和统计计数。
+
+使用方法:
+    python benchmarks/bench_fault_injection.py
+    python benchmarks/bench_fault_injection.py --error-rate 0.5 --error-status 429 --retry-after 0.2
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.collectors.mock_amadeus import MockAmadeusServer
+from src.collectors.rate_limiter import TokenBucket
+from src.collectors.retry import RetryPolicy, CircuitBreaker, ResilientCaller
+from src.collectors.scan_engine import build_target_dates, scan_routes
+
+ROUTES = [('SZX', 'YIH'), ('SZX', 'PEK')]
+
+
+def run_once(args, caller):
+    server = MockAmadeusServer(latency=args.latency, error_rate=args.error_rate,
+                               error_status=args.error_status, retry_after=args.retry_after,
+                               failing_routes={('SZX', 'PEK')}, seed=args.seed)
+    with server:
+        start = time.perf_counter()
+        frames = scan_routes(server.client(), ROUTES, build_target_dates(args.days), '2026-01-01',
+                             mode='concurrent', workers=args.workers,
+                             limiter=TokenBucket(args.rate, 1), caller=caller)
+        elapsed = time.perf_counter() - start
+    holes = {route: args.days - len(dfs) for route, dfs in frames.items()}
+    return elapsed, holes, server.request_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='故障注入演练')
+    parser.add_argument('--error-rate', type=float, default=0.3, help='SZX->YIH 随机失败比例')
+    parser.add_argument('--error-status', type=int, default=503, help='注入的 HTTP 状态码')
+    parser.add_argument('--retry-after', type=float, default=None, help='故障响应附带的 Retry-After 秒数')
+    parser.add_argument('--latency', type=float, default=0.02, help='模拟接口延迟（秒）')
+    parser.add_argument('--workers', type=int, default=8, help='并发请求数')
+    parser.add_argument('--rate', type=float, default=50, help='令牌桶速率（次/秒）')
+    parser.add_argument('--days', type=int, default=30, help='扫描天数')
+    parser.add_argument('--seed', type=int, default=0, help='故障注入随机种子')
+    args = parser.parse_args()
+
+    plain = ResilientCaller(RetryPolicy(max_attempts=1), CircuitBreaker(failure_threshold=10 ** 9))
+    guarded = ResilientCaller(RetryPolicy(max_attempts=5, base_delay=0.05, max_delay=1.0),
+                              CircuitBreaker(failure_threshold=5, cooldown=60.0))
+
+    print("\n" + "=" * 60)
+    print(f"故障比例: {args.error_rate}  状态码: {args.error_status}  Retry-After: {args.retry_after}")
+    print("=" * 60)
+    for name, caller in [('不重试', plain), ('重试 + 熔断', guarded)]:
+        elapsed, holes, requests = run_once(args, caller)
+        print(f"\n[{name}] 耗时 {elapsed:.2f} 秒, 服务端收到 {requests} 个请求")
+        for (origin, destination), missing in holes.items():
+            print(f"  {origin} -> {destination}: 数据空洞 {missing}/{args.days} 天")
+        print(f"  {caller.stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
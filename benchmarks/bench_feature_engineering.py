@@ -0,0 +1,151 @@
+"""
+特征工程基准测试：逐行 .apply vs 向量化
+====================================
+
+用合成原始数据（见 bench_storage.synthetic_day_frames）分别运行改造前的逐行实现
+（get_time_period / parse_duration / seat_category 等逐行 .apply，日期不带格式解析）
+和分析器当前的 feature_engineering，报告每秒处理行数，并校验两者的特征 CSV 逐字节相同。
+
+旧版在大数据量下很慢且内存占用高，超过 --legacy-max-rows 时只运行新版。
+
+使用方法:
+    python benchmarks/bench_feature_engineering.py                       # 100k 和 10M 行
+    python benchmarks/bench_feature_engineering.py --rows 1000000 --legacy-max-rows 1000000
+"""
+
+import argparse
+import contextlib
+import gc
+import hashlib
+import importlib.util
+import io
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from bench_storage import synthetic_day_frames
+from src.utils.features import (PRICE_BINS, PRICE_LABELS, parse_duration, parse_transfer_duration,
+                                transfer_count)
+
+
+def legacy_feature_engineering(df):
+    """改造前 feature_engineering 的计算逻辑（去掉打印）"""
+    df_new = df.copy()
+    df_new['采集日期'] = pd.to_datetime(df_new['采集日期'])
+    df_new['起飞日期'] = pd.to_datetime(df_new['起飞日期'])
+    df_new['采集_星期'] = df_new['采集日期'].dt.dayofweek
+    df_new['采集_月份'] = df_new['采集日期'].dt.month
+    df_new['采集_日期'] = df_new['采集日期'].dt.day
+    df_new['起飞_星期'] = df_new['起飞日期'].dt.dayofweek
+    df_new['起飞_月份'] = df_new['起飞日期'].dt.month
+    df_new['起飞_日期'] = df_new['起飞日期'].dt.day
+
+    df_new['起飞小时'] = pd.to_datetime(df_new['起飞时间'], format='%H:%M').dt.hour
+    df_new['到达小时'] = pd.to_datetime(df_new['到达时间'], format='%H:%M').dt.hour
+
+    def get_time_period(hour):
+        if 6 <= hour < 12:
+            return '上午'
+        elif 12 <= hour < 18:
+            return '下午'
+        elif 18 <= hour < 24:
+            return '晚上'
+        else:
+            return '凌晨'
+
+    df_new['起飞时段'] = df_new['起飞小时'].apply(get_time_period)
+    df_new['到达时段'] = df_new['到达小时'].apply(get_time_period)
+    df_new['飞行时长_分钟'] = df_new['总时长'].apply(parse_duration)
+    df_new['中转时长_分钟'] = df_new['中转时长'].apply(parse_transfer_duration)
+    df_new['中转次数'] = df_new['中转地'].apply(transfer_count)
+    df_new['是否有中转'] = (df_new['中转次数'] > 0).astype(int)
+
+    top_airlines = df_new['航司'].value_counts().head(5).index.tolist()
+    df_new['主要航司'] = df_new['航司'].apply(lambda x: 1 if x in top_airlines else 0)
+    df_new['价格_百元'] = df_new['价格'] / 100
+    df_new['价格区间'] = pd.cut(df_new['价格'], bins=PRICE_BINS, labels=PRICE_LABELS)
+
+    def seat_category(seats):
+        if seats <= 2:
+            return '紧张(<=2)'
+        elif seats <= 5:
+            return '较少(3-5)'
+        elif seats <= 9:
+            return '中等(6-9)'
+        else:
+            return '充足(>9)'
+
+    df_new['座位状态'] = df_new['剩余座位'].apply(seat_category)
+    df_new['性价比'] = df_new['价格'] / (df_new['剩余座位'] + 1)
+    df_new['时间压力'] = 1 / (df_new['提前天数'] + 1)
+    df_new['时长标准化'] = (df_new['飞行时长_分钟'] - df_new['飞行时长_分钟'].min()) / (df_new['飞行时长_分钟'].max() - df_new['飞行时长_分钟'].min())
+    df_new['价格标准化'] = (df_new['价格'] - df_new['价格'].min()) / (df_new['价格'].max() - df_new['价格'].min())
+    df_new['效率评分'] = 1 - (df_new['时长标准化'] * 0.4 + df_new['价格标准化'] * 0.4 - (df_new['剩余座位'] / df_new['剩余座位'].max()) * 0.2)
+    return df_new
+
+
+def load_analysis():
+    spec = importlib.util.spec_from_file_location(
+        'analysis', os.path.join(PROJECT_ROOT, 'src', 'analyzers', 'flight_data_analysis.py'))
+    analysis = importlib.util.module_from_spec(spec)
+    # 注册到 sys.modules，进程池才能按名字找到分析器中的函数
+    sys.modules[spec.name] = analysis
+    spec.loader.exec_module(analysis)
+    return analysis
+
+
+def csv_digest(df, chunk_rows=500_000):
+    """分块写 CSV 计算 SHA-256，避免一次生成整个 CSV 字符串"""
+    digest = hashlib.sha256()
+    for first in range(0, len(df), chunk_rows):
+        digest.update(df.iloc[first:first + chunk_rows].to_csv(index=False, header=first == 0).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def timed(fn):
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(rows, analysis, legacy_max_rows):
+    df = pd.concat(synthetic_day_frames(rows), ignore_index=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        featured, new_s = timed(lambda: analysis.feature_engineering(df))
+    line = f"{rows:>12,} 行  向量化 {new_s:7.2f} 秒 {rows / new_s:>12,.0f} 行/秒"
+
+    if rows <= legacy_max_rows:
+        new_digest = csv_digest(featured)
+        del featured
+        legacy, legacy_s = timed(lambda: legacy_feature_engineering(df))
+        identical = csv_digest(legacy) == new_digest
+        line += (f"  逐行 {legacy_s:7.2f} 秒 {rows / legacy_s:>10,.0f} 行/秒  ({legacy_s / new_s:.1f}x)"
+                 f"  CSV 一致: {'✅' if identical else '❌'}")
+    else:
+        line += "  逐行: 跳过"
+    print(line, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='特征工程基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 10_000_000], help='数据行数')
+    parser.add_argument('--legacy-max-rows', type=int, default=10_000_000, help='超过该行数不运行旧版')
+    args = parser.parse_args()
+
+    analysis = load_analysis()
+    print("\n" + "=" * 100)
+    print("特征工程吞吐（单进程）")
+    print("=" * 100)
+    for rows in args.rows:
+        run(rows, analysis, args.legacy_max_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+扁平化森林基准测试：sklearn predict vs FlatForest（纯 NumPy）
+====================================
+
+按 bench_batch_predict 的方式用合成特征数据训练随机森林（100 棵树，max_depth=15），导出 FlatForest 后报告：
+
+- 导出耗时、节点数、数组大小
+- 与 sklearn 的最大绝对误差（批量和单行）
+- 单行预测延迟 p50 / p99（每次换一行输入，不命中同一条路径的缓存）：
+  已编码特征上的 model.predict vs FlatForest.predict_one，
+  以及端到端的 FlightPricePredictor.predict(dict)：改造前（单行 DataFrame + sklearn）vs 改造后
+- 小批量吞吐量：FlatForest.predict vs model.predict
+
+使用方法:
+    python benchmarks/bench_flat_forest.py
+    python benchmarks/bench_flat_forest.py --train-rows 20000 --queries 500
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from bench_batch_predict import featured_data, legacy_predict, load_predictor, train_model
+from src.predictors.flat_forest import FlatForest
+
+
+def latencies(fn, inputs):
+    """逐个输入调用 fn，返回每次耗时（微秒）"""
+    result = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        result.append((time.perf_counter() - start) * 1e6)
+    return np.array(result)
+
+
+def report(name, values, baseline=None):
+    p50, p99 = np.percentile(values, [50, 99])
+    speedup = f"   ({np.percentile(baseline, 50) / p50:,.0f}x)" if baseline is not None else ''
+    print(f"  {name:36s} p50 {p50:9,.1f} µs   p99 {p99:9,.1f} µs{speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='扁平化森林基准测试')
+    parser.add_argument('--train-rows', type=int, default=50_000, help='训练数据行数')
+    parser.add_argument('--queries', type=int, default=2_000, help='单行预测次数')
+    parser.add_argument('--batch-rows', type=int, nargs='+', default=[100, 1_000, 4_096], help='小批量行数')
+    args = parser.parse_args()
+
+    predictor_module = load_predictor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        df = featured_data(args.train_rows, work_dir, predictor_module)
+    predictor = train_model(predictor_module, df)
+    model = predictor.model
+
+    start = time.perf_counter()
+    flat = FlatForest.from_sklearn(model)
+    export_s = time.perf_counter() - start
+    nbytes = sum(a.nbytes for a in (flat.feature, flat.threshold, flat.left, flat.missing_right, flat.value))
+    print("\n" + "=" * 90)
+    print(f"{flat.n_trees} 棵树，{flat.n_nodes:,} 个节点，最大深度 {flat.depth}，"
+          f"数组 {nbytes / 1e6:.1f} MB，导出 {export_s:.2f} 秒，CPU 核数 {os.cpu_count()}")
+    print("=" * 90)
+
+    features = df.drop(columns=['价格'])
+    X = predictor.encode_features(features)
+    X_array = X.to_numpy(dtype=np.float32)
+    expected = model.predict(X)
+    batch_error = np.abs(flat.predict(X_array) - expected).max()
+    rows = np.random.default_rng(0).permutation(len(X))[:args.queries]
+    single = np.array([flat.predict_one(X_array[i]) for i in rows])
+    single_error = np.abs(single - expected[rows]).max()
+    print(f"与 sklearn 的最大绝对误差: 批量 {batch_error:.3g}，单行 {single_error:.3g}")
+
+    print("\n单行预测延迟（已编码特征）:")
+    sklearn_us = latencies(lambda i: model.predict(X.iloc[i:i + 1]), rows)
+    report('sklearn model.predict', sklearn_us)
+    report('FlatForest.predict_one', latencies(lambda i: flat.predict_one(X_array[i]), rows), sklearn_us)
+
+    print("\n单行预测延迟（端到端 predict(dict)）:")
+    records = features.iloc[rows].to_dict('records')
+    with contextlib.redirect_stdout(io.StringIO()):
+        legacy_us = latencies(lambda row: legacy_predict(predictor, row), records)
+    report('改造前 (DataFrame + sklearn)', legacy_us)
+    report('改造后 (查表编码 + FlatForest)', latencies(predictor.predict, records), legacy_us)
+    encoded = np.array([predictor.encode_row(row) for row in records])
+    print(f"  端到端结果与已编码特征一致: {'✅' if np.array_equal(encoded, X_array[rows]) else '❌'}")
+
+    print("\n小批量吞吐量:")
+    for batch in args.batch_rows:
+        chunk, chunk_array = X.iloc[:batch], X_array[:batch]
+        start = time.perf_counter()
+        model.predict(chunk)
+        sklearn_s = time.perf_counter() - start
+        start = time.perf_counter()
+        flat.predict(chunk_array)
+        flat_s = time.perf_counter() - start
+        print(f"  {batch:>6,} 行   sklearn {batch / sklearn_s:>10,.0f} 行/秒   "
+              f"FlatForest {batch / flat_s:>10,.0f} 行/秒   ({sklearn_s / flat_s:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
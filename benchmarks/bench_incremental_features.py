@@ -0,0 +1,111 @@
+"""
+增量特征工程基准测试
+====================================
+
+对不同长度的历史（合成原始 CSV，见 bench_storage.synthetic_day_frames），先全量生成特征数据集和增量状态，
+再追加最近几天的新数据，比较两种更新方式的耗时：
+
+- 全量重算：读取全部原始数据、特征工程、重写特征 CSV（改造前每次分析的做法）
+- 增量：只读取新追加的字节、沿用已保存的全局统计量、追加写入特征 CSV
+
+增量耗时应只随新增数据量变化，与历史长度无关；同时校验增量结果与“用相同统计量全量计算”逐字节一致。
+
+使用方法:
+    python benchmarks/bench_incremental_features.py                          # 历史 250k / 1M / 4M 行，新增 3 天
+    python benchmarks/bench_incremental_features.py --history 1000000 --new-days 1
+"""
+
+import argparse
+import codecs
+import contextlib
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from bench_feature_engineering import csv_digest, load_analysis
+from bench_storage import ROWS_PER_DAY, synthetic_day_frames
+from src.utils.features import FeatureState, feature_state_file
+
+
+def write_raw(path, rows, new_rows):
+    """写入 rows 行历史，返回尚未写入的 new_rows 行"""
+    frames = []
+    written = 0
+    for frame in synthetic_day_frames(rows + new_rows):
+        take = max(0, min(len(frame), rows - written))
+        if take:
+            frame.iloc[:take].to_csv(path, mode='a' if written else 'w', header=not written, index=False,
+                                     encoding='utf-8' if written else 'utf-8-sig')
+            written += take
+        if take < len(frame):
+            frames.append(frame.iloc[take:])
+    return frames
+
+
+def file_digest(path):
+    """去掉 BOM 后的文件 SHA-256，与 csv_digest 可比"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.read(len(codecs.BOM_UTF8))
+        for chunk in iter(lambda: f.read(4 * 1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(history, new_rows, analysis, work_dir):
+    raw = os.path.join(work_dir, f'raw_{history}.csv')
+    featured = os.path.join(work_dir, f'featured_{history}.csv')
+    state_file = feature_state_file(featured)
+    pending = write_raw(raw, history, new_rows)
+    timed(lambda: analysis.update_features(raw, featured, config.FEATURE_DRIFT_THRESHOLD))
+    for frame in pending:
+        frame.to_csv(raw, mode='a', header=False, index=False, encoding='utf-8')
+
+    rows, incremental_s = timed(lambda: analysis.update_features(raw, featured, config.FEATURE_DRIFT_THRESHOLD))
+    applied = FeatureState(state_file).applied
+    incremental_digest = file_digest(featured)
+
+    os.remove(state_file)
+    _, full_s = timed(lambda: analysis.update_features(raw, featured, config.FEATURE_DRIFT_THRESHOLD))
+    df, _ = timed(lambda: analysis.load_data(raw))
+    expected, _ = timed(lambda: analysis.feature_engineering(df, stats=applied))
+    identical = csv_digest(expected) == incremental_digest
+    del df, expected
+    print(f"{history:>12,} {rows:>8,} {full_s:9.2f} 秒 {incremental_s:9.3f} 秒 {full_s / incremental_s:8.1f}x   "
+          f"{'✅' if identical else '❌'}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量特征工程基准测试')
+    parser.add_argument('--history', type=int, nargs='+', default=[250_000, 1_000_000, 4_000_000],
+                        help='已有历史行数')
+    parser.add_argument('--new-days', type=int, default=3, help='新增采集天数（每天约 2500 行）')
+    args = parser.parse_args()
+
+    analysis = load_analysis()
+    with tempfile.TemporaryDirectory() as work_dir:
+        config.MANIFEST_FILE = os.path.join(work_dir, 'manifest.json')
+        print("\n" + "=" * 72)
+        print(f"{'历史行数':>10s} {'新增行数':>6s} {'全量重算':>10s} {'增量':>10s} {'加速':>8s}   一致")
+        print("=" * 72)
+        for history in args.history:
+            run(history, args.new_days * ROWS_PER_DAY, analysis, work_dir)
+
+
+if __name__ == "__main__":
+    main()
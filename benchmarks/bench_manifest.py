@@ -0,0 +1,78 @@
+"""
+调度检查基准测试：解析 CSV 统计行数 vs 数据集清单
+====================================
+
+生成 36 列特征 CSV（见 bench_schema_load.build_featured），比较调度器每次检查获取数据量的方式：
+
+- pd.read_csv 后 len(df)（最初的实现）
+- read_flight_csv 单列投影后 len(df)
+- DatasetManifest.rows()：os.stat 校验后直接读清单
+
+以及写入方每次更新清单的代价（一次顺序读取计算哈希和行数）。
+
+使用方法:
+    python benchmarks/bench_manifest.py                  # 1M 行
+    python benchmarks/bench_manifest.py --rows 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from bench_schema_load import build_featured
+from src.utils.manifest import DatasetManifest
+from src.utils.schema import read_flight_csv
+
+
+def best_ms(fn, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='调度检查基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='特征数据行数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最快）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'flight_data_featured.csv')
+        print(f"\n生成 {args.rows:,} 行特征数据...", flush=True)
+        build_featured(args.rows, path)
+        manifest_path = os.path.join(tmp_dir, 'manifest.json')
+
+        record_ms, _ = best_ms(lambda: DatasetManifest(manifest_path, root=tmp_dir).record(path), args.repeat)
+        manifest = DatasetManifest(manifest_path, root=tmp_dir)
+        manifest.record(path)
+        manifest.save()
+
+        cases = [
+            ('pd.read_csv + len', lambda: len(pd.read_csv(path, encoding='utf-8-sig'))),
+            ('read_flight_csv 单列 + len', lambda: len(read_flight_csv(path, columns=['提前天数']))),
+            ('清单 rows()', lambda: DatasetManifest(manifest_path, root=tmp_dir).rows(path)),
+        ]
+
+        print("\n" + "=" * 60)
+        print(f"特征 CSV {os.path.getsize(path) / 1e6:,.1f} MB")
+        print("=" * 60)
+        for name, fn in cases:
+            elapsed, rows = best_ms(fn, args.repeat)
+            print(f"{name:28s} {elapsed:10.2f} ms  ({rows:,} 行)")
+        print(f"\n写入方更新清单（哈希 + 行数 + 日期范围） {record_ms:,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+模型加载基准测试：pickle vs 可内存映射的模型产物
+====================================
+
+按 bench_batch_predict 的方式用合成特征数据训练随机森林（100 棵树，max_depth=15），
+save_model 同时写出 pickle 和模型产物目录，然后在全新的子进程中分别 load_model，报告：
+
+- 文件大小
+- 加载耗时（load_model 调用本身，pickle 加载包括按需导入 sklearn 和导出扁平化森林）
+- 加载后、以及对 --predict-rows 行预测之后的 RSS 增量，拆分为私有匿名页（RssAnon）和文件页（RssFile）
+- 同时运行 --processes 个加载同一模型的进程时，所有进程 PSS 增量之和（文件页按共享进程数分摊）
+
+依赖 Linux 的 /proc。模型文件刚刚写出，产物读到的是已在页缓存中的文件页（热缓存）。
+
+使用方法:
+    python benchmarks/bench_model_artifact.py
+    python benchmarks/bench_model_artifact.py --train-rows 20000 --processes 8
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import numpy as np
+
+from bench_batch_predict import featured_data, load_predictor, train_model
+
+# 子进程：载入预测器模块后计时 load_model，打印内存统计，等待父进程读取 PSS 后（关闭 stdin）退出
+CHILD = r'''
+import contextlib, io, json, sys, time
+import numpy as np
+sys.path.insert(0, sys.argv[1])
+from bench_batch_predict import load_predictor
+from bench_model_artifact import memory
+
+module = load_predictor()
+before = memory()
+with contextlib.redirect_stdout(io.StringIO()):
+    predictor = module.FlightPricePredictor()
+    start = time.perf_counter()
+    predictor.load_model(sys.argv[2])
+    load_s = time.perf_counter() - start
+loaded = memory()
+predictor.flat_model.predict(np.load(sys.argv[3]))
+predicted = memory()
+print(json.dumps({'load_s': load_s, 'before': before, 'loaded': loaded, 'predicted': predicted}), flush=True)
+sys.stdin.read()
+'''
+
+
+def memory(pid='self'):
+    """进程的 RSS / RssAnon / RssFile（/proc/<pid>/status）和 PSS（smaps_rollup），单位 MB"""
+    result = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                result[key] = int(value.split()[0]) / 1024
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                result['Pss'] = int(line.split()[1]) / 1024
+    return result
+
+
+def run_children(model_path, rows_path, processes):
+    """同时启动 processes 个子进程加载模型，返回各自的统计和加载完成后（进程都还在时）的 PSS"""
+    children = [subprocess.Popen([sys.executable, '-c', CHILD, BENCH_DIR, model_path, rows_path],
+                                 stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                for _ in range(processes)]
+    stats = [json.loads(child.stdout.readline()) for child in children]
+    for child, stat in zip(children, stats):
+        stat['pss_all'] = memory(child.pid)['Pss']
+    for child in children:
+        child.stdin.close()
+        child.wait()
+    return stats
+
+
+def delta(stat, stage, key):
+    return stat[stage][key] - stat['before'][key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模型加载基准测试')
+    parser.add_argument('--train-rows', type=int, default=50_000, help='训练数据行数')
+    parser.add_argument('--predict-rows', type=int, default=2_000, help='加载后预测的行数（触发页面读入）')
+    parser.add_argument('--repeat', type=int, default=5, help='单进程加载重复次数（取中位数）')
+    parser.add_argument('--processes', type=int, default=4, help='同时加载模型的进程数')
+    args = parser.parse_args()
+
+    predictor_module = load_predictor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        df = featured_data(args.train_rows, work_dir, predictor_module)
+        predictor = train_model(predictor_module, df)
+        pickle_path = os.path.join(work_dir, 'flight_price_model.pkl')
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor.save_model(pickle_path)
+        artifact = predictor_module.artifact_path(pickle_path)
+        rows_path = os.path.join(work_dir, 'rows.npy')
+        X = predictor.encode_features(df.drop(columns=['价格']).iloc[:args.predict_rows])
+        np.save(rows_path, X.to_numpy(dtype=np.float32))
+
+        sizes = {
+            'pickle': os.path.getsize(pickle_path),
+            '模型产物 (mmap)': sum(entry.stat().st_size for entry in os.scandir(artifact)),
+        }
+        paths = {'pickle': pickle_path, '模型产物 (mmap)': artifact}
+        flat = predictor.flat_model
+        print("\n" + "=" * 100)
+        print(f"{flat.n_trees} 棵树，{flat.n_nodes:,} 个节点，最大深度 {flat.depth}，CPU 核数 {os.cpu_count()}")
+        print("=" * 100)
+        print(f"{'格式':16s} {'大小':>9s} {'加载耗时':>10s}   {'加载后 RSS (匿名/文件)':>26s}   "
+              f"{f'预测 {args.predict_rows:,} 行后 RSS (匿名/文件)':>30s}")
+        for name, path in paths.items():
+            stats = [run_children(path, rows_path, 1)[0] for _ in range(args.repeat)]
+            stat = min(stats, key=lambda s: s['load_s'])
+            load_s = statistics.median(s['load_s'] for s in stats)
+            loaded = (delta(stat, 'loaded', 'VmRSS'), delta(stat, 'loaded', 'RssAnon'), delta(stat, 'loaded', 'RssFile'))
+            predicted = (delta(stat, 'predicted', 'VmRSS'), delta(stat, 'predicted', 'RssAnon'),
+                         delta(stat, 'predicted', 'RssFile'))
+            print(f"{name:16s} {sizes[name] / 1e6:>6.1f} MB {load_s * 1e3:>8.1f} ms   "
+                  f"{loaded[0]:>7.1f} MB ({loaded[1]:>6.1f} / {loaded[2]:>5.1f})   "
+                  f"{predicted[0]:>11.1f} MB ({predicted[1]:>6.1f} / {predicted[2]:>5.1f})", flush=True)
+
+        print(f"\n同时运行 {args.processes} 个进程（预测后）：")
+        for name, path in paths.items():
+            stats = run_children(path, rows_path, args.processes)
+            pss = sum(s['pss_all'] - s['before']['Pss'] for s in stats)
+            rss = sum(delta(s, 'predicted', 'VmRSS') for s in stats)
+            print(f"  {name:16s} RSS 增量之和 {rss:>7.1f} MB   PSS 增量之和 {pss:>7.1f} MB", flush=True)
+
+
+if __name__ == "__main__":
+    main()
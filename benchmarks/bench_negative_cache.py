@@ -0,0 +1,102 @@
+"""
+负缓存与预扫描基准测试
+====================================
+
+在本地模拟 Amadeus 服务上模拟稀疏航线（部分星期几没有航班），连续运行多天采集，
+比较三种方式每次运行的 API 请求数、耗时和采集到的有航班日期数：
+
+- 无缓存: 每次运行查询全部 (航线 × 日期)
+- 负缓存: 跳过近期无航班的日期和星期几，按抽样率复查
+- 负缓存 + 预扫描: 每条航线先调用一次 flight-dates，未列出的日期直接写入负缓存
+
+使用方法:
+    python benchmarks/bench_negative_cache.py
+    python benchmarks/bench_negative_cache.py --routes 5 --empty-weekdays 1 3 5 6 --runs 7
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.collectors.mock_amadeus import MockAmadeusServer, synthetic_routes
+from src.collectors.negative_cache import NegativeCache
+from src.collectors.rate_limiter import TokenBucket
+from src.collectors.scan_engine import build_target_dates, build_work_units, prescan_routes, scan_routes
+
+
+def run_days(server, args, cache_path=None, prescan=False):
+    """连续采集 args.runs 天，返回每天的 (请求数, 耗时, 有航班日期数)"""
+    routes = synthetic_routes(args.routes)
+    client = server.client()
+    start_day = datetime(2026, 1, 1)
+    results = []
+    for k in range(args.runs):
+        today = start_day + timedelta(days=k)
+        fetch_date = today.strftime('%Y-%m-%d')
+        target_dates = build_target_dates(args.days, today=today)
+        units = build_work_units(routes, target_dates)
+        limiter = TokenBucket(args.rate, 1)
+        requests_before = server.request_count
+
+        start = time.perf_counter()
+        cache = None
+        if cache_path is not None:
+            cache = NegativeCache(cache_path, sample_rate=args.sample_rate, seed=k)
+            if prescan:
+                prescan_routes(client, routes, target_dates, cache, fetch_date, limiter)
+            units, _ = cache.filter_units(units, fetch_date)
+        frames = scan_routes(client, routes, None, fetch_date, mode='concurrent', workers=args.workers,
+                             limiter=limiter, units=units, negative_cache=cache)
+        if cache is not None:
+            cache.prune(fetch_date)
+            cache.save()
+        elapsed = time.perf_counter() - start
+
+        found = sum(len(dfs) for dfs in frames.values())
+        results.append((server.request_count - requests_before, elapsed, found))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='负缓存与预扫描基准测试')
+    parser.add_argument('--routes', type=int, default=3, help='合成航线数')
+    parser.add_argument('--days', type=int, default=30, help='扫描天数')
+    parser.add_argument('--runs', type=int, default=5, help='连续模拟多少天的采集')
+    parser.add_argument('--empty-weekdays', type=int, nargs='*', default=[1, 3, 5],
+                        help='无航班的起飞星期几（0 为周一）')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟接口延迟（秒）')
+    parser.add_argument('--workers', type=int, default=8, help='并发请求数')
+    parser.add_argument('--rate', type=float, default=50, help='令牌桶速率（次/秒）')
+    parser.add_argument('--sample-rate', type=float, default=0.2, help='命中缓存的日期抽样复查比例')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print(f"航线: {args.routes}  扫描天数: {args.days}  连续运行: {args.runs} 天  "
+          f"无航班星期: {args.empty_weekdays}")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        variants = [
+            ('无缓存', None, False),
+            ('负缓存', os.path.join(tmp_dir, 'cache.json'), False),
+            ('负缓存 + 预扫描', os.path.join(tmp_dir, 'cache_prescan.json'), True),
+        ]
+        for name, cache_path, prescan in variants:
+            with MockAmadeusServer(latency=args.latency, empty_weekdays=args.empty_weekdays) as server:
+                results = run_days(server, args, cache_path, prescan)
+            print(f"\n[{name}]")
+            for k, (requests, elapsed, found) in enumerate(results, 1):
+                print(f"  第 {k} 天: 请求 {requests:4d} 次, 耗时 {elapsed:5.2f} 秒, 有航班日期 {found}")
+            total_requests = sum(r[0] for r in results)
+            total_elapsed = sum(r[1] for r in results)
+            print(f"  合计: 请求 {total_requests} 次, 耗时 {total_elapsed:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+报价解析微基准：逐行 dict 解析 vs 列式批量解析
+====================================
+
+优先使用 data/archive/ 中录制的真实响应；归档为空时使用模拟服务的合成报价。
+分别统计旧版（逐行构造 dict + sort_values + drop_duplicates）和
+新版 build_daily_frame 的每秒解析报价数，并校验两者输出一致。
+
+使用方法:
+    python benchmarks/bench_offer_parser.py
+    python benchmarks/bench_offer_parser.py --archive-dir data/archive --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pandas as pd
+
+from config import ARCHIVE_DIR
+from src.collectors.mock_amadeus import generate_offers
+from src.collectors.offer_parser import build_daily_frame, parse_duration
+from src.collectors.raw_archive import RawArchive
+
+
+def legacy_calculate_layover(segments):
+    if len(segments) < 2: return "无", "0"
+    total_wait_seconds = 0
+    layover_locs = []
+    for i in range(len(segments) - 1):
+        layover_locs.append(segments[i]['arrival']['iataCode'])
+        arr = datetime.strptime(segments[i]['arrival']['at'], "%Y-%m-%dT%H:%M:%S")
+        dep = datetime.strptime(segments[i+1]['departure']['at'], "%Y-%m-%dT%H:%M:%S")
+        total_wait_seconds += (dep - arr).total_seconds()
+    return "/".join(layover_locs), f"{int(total_wait_seconds // 3600)}h{int((total_wait_seconds % 3600) // 60)}m"
+
+
+def legacy_build_daily_frame(offers, fetch_date, target_date, days_ahead):
+    """改造前 run_daily_scan 中的逐行解析逻辑"""
+    daily_flights = []
+    for flight in offers:
+        itinerary = flight['itineraries'][0]
+        segments = itinerary['segments']
+        daily_flights.append({
+            '采集日期': fetch_date,
+            '起飞日期': target_date,
+            '提前天数': days_ahead,
+            '航班号': segments[0]['carrierCode'] + segments[0]['number'],
+            '航司': flight['validatingAirlineCodes'][0],
+            '类型': "直飞" if len(segments) == 1 else "中转",
+            '起飞时间': segments[0]['departure']['at'].split('T')[1][:5],
+            '到达时间': segments[-1]['arrival']['at'].split('T')[1][:5],
+            '总时长': parse_duration.__wrapped__(itinerary['duration']),
+            '中转地': legacy_calculate_layover(segments)[0],
+            '中转时长': legacy_calculate_layover(segments)[1],
+            '剩余座位': flight['numberOfBookableSeats'],
+            '价格': float(flight['price']['total']),
+            '_dept': segments[0]['departure']['at'],
+            '_arr': segments[-1]['arrival']['at']
+        })
+    if not daily_flights:
+        return None
+    df = pd.DataFrame(daily_flights)
+    df = df.sort_values(by='价格', kind='stable').drop_duplicates(subset=['_dept', '_arr'], keep='first')
+    return df.drop(columns=['_dept', '_arr'])
+
+
+def load_responses(archive_dir, days, offers_per_day):
+    """读取录制的响应；没有时生成合成响应"""
+    archive = RawArchive(archive_dir)
+    responses = [
+        (r['fetch_date'], r['departure_date'], r['days_ahead'], r['response']['data'])
+        for r in archive.iter_records()
+        if r['response'] and r['response'].get('data')
+    ] if os.path.isdir(archive_dir) else []
+    if responses:
+        return responses, '归档录制'
+
+    today = datetime(2026, 1, 1)
+    for i in range(1, days + 1):
+        target = (today + timedelta(days=i)).strftime('%Y-%m-%d')
+        responses.append(('2026-01-01', target, i, generate_offers('SZX', 'YIH', target, offers_per_day)))
+    return responses, '合成'
+
+
+def bench(fn, responses, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for fetch_date, target_date, days_ahead, offers in responses:
+            fn(offers, fetch_date, target_date, days_ahead)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='报价解析微基准')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='录制响应的归档目录')
+    parser.add_argument('--days', type=int, default=300, help='合成响应数量（无归档时）')
+    parser.add_argument('--offers', type=int, default=250, help='每个合成响应的报价数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最快）')
+    args = parser.parse_args()
+
+    responses, source = load_responses(args.archive_dir, args.days, args.offers)
+    total_offers = sum(len(offers) for *_, offers in responses)
+
+    for fetch_date, target_date, days_ahead, offers in responses:
+        old = legacy_build_daily_frame(offers, fetch_date, target_date, days_ahead)
+        new = build_daily_frame(offers, fetch_date, target_date, days_ahead)
+        if not old.reset_index(drop=True).equals(new):
+            print(f"❌ 输出不一致: {target_date}")
+            return
+
+    legacy_time = bench(legacy_build_daily_frame, responses, args.repeat)
+    parse_duration.cache_clear()
+    batch_time = bench(build_daily_frame, responses, args.repeat)
+
+    print("\n" + "=" * 60)
+    print(f"数据来源: {source}  响应数: {len(responses)}  报价数: {total_offers}")
+    print("=" * 60)
+    print(f"逐行解析: {total_offers / legacy_time:,.0f} 报价/秒 ({legacy_time:.3f} 秒)")
+    print(f"列式解析: {total_offers / batch_time:,.0f} 报价/秒 ({batch_time:.3f} 秒)")
+    print(f"加速比:   {legacy_time / batch_time:.1f}x")
+    print("输出一致: True")
+
+
+if __name__ == "__main__":
+    main()
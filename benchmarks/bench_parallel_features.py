@@ -0,0 +1,73 @@
+"""
+并行特征工程基准测试
+====================================
+
+用合成原始数据（见 bench_storage.synthetic_day_frames）比较单进程 feature_engineering 与
+parallel_feature_engineering 在不同进程数下的耗时、加速比和并行效率（加速比 / 进程数），
+并校验各进程数下的特征 CSV 与单进程逐字节相同。
+
+进程数超过本机 CPU 核数时不会再有加速，结果中会标注。
+
+使用方法:
+    python benchmarks/bench_parallel_features.py                           # 4M 行，1/2/4/8 进程
+    python benchmarks/bench_parallel_features.py --rows 10000000 --workers 1 2 4
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+
+from bench_feature_engineering import csv_digest, load_analysis
+from bench_storage import synthetic_day_frames
+from src.utils.features import FeatureStats
+
+
+def timed(fn):
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并行特征工程基准测试')
+    parser.add_argument('--rows', type=int, default=4_000_000, help='数据行数')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='进程数')
+    args = parser.parse_args()
+
+    analysis = load_analysis()
+    cores = os.cpu_count() or 1
+    df = pd.concat(synthetic_day_frames(args.rows), ignore_index=True)
+
+    stats, stats_s = timed(lambda: FeatureStats.from_frame(df))
+    featured, serial_s = timed(lambda: analysis.feature_engineering(df))
+    expected = csv_digest(featured)
+    del featured
+
+    print("\n" + "=" * 72)
+    print(f"{args.rows:,} 行, 本机 {cores} 核；全局统计量首轮 {stats_s * 1000:.0f} ms")
+    print("=" * 72)
+    print(f"{'单进程':10s} {serial_s:8.2f} 秒 {args.rows / serial_s:>12,.0f} 行/秒")
+    for workers in args.workers:
+        featured, elapsed = timed(lambda: analysis.parallel_feature_engineering(df, workers=workers, stats=stats))
+        identical = csv_digest(featured) == expected
+        del featured
+        speedup = serial_s / elapsed
+        note = '  (超过 CPU 核数)' if workers > cores else ''
+        print(f"{workers:3d} 进程    {elapsed:8.2f} 秒 {args.rows / elapsed:>12,.0f} 行/秒  加速 {speedup:5.2f}x  "
+              f"效率 {speedup / workers:5.0%}  CSV 一致: {'✅' if identical else '❌'}{note}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
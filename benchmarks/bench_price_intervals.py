@@ -0,0 +1,152 @@
+"""
+价格区间压缩基准测试
+====================================
+
+生成带“价格粘性”的合成快照（每天两轮采集，每个起飞日期 FLIGHTS 个报价，价格和座位按给定概率变化），
+压缩为价格有效区间，报告：
+
+- 压缩比（快照行数 / 区间行数）和文件大小
+- 压缩、还原耗时；读取快照 CSV vs 读取区间 CSV 再还原的耗时
+- 还原结果与原快照是否一致；增量压缩（先压前一半再合并后一半）与全量压缩结果是否一致
+
+使用方法:
+    python benchmarks/bench_price_intervals.py                          # 1M 行，日变化概率 0.1
+    python benchmarks/bench_price_intervals.py --rows 3000000 --change-rate 0.2 0.05
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.collectors.mock_amadeus import CARRIERS, HUBS
+from src.collectors.offer_parser import COLUMNS
+from src.utils.price_intervals import (compact_route, compact_snapshots, expand_intervals, read_intervals,
+                                       read_snapshots, verify_round_trip)
+
+FLIGHTS = 40
+SCAN_DAYS = 30
+RUNS_PER_DAY = 2
+
+
+def sticky_day_frames(rows, change_rate, seed=0):
+    """按采集日期生成快照，每天 RUNS_PER_DAY 轮；第二轮的变化概率为第一轮的四分之一"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    per_day = SCAN_DAYS * FLIGHTS * RUNS_PER_DAY
+    days = max(1, -(-rows // per_day))
+    horizon = days + SCAN_DAYS + 1
+
+    carriers = np.array(CARRIERS)[rng.integers(0, len(CARRIERS), FLIGHTS)]
+    flight_no = np.char.add(carriers, rng.integers(1000, 9999, FLIGHTS).astype(str))
+    layover = np.array(['无'] + HUBS)[rng.integers(0, len(HUBS) + 1, FLIGHTS)]
+    direct = layover == '无'
+    hours = rng.integers(6, 23, FLIGHTS)
+    dep_time = np.array([f"{h:02d}:{m:02d}" for h, m in zip(hours, rng.choice([0, 15, 30, 45], FLIGHTS))])
+    arr_time = np.array([f"{(h + 3) % 24:02d}:{t[3:]}" for h, t in zip(hours, dep_time)])
+    duration = np.where(direct, '2小时15分', '6小时40分')
+    layover_time = np.where(direct, '0', '2h10m')
+    price = np.round(rng.uniform(320, 1500, (horizon, FLIGHTS)), 2)
+    seats = rng.integers(1, 10, (horizon, FLIGHTS))
+    dates = [(start + timedelta(days=d)).strftime('%Y-%m-%d') for d in range(horizon)]
+
+    produced = 0
+    for day in range(days):
+        frames = []
+        dep_days = np.arange(day + 1, day + SCAN_DAYS + 1)
+        for run in range(RUNS_PER_DAY):
+            rate = change_rate if run == 0 else change_rate / 4
+            moved = rng.random((SCAN_DAYS, FLIGHTS)) < rate
+            price[dep_days] = np.where(moved, np.round(price[dep_days] * rng.uniform(0.9, 1.12, moved.shape), 2),
+                                       price[dep_days])
+            seat_moved = rng.random((SCAN_DAYS, FLIGHTS)) < rate
+            seats[dep_days] = np.where(seat_moved, rng.integers(1, 10, seat_moved.shape), seats[dep_days])
+            dep = np.repeat(dep_days, FLIGHTS)
+            flight = np.tile(np.arange(FLIGHTS), SCAN_DAYS)
+            frame = pd.DataFrame({
+                '采集日期': dates[day],
+                '起飞日期': np.array(dates)[dep],
+                '提前天数': dep - day,
+                '航班号': flight_no[flight],
+                '航司': carriers[flight],
+                '类型': np.where(direct[flight], '直飞', '中转'),
+                '起飞时间': dep_time[flight],
+                '到达时间': arr_time[flight],
+                '总时长': duration[flight],
+                '中转地': layover[flight],
+                '中转时长': layover_time[flight],
+                '剩余座位': seats[dep, flight],
+                '价格': price[dep, flight],
+            }, columns=COLUMNS)
+            frames.append(frame.sort_values(['起飞日期', '价格'], kind='stable'))
+        frame = pd.concat(frames, ignore_index=True)
+        take = min(len(frame), rows - produced)
+        produced += take
+        yield frame.iloc[:take]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(rows, change_rate, work_dir):
+    csv_path = os.path.join(work_dir, 'flight_data.csv')
+    interval_path = os.path.join(work_dir, 'price_intervals.csv')
+    header = True
+    for frame in sticky_day_frames(rows, change_rate):
+        frame.to_csv(csv_path, mode='w' if header else 'a', header=header, index=False,
+                     encoding='utf-8-sig' if header else 'utf-8')
+        header = False
+
+    snapshots, read_snapshot_s = timed(lambda: read_snapshots(csv_path))
+    intervals, compact_s = timed(lambda: compact_snapshots(snapshots))
+    _, expand_s = timed(lambda: expand_intervals(intervals))
+    verified = verify_round_trip(snapshots, intervals)
+
+    # 增量：先压缩前一半采集日期，再用 --incremental 的方式合并剩余部分
+    days = sorted(snapshots['采集日期'].unique())
+    half = snapshots[snapshots['采集日期'] <= days[len(days) // 2]]
+    half_path = os.path.join(work_dir, 'half.csv')
+    half.to_csv(half_path, index=False, encoding='utf-8-sig')
+    compact_route(half_path, interval_path)
+    stats, incremental_s = timed(lambda: compact_route(csv_path, interval_path, incremental=True))
+    incremental_ok = read_intervals(interval_path).equals(intervals.astype({'槽位': 'int64'}))
+
+    _, read_intervals_s = timed(lambda: expand_intervals(read_intervals(interval_path)))
+
+    print("\n" + "=" * 60)
+    print(f"快照 {len(snapshots):,} 行 (日变化概率 {change_rate}) -> 区间 {len(intervals):,} 行, "
+          f"压缩比 {len(snapshots) / len(intervals):.1f}x")
+    print(f"文件 {os.path.getsize(csv_path) / 1e6:,.1f} MB -> {os.path.getsize(interval_path) / 1e6:,.1f} MB")
+    print("=" * 60)
+    print(f"压缩              {compact_s:7.2f} 秒")
+    print(f"还原              {expand_s:7.2f} 秒")
+    print(f"读取快照 CSV      {read_snapshot_s:7.2f} 秒")
+    print(f"读取区间 + 还原   {read_intervals_s:7.2f} 秒")
+    print(f"增量合并后一半    {incremental_s:7.2f} 秒 (新处理 {stats['new_rows']:,} 行)")
+    print(f"还原一致: {'✅' if verified else '❌'}   增量与全量一致: {'✅' if incremental_ok else '❌'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='价格区间压缩基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='快照行数')
+    parser.add_argument('--change-rate', type=float, nargs='+', default=[0.1], help='每个报价每天价格/座位变化的概率')
+    args = parser.parse_args()
+
+    for change_rate in args.change_rate:
+        with tempfile.TemporaryDirectory() as work_dir:
+            run(args.rows, change_rate, work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+查询库基准测试
+====================================
+
+生成指定行数的合成原始数据导入 SQLite 查询库，随机执行各类查询，报告 p50/p99 延迟：
+
+- 航班价格历史（航班号 + 起飞日期）
+- 范围扫描（7 个起飞日期 × 最近 7 个采集日期）
+- 30 天窗口内最便宜航班
+- 灵活日期日历（24 个起飞日期，每个 ±3 天）
+
+并给出“读取整个 CSV 再过滤”的单次耗时作为对照。
+
+使用方法:
+    python benchmarks/bench_query_store.py                       # 1M 行
+    python benchmarks/bench_query_store.py --rows 20000000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from bench_storage import synthetic_day_frames
+from src.utils.query_store import QueryStore
+
+
+def shift(date_str, days):
+    return (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def percentiles(fn, args_list):
+    latencies = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查询库基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='数据行数')
+    parser.add_argument('--queries', type=int, default=100, help='每类查询的随机次数')
+    parser.add_argument('--csv-baseline', action='store_true', help='同时测量读取整个 CSV 再过滤的耗时')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'flights.sqlite')
+        csv_path = os.path.join(tmp_dir, 'flight_data.csv')
+        samples = []
+        fetch_dates = []
+
+        print(f"\n生成并导入 {args.rows:,} 行...", flush=True)
+        start = time.perf_counter()
+        with QueryStore(db_path) as store:
+            with store.conn:
+                store.drop_indexes()
+                for i, frame in enumerate(synthetic_day_frames(args.rows)):
+                    store.ingest_frame(frame, 'SZX', 'YIH')
+                    picks = frame.sample(5, random_state=i)
+                    samples.extend(zip(picks['航班号'], picks['起飞日期']))
+                    fetch_dates.extend(frame['采集日期'].unique())
+                    if args.csv_baseline:
+                        frame.to_csv(csv_path, mode='a', header=i == 0, index=False,
+                                     encoding='utf-8-sig' if i == 0 else 'utf-8')
+                store.create_indexes()
+        elapsed = time.perf_counter() - start
+        print(f"导入用时 {elapsed:.1f} 秒 ({args.rows / elapsed:,.0f} 行/秒), "
+              f"数据库 {os.path.getsize(db_path) / 1e6:,.0f} MB", flush=True)
+
+        with QueryStore(db_path) as store:
+            n = args.queries
+            history_args = [rng.choice(samples) for _ in range(n)]
+            windows = [rng.choice(fetch_dates) for _ in range(n)]
+            cases = [
+                ('航班价格历史', store.price_history, history_args),
+                ('范围扫描 7x7 天', lambda f: store.range_scan('SZX', 'YIH', shift(f, 5), shift(f, 11),
+                                                            shift(f, -6), f), [(f,) for f in windows]),
+                ('30 天窗口最便宜', lambda f: store.cheapest_in_window('SZX', 'YIH', shift(f, 1), shift(f, 30), f),
+                 [(f,) for f in windows]),
+                ('灵活日期日历 ±3 天', lambda f: store.flexible_calendar('SZX', 'YIH', shift(f, 4), shift(f, 27), 3, f),
+                 [(f,) for f in windows]),
+            ]
+
+            print("\n" + "=" * 60)
+            print(f"行数: {store.row_count():,}  每类查询 {n} 次")
+            print("=" * 60)
+            for name, fn, arg_list in cases:
+                p50, p99 = percentiles(fn, arg_list)
+                print(f"{name:18s} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+        if args.csv_baseline:
+            flight_no, dep_date = history_args[0]
+            start = time.perf_counter()
+            df = pd.read_csv(csv_path, encoding='utf-8-sig', usecols=['采集日期', '起飞日期', '航班号', '价格'])
+            df[(df['航班号'] == flight_no) & (df['起飞日期'] == dep_date)]
+            print(f"\n对照: 读取 CSV 再过滤一次航班价格历史 {(time.perf_counter() - start) * 1000:,.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+特征数据加载基准测试：默认类型 vs 统一模式
+====================================
+
+用分析器的特征工程把合成原始数据（按采集日期分块）生成 36 列特征 CSV，
+每种加载方式在独立子进程中运行，报告加载耗时、峰值 RSS 和 DataFrame 内存占用：
+
+- pd.read_csv 默认类型（改造前所有加载器的做法）
+- read_flight_csv 全部列（category / 小整数 / float32 / 日期）
+- read_flight_csv 预测器列投影（8 个数值特征 + 4 个分类特征 + 价格）
+- read_flight_csv 单列（调度器统计行数）
+
+峰值 RSS 同时给出扣除 import pandas 之后基线的增量。
+
+使用方法:
+    python benchmarks/bench_schema_load.py                  # 1M 行
+    python benchmarks/bench_schema_load.py --rows 3000000
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+CASES = ['default', 'schema', 'predictor', 'count']
+CASE_NAMES = {
+    'default': 'pd.read_csv 默认类型',
+    'schema': 'read_flight_csv 全部列',
+    'predictor': 'read_flight_csv 预测器投影',
+    'count': 'read_flight_csv 单列计数',
+}
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_case(case, path):
+    """子进程入口：加载一次并以 JSON 输出耗时和内存"""
+    import pandas as pd
+    from src.utils.schema import read_flight_csv
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if case == 'default':
+        df = pd.read_csv(path, encoding='utf-8-sig')
+    elif case == 'schema':
+        df = read_flight_csv(path)
+    elif case == 'predictor':
+        spec = importlib.util.spec_from_file_location(
+            'predictor', os.path.join(PROJECT_ROOT, 'src', 'predictors', '2_predictor.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        columns = module.NUMERICAL_FEATURES + module.CATEGORICAL_FEATURES + ['价格']
+        start = time.perf_counter()
+        df = read_flight_csv(path, columns=columns)
+    else:
+        df = read_flight_csv(path, columns=['提前天数'])
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': elapsed,
+        'baseline_mb': baseline,
+        'peak_mb': peak_rss_mb(),
+        'frame_mb': df.memory_usage(deep=True).sum() / 1e6,
+        'shape': list(df.shape),
+    }))
+
+
+def build_featured(rows, path):
+    """逐块做特征工程并追加写入 CSV"""
+    from bench_storage import synthetic_day_frames
+    spec = importlib.util.spec_from_file_location(
+        'analysis', os.path.join(PROJECT_ROOT, 'src', 'analyzers', 'flight_data_analysis.py'))
+    analysis = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(analysis)
+
+    header = True
+    for frame in synthetic_day_frames(rows):
+        with contextlib.redirect_stdout(io.StringIO()):
+            featured = analysis.feature_engineering(frame)
+        featured.to_csv(path, mode='w' if header else 'a', header=header, index=False,
+                        encoding='utf-8-sig' if header else 'utf-8')
+        header = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='特征数据加载基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='数据行数')
+    parser.add_argument('--repeat', type=int, default=3, help='每种加载方式运行次数（取最快）')
+    parser.add_argument('--child', nargs=2, metavar=('CASE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        load_case(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'flight_data_featured.csv')
+        print(f"\n生成 {args.rows:,} 行特征数据...", flush=True)
+        start = time.perf_counter()
+        build_featured(args.rows, path)
+        print(f"生成用时 {time.perf_counter() - start:.1f} 秒, "
+              f"CSV {os.path.getsize(path) / 1e6:,.1f} MB", flush=True)
+
+        print("\n" + "=" * 80)
+        print(f"{'加载方式':24s} {'耗时':>8s} {'峰值 RSS':>10s} {'RSS 增量':>10s} {'DataFrame':>10s}  形状")
+        print("=" * 80)
+        baseline = None
+        for case in CASES:
+            runs = []
+            for _ in range(args.repeat):
+                out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', case, path],
+                                     capture_output=True, text=True, check=True)
+                runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            best = min(runs, key=lambda r: r['seconds'])
+            peak = min(r['peak_mb'] for r in runs)
+            delta = min(r['peak_mb'] - r['baseline_mb'] for r in runs)
+            baseline = baseline or best['seconds']
+            print(f"{CASE_NAMES[case]:24s} {best['seconds']:7.2f}s {peak:8.0f} MB {delta:8.0f} MB "
+                  f"{best['frame_mb']:7.0f} MB  {tuple(best['shape'])}  ({baseline / best['seconds']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+命令行启动基准测试：各入口的 python -X importtime 总计和启动耗时
+====================================
+
+每种模式在独立子进程中以 python -X importtime 运行，重复 --repeat 次取中位数，报告：
+
+- import 总计：importtime 输出中顶层模块的累计耗时之和（不含解释器自身启动）
+- 启动耗时：子进程从创建到退出的墙钟时间
+- 是否载入了 pandas / matplotlib / sklearn
+
+各模式只运行到入口完成启动为止，不做实际的采集、分析或训练：
+
+- check: scheduler.py --mode check（完整运行，只打印状态）
+- collect: 1_collector.py 且不设 API 密钥（载入全部模块后在创建客户端处退出）
+- query / analyze: 对应脚本 --help（模块级 import 之后由 argparse 退出）
+- train / visualize: 只载入脚本模块，不执行 main()
+- advise: 3_advisor.py（完整运行）
+- run: run.py --help
+
+--root 可以指向另一份检出（如 git worktree 中的旧版本），用于对比改造前后。
+
+使用方法:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --modes check collect --repeat 9
+    python benchmarks/bench_startup.py --root /tmp/baseline
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# 只载入脚本模块（__name__ 不是 '__main__'，不会执行 main()）
+LOAD_MODULE = ("import importlib.util, sys; "
+               "spec = importlib.util.spec_from_file_location('entry', sys.argv[1]); "
+               "spec.loader.exec_module(importlib.util.module_from_spec(spec))")
+
+MODES = {
+    'check': ['scheduler.py', '--mode', 'check'],
+    'collect': ['src/collectors/1_collector.py'],
+    'query': ['src/utils/query_store.py', '--help'],
+    'analyze': ['src/analyzers/flight_data_analysis.py', '--help'],
+    'train': ['-c', LOAD_MODULE, 'src/predictors/2_predictor.py'],
+    'visualize': ['-c', LOAD_MODULE, 'src/utils/visualize_trend.py'],
+    'advise': ['src/predictors/3_advisor.py'],
+    'run': ['run.py', '--help'],
+}
+
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'sklearn']
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+
+def run_mode(root, argv):
+    """运行一次，返回 (import 总计秒数, 墙钟秒数, 载入的重型模块)"""
+    env = {name: value for name, value in os.environ.items() if not name.startswith('AMADEUS_')}
+    env['MPLBACKEND'] = 'Agg'
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=root, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    seconds = time.perf_counter() - start
+    total_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        if not match.group(3):
+            total_us += int(match.group(2))
+        loaded.add(match.group(4).split('.')[0])
+    return total_us / 1e6, seconds, [name for name in HEAVY_MODULES if name in loaded]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='命令行启动基准测试')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES), help='要测量的模式')
+    parser.add_argument('--repeat', type=int, default=5, help='每种模式重复次数（取中位数）')
+    parser.add_argument('--root', default=PROJECT_ROOT, help='项目根目录（可指向另一份检出对比）')
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    print("\n" + "=" * 90)
+    print(f"{root}，每种模式 {args.repeat} 次取中位数")
+    print(f"{'模式':10s} {'import 总计':>12s} {'启动耗时':>10s}   载入的重型模块")
+    print("=" * 90)
+    for mode in args.modes:
+        runs = [run_mode(root, MODES[mode]) for _ in range(args.repeat)]
+        imports = statistics.median(r[0] for r in runs)
+        seconds = statistics.median(r[1] for r in runs)
+        print(f"{mode:10s} {imports:10.3f} 秒 {seconds:8.3f} 秒   {', '.join(runs[-1][2]) or '-'}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+存储格式读取基准测试：单个 CSV vs 分区列式存储
+====================================
+
+生成指定行数的合成原始数据（每个采集日期约 2500 行），分别写成 utf-8-sig CSV 和分区 Parquet 数据集，
+比较常见读取方式的耗时和文件大小：
+
+- 全部列
+- 列投影（采集日期、起飞日期、价格）
+- 列投影 + 分区裁剪（最近 7 个采集日期）
+
+使用方法:
+    python benchmarks/bench_storage.py                        # 1M 行
+    python benchmarks/bench_storage.py --rows 1000000 10000000
+    python benchmarks/bench_storage.py --rows 10000000 --keep data/bench_storage
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.collectors.mock_amadeus import CARRIERS, HUBS
+from src.collectors.offer_parser import COLUMNS
+from src.utils.partitioned_store import PartitionedStore
+
+ROWS_PER_DAY = 2500
+DAYS_PER_CHUNK = 40
+PROJECTION = ['采集日期', '起飞日期', '价格']
+
+
+def synthetic_day_frames(rows, seed=0):
+    """按采集日期分块生成合成数据，每块 DAYS_PER_CHUNK 天"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2020, 1, 1)
+    days = max(1, -(-rows // ROWS_PER_DAY))
+    carriers = np.array(CARRIERS)
+    layovers = np.array(['无'] + HUBS + [f"{a}/{b}" for a in HUBS[:2] for b in HUBS[2:]])
+    produced = 0
+    for first in range(0, days, DAYS_PER_CHUNK):
+        n_days = min(DAYS_PER_CHUNK, days - first)
+        n = min(rows - produced, n_days * ROWS_PER_DAY)
+        day_idx = first + np.arange(n) // ROWS_PER_DAY
+        ahead = rng.integers(1, 31, n)
+        fetch = np.array([(start + timedelta(days=int(d))).strftime('%Y-%m-%d') for d in range(first, first + n_days)])
+        fetch_col = fetch[day_idx - first]
+        dep_col = np.array([(start + timedelta(days=int(d) + int(a))).strftime('%Y-%m-%d')
+                            for d, a in zip(day_idx[::97], ahead[::97])])
+        dep_col = np.repeat(dep_col, 97)[:n]
+        carrier = carriers[rng.integers(0, len(carriers), n)]
+        layover = layovers[rng.integers(0, len(layovers), n)]
+        direct = layover == '无'
+        hours = rng.integers(6, 23, n)
+        minutes = rng.choice([0, 15, 30, 45], n)
+        frame = pd.DataFrame({
+            '采集日期': fetch_col,
+            '起飞日期': dep_col,
+            '提前天数': ahead,
+            '航班号': np.char.add(carrier, rng.integers(1000, 9999, n).astype(str)),
+            '航司': carrier,
+            '类型': np.where(direct, '直飞', '中转'),
+            '起飞时间': [f"{h:02d}:{m:02d}" for h, m in zip(hours, minutes)],
+            '到达时间': [f"{(h + 3) % 24:02d}:{m:02d}" for h, m in zip(hours, minutes)],
+            '总时长': [f"{d}小时{m}分" for d, m in zip(rng.integers(1, 15, n), minutes)],
+            '中转地': layover,
+            '中转时长': np.where(direct, '0', '2h10m'),
+            '剩余座位': rng.integers(1, 10, n),
+            '价格': np.round(rng.uniform(320, 1500, n), 2),
+        }, columns=COLUMNS)
+        produced += n
+        yield frame
+
+
+def build_dataset(rows, work_dir):
+    """写出 CSV 和分区数据集，返回 (CSV 路径, 数据集, 最近 7 个采集日期的起始日期)"""
+    csv_path = os.path.join(work_dir, 'flight_data.csv')
+    store = PartitionedStore(os.path.join(work_dir, 'store'))
+    header = True
+    last_fetch = None
+    for frame in synthetic_day_frames(rows):
+        frame.to_csv(csv_path, mode='w' if header else 'a', header=header, index=False,
+                     encoding='utf-8-sig' if header else 'utf-8')
+        store.append(frame, 'SZX', 'YIH')
+        header = False
+        last_fetch = frame['采集日期'].iloc[-1]
+    since = (datetime.strptime(last_fetch, '%Y-%m-%d') - timedelta(days=6)).strftime('%Y-%m-%d')
+    return csv_path, store, since
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def run(rows, work_dir, repeat):
+    print(f"\n生成 {rows:,} 行合成数据...", flush=True)
+    start = time.perf_counter()
+    csv_path, store, since = build_dataset(rows, work_dir)
+    print(f"写入用时 {time.perf_counter() - start:.1f} 秒", flush=True)
+
+    cases = [
+        ('CSV 全部列', lambda: pd.read_csv(csv_path, encoding='utf-8-sig')),
+        ('CSV 列投影', lambda: pd.read_csv(csv_path, encoding='utf-8-sig', usecols=PROJECTION)),
+        ('CSV 列投影 + 最近 7 天', lambda: (lambda df: df[df['采集日期'] >= since])(
+            pd.read_csv(csv_path, encoding='utf-8-sig', usecols=PROJECTION))),
+        ('数据集 全部列', lambda: store.read()),
+        ('数据集 列投影', lambda: store.read(columns=PROJECTION)),
+        ('数据集 列投影 + 最近 7 天', lambda: store.read(columns=PROJECTION, since=since)),
+    ]
+
+    print("\n" + "=" * 60)
+    print(f"行数: {rows:,}  CSV {os.path.getsize(csv_path) / 1e6:,.1f} MB  "
+          f"数据集 {dir_size(store.root) / 1e6:,.1f} MB ({len(store.partitions())} 个分区)")
+    print("=" * 60)
+    baseline = None
+    for name, fn in cases:
+        elapsed, n = timed(fn, repeat)
+        baseline = baseline or elapsed
+        print(f"{name:24s} {elapsed:7.3f} 秒  ({n:,} 行, {baseline / elapsed:5.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV 与分区列式存储读取基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000], help='数据行数，可指定多个')
+    parser.add_argument('--repeat', type=int, default=3, help='每种读取方式重复次数（取最快）')
+    parser.add_argument('--keep', default=None, help='保留生成的数据到该目录（默认使用临时目录并在结束后删除）')
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        if args.keep:
+            work_dir = os.path.join(args.keep, str(rows))
+            shutil.rmtree(work_dir, ignore_errors=True)
+            os.makedirs(work_dir)
+            run(rows, work_dir, args.repeat)
+        else:
+            with tempfile.TemporaryDirectory() as work_dir:
+                run(rows, work_dir, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+流式统计基准测试：一次载入内存 vs 分块流式
+====================================
+
+对不同长度的历史（合成原始 CSV，见 bench_storage.synthetic_day_frames），分别在独立子进程中运行：
+
+- 内存模式：load_data 载入全部数据，特征工程、写特征 CSV、汇总统计、basic_statistics、generate_summary_report
+- 流式模式：streaming_analysis 按 --chunk-mb 分块两遍扫描（不绘图，两种模式都不计图表耗时）
+
+报告耗时和子进程峰值内存（ru_maxrss），并校验两种模式的特征 CSV 逐字节相同、
+报告中不同的行（只应有近似的价格中位数）及其相对误差。流式模式的峰值内存应不随历史长度增长。
+
+使用方法:
+    python benchmarks/bench_streaming_stats.py                           # 250k / 1M / 4M 行，16 MB 分块
+    python benchmarks/bench_streaming_stats.py --rows 1000000 --chunk-mb 64
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from bench_feature_engineering import load_analysis
+from bench_incremental_features import file_digest, write_raw
+
+
+def child(mode, raw, work_dir, chunk_mb):
+    """在子进程中运行一种模式，输出 JSON 结果"""
+    config.MANIFEST_FILE = os.path.join(work_dir, f'manifest_{mode}.json')
+    analysis = load_analysis()
+    featured = os.path.join(work_dir, f'featured_{mode}.csv')
+    output_dir = os.path.join(work_dir, f'report_{mode}')
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'memory':
+            df = analysis.load_data(raw)
+            df_featured = analysis.feature_engineering(df)
+            analysis.save_featured(df_featured, featured)
+            summary = analysis.AnalysisSummary.from_frames(df, df_featured)
+            analysis.basic_statistics(summary)
+            report = analysis.generate_summary_report(summary, output_dir)
+        else:
+            analysis.exploratory_analysis = lambda summary, directory: directory
+            report = analysis.streaming_analysis(raw, featured, output_dir, chunk_mb * 1024 * 1024)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'featured': featured,
+        'report': report,
+    }))
+
+
+def run_child(mode, raw, work_dir, chunk_mb):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', mode, '--raw', raw,
+                             '--work-dir', work_dir, '--chunk-mb', str(chunk_mb)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report_differences(path_a, path_b):
+    """两份报告中不同的行，以及其中数值的最大相对误差"""
+    with open(path_a, encoding='utf-8') as f:
+        lines_a = f.read().splitlines()
+    with open(path_b, encoding='utf-8') as f:
+        lines_b = f.read().splitlines()
+    differing = [(a, b) for a, b in zip(lines_a, lines_b) if a != b]
+    error = 0.0
+    for a, b in differing:
+        for x, y in zip(re.findall(r'-?\d+\.?\d*', a), re.findall(r'-?\d+\.?\d*', b)):
+            if float(y):
+                error = max(error, abs(float(x) - float(y)) / abs(float(y)))
+    return [a.split(':')[0].strip() for a, _ in differing], error
+
+
+def run(rows, work_dir, chunk_mb):
+    raw = os.path.join(work_dir, f'raw_{rows}.csv')
+    write_raw(raw, rows, 0)
+    memory = run_child('memory', raw, work_dir, chunk_mb)
+    streaming = run_child('streaming', raw, work_dir, chunk_mb)
+    identical = file_digest(memory['featured']) == file_digest(streaming['featured'])
+    differing, error = report_differences(streaming['report'], memory['report'])
+    print(f"{rows:>12,} {memory['seconds']:8.1f} 秒 {memory['peak_mb']:8,.0f} MB "
+          f"{streaming['seconds']:8.1f} 秒 {streaming['peak_mb']:8,.0f} MB   {'✅' if identical else '❌'}   "
+          f"{'、'.join(differing) or '无'} (最大相对误差 {error:.3%})", flush=True)
+    for name in (raw, memory['featured'], streaming['featured']):
+        os.remove(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='流式统计基准测试')
+    parser.add_argument('--rows', type=int, nargs='+', default=[250_000, 1_000_000, 4_000_000],
+                        help='历史行数')
+    parser.add_argument('--chunk-mb', type=int, default=16, help='流式模式每块读取的 MB 数')
+    parser.add_argument('--child', choices=['memory', 'streaming'], help=argparse.SUPPRESS)
+    parser.add_argument('--raw', help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.raw, args.work_dir, args.chunk_mb)
+        return
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        print("\n" + "=" * 100)
+        print(f"{'行数':>10s} {'内存模式':>12s} {'峰值内存':>8s} {'流式模式':>12s} {'峰值内存':>8s}   "
+              f"特征一致   报告差异")
+        print("=" * 100)
+        for rows in args.rows:
+            run(rows, work_dir, args.chunk_mb)
+
+
+if __name__ == "__main__":
+    main()
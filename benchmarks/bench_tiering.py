@@ -0,0 +1,102 @@
+"""
+冷热分层基准测试
+====================================
+
+按天模拟采集：每天两轮合成快照（见 bench_price_intervals.sticky_day_frames）追加写入分区数据集，
+合并当天分区后执行 TieredStore.roll()。报告：
+
+- 每天维护分层的耗时随历史长度的变化（整月滚动摊到每天后应与新增数据量相当，不随历史增长）
+- 结束时全明细数据集 vs 热 + 冷两层的行数和磁盘占用
+- 分析读取全部历史的耗时：全明细 vs 分层
+
+使用方法:
+    python benchmarks/bench_tiering.py                       # 365 天, 热窗口 60 天
+    python benchmarks/bench_tiering.py --days 730 --hot-days 30
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from bench_price_intervals import FLIGHTS, RUNS_PER_DAY, SCAN_DAYS, sticky_day_frames
+from src.utils.partitioned_store import PartitionedStore
+from src.utils.tiered_store import TieredStore
+
+ROUTE = ('SZX', 'YIH')
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷热分层基准测试')
+    parser.add_argument('--days', type=int, default=365, help='模拟的采集天数')
+    parser.add_argument('--hot-days', type=int, default=60, help='热窗口天数')
+    parser.add_argument('--change-rate', type=float, default=0.1, help='每个报价每天价格/座位变化的概率')
+    args = parser.parse_args()
+
+    rows = args.days * SCAN_DAYS * FLIGHTS * RUNS_PER_DAY
+    with tempfile.TemporaryDirectory() as work_dir:
+        full = PartitionedStore(os.path.join(work_dir, 'full'))
+        tiers = TieredStore(os.path.join(work_dir, 'hot'), os.path.join(work_dir, 'cold'), args.hot_days)
+
+        print(f"\n模拟 {args.days} 天采集（每天 {SCAN_DAYS * FLIGHTS * RUNS_PER_DAY:,} 行），热窗口 {args.hot_days} 天...",
+              flush=True)
+        roll_times = []
+        for frame in sticky_day_frames(rows, args.change_rate):
+            fetch_date = frame['采集日期'].iloc[0]
+            size = len(frame) // RUNS_PER_DAY
+            for first in range(0, len(frame), size):
+                run = frame.iloc[first:first + size]
+                full.append(run, *ROUTE)
+                tiers.hot.append(run, *ROUTE)
+            full.compact(since=fetch_date, until=fetch_date)
+            start = time.perf_counter()
+            tiers.hot.compact(since=fetch_date, until=fetch_date)
+            tiers.roll(today=fetch_date)
+            roll_times.append(time.perf_counter() - start)
+
+        print("\n" + "=" * 60)
+        print("每天维护分层的耗时（合并当天分区 + 滚动，按 30 天分段）")
+        print("=" * 60)
+        for first in range(0, args.days, 30):
+            window = roll_times[first:first + 30]
+            print(f"第 {first + 1:4d}-{first + len(window):4d} 天  平均 {np.mean(window) * 1000:7.1f} ms  "
+                  f"最大 {np.max(window) * 1000:7.1f} ms")
+
+        full_rows = len(full.read(columns=['价格']))
+        hot_rows = len(tiers.hot.read(columns=['价格']))
+        cold_rows = len(tiers.cold.read(columns=['价格']))
+        print("\n" + "=" * 60)
+        print(f"全明细: {full_rows:,} 行, {dir_size(full.root) / 1e6:,.1f} MB")
+        print(f"分层:   热 {hot_rows:,} 行 {dir_size(tiers.hot.root) / 1e6:,.1f} MB + "
+              f"冷 {cold_rows:,} 行 {dir_size(tiers.cold.root) / 1e6:,.1f} MB "
+              f"(行数 {full_rows / (hot_rows + cold_rows):.1f}x)")
+        print("=" * 60)
+
+        full_s, _ = best_of(lambda: full.read(routes=[ROUTE]))
+        tiered_s, n = best_of(lambda: tiers.read(routes=[ROUTE]))
+        print(f"分析读取全部历史: 全明细 {full_s:.3f} 秒 ({full_rows:,} 行)  分层 {tiered_s:.3f} 秒 ({n:,} 行)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+采集器压测
+====================================
+
+在本地模拟 Amadeus 服务上运行完整采集流程（限流 + 重试 + 解析，可选流式写盘），
+报告吞吐量、单次请求延迟 p50/p99 和峰值内存，用于离线衡量采集器的每一项性能改动。
+模拟服务与采集器运行在同一进程中，服务端的 JSON 序列化也计入 CPU 开销和峰值 RSS。
+
+使用方法:
+    python benchmarks/load_test_collector.py
+    python benchmarks/load_test_collector.py --routes 100 --workers 32 --rate 0 --latency 0.05 --jitter 0.1
+    python benchmarks/load_test_collector.py --offers 50 250 --error-rate 0.05 --empty-rate 0.1 --stream
+    python benchmarks/load_test_collector.py --recorded data/archive
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+
+from src.collectors.checkpoint import ScanCheckpoint, StreamingScanWriter
+from src.collectors.mock_amadeus import MockAmadeusServer, load_recorded_responses, synthetic_routes
+from src.collectors.rate_limiter import TokenBucket
+from src.collectors.retry import RetryPolicy, CircuitBreaker, ResilientCaller
+from src.collectors.scan_engine import build_target_dates, build_work_units, scan_routes
+
+
+def instrument_latency(client):
+    """包装 flight_offers_search.get，记录每次请求（含失败）的耗时"""
+    search = client.shopping.flight_offers_search
+    original = search.get
+    latencies = []
+    lock = threading.Lock()
+
+    def timed_get(**params):
+        start = time.perf_counter()
+        try:
+            return original(**params)
+        finally:
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    search.get = timed_get
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='采集器压测')
+    parser.add_argument('--routes', type=int, default=10, help='合成航线数')
+    parser.add_argument('--days', type=int, default=30, help='扫描天数')
+    parser.add_argument('--workers', type=int, default=16, help='并发请求数')
+    parser.add_argument('--rate', type=float, default=0, help='令牌桶速率（次/秒），0 表示不限流')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟接口固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.05, help='模拟接口随机附加延迟上限（秒）')
+    parser.add_argument('--offers', type=int, nargs='+', default=[20], help='每天报价数，或 最少 最多')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='随机失败比例')
+    parser.add_argument('--empty-rate', type=float, default=0.0, help='返回无航班的比例')
+    parser.add_argument('--recorded', default=None, help='使用该归档目录中录制的响应')
+    parser.add_argument('--stream', action='store_true', help='结果流式写入临时目录（包含磁盘 IO）')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='用 tracemalloc 统计 Python 峰值分配（开销较大，会拉高延迟）')
+    args = parser.parse_args()
+
+    offers = args.offers[0] if len(args.offers) == 1 else tuple(args.offers[:2])
+    recorded = load_recorded_responses(args.recorded) if args.recorded else None
+    routes = synthetic_routes(args.routes)
+    units = build_work_units(routes, build_target_dates(args.days))
+
+    server = MockAmadeusServer(latency=args.latency, latency_jitter=args.jitter, offers_per_day=offers,
+                               error_rate=args.error_rate, error_status=503,
+                               empty_rate=args.empty_rate, recorded=recorded)
+    caller = ResilientCaller(RetryPolicy(max_attempts=4, base_delay=0.05, max_delay=1.0),
+                             CircuitBreaker(failure_threshold=10, cooldown=5.0))
+    limiter = TokenBucket(args.rate, max(1, args.workers))
+
+    with server, tempfile.TemporaryDirectory() as tmp_dir:
+        client = server.client()
+        latencies = instrument_latency(client)
+        sink = None
+        if args.stream:
+            checkpoint = ScanCheckpoint.create(tmp_dir, 'load-test', '2026-01-01', units)
+            sink = StreamingScanWriter(checkpoint, lambda o, d: os.path.join(tmp_dir, f'{o}_{d}.csv'))
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        start = time.perf_counter()
+        frames = scan_routes(client, routes, None, '2026-01-01', mode='concurrent',
+                             workers=args.workers, limiter=limiter, units=units,
+                             sink=sink, caller=caller)
+        elapsed = time.perf_counter() - start
+        peak_traced = None
+        if args.tracemalloc:
+            _, peak_traced = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    if sink is not None:
+        rows = sum(sink.rows_written.values())
+    else:
+        rows = sum(len(df) for dfs in frames.values() for df in dfs)
+    lat_ms = np.array(latencies) * 1000
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print("\n" + "=" * 60)
+    print(f"航线: {len(routes)}  单元: {len(units)}  并发: {args.workers}  限流: {args.rate or '无'}"
+          f"  延迟: {args.latency}+U(0,{args.jitter})s  流式写盘: {args.stream}")
+    print("=" * 60)
+    print(f"总耗时:     {elapsed:.2f} 秒")
+    print(f"吞吐量:     {len(units) / elapsed:,.1f} 单元/秒, {rows / elapsed:,.0f} 行/秒 (共 {rows} 行)")
+    print(f"请求延迟:   p50 {np.percentile(lat_ms, 50):.1f} ms, p99 {np.percentile(lat_ms, 99):.1f} ms"
+          f" ({len(lat_ms)} 次请求)")
+    traced = f"Python 分配 {peak_traced / 1024 / 1024:.1f} MB, " if peak_traced is not None else ""
+    print(f"峰值内存:   {traced}进程 RSS {peak_rss_mb:.1f} MB")
+    print(f"重试统计:   {caller.stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
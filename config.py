@@ -14,6 +14,15 @@ PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 RAW_DATA_DIR = os.path.join(DATA_DIR, 'raw')
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, 'processed')
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'archive')  # 原始 API 响应归档
+CHECKPOINT_DIR = os.path.join(DATA_DIR, 'checkpoints')  # 采集断点续采检查点
+NEGATIVE_CACHE_FILE = os.path.join(DATA_DIR, 'negative_cache.json')  # 无航班负缓存
+STORE_DIR = os.path.join(DATA_DIR, 'store')  # 按 航线/采集日期 分区的 Parquet 数据集
+COLD_STORE_DIR = os.path.join(DATA_DIR, 'store_cold')  # 超出热窗口的历史日聚合（冷数据）
+QUERY_DB_FILE = os.path.join(DATA_DIR, 'flights.sqlite')  # 带索引的价格查询库
+MANIFEST_FILE = os.path.join(DATA_DIR, 'manifest.json')  # 数据集清单（行数、大小、日期范围、哈希）
+CALL_LEDGER_FILE = os.path.join(DATA_DIR, 'call_ledger.json')  # 每月实际发出的 API 调用次数（月度预算扣减）
+INTERVALS_DIR = os.path.join(DATA_DIR, 'intervals')  # 价格有效区间（快照压缩）
 
 # 模型目录
 MODELS_DIR = os.path.join(PROJECT_ROOT, 'models')
@@ -50,9 +59,50 @@ AMADEUS_CLIENT_SECRET = os.getenv('AMADEUS_CLIENT_SECRET', '')
 ORIGIN = "SZX"  # 深圳
 DESTINATION = "YIH"  # 宜昌
 
+# 多航线配置：(出发地, 目的地) 列表，采集器在同一进程内并发扫描所有航线
+# 若项目根目录存在 routes.json（形如 [["SZX", "YIH"], ["SZX", "PEK"]]），则以其为准
+ROUTES = [(ORIGIN, DESTINATION)]
+ROUTES_FILE = os.path.join(PROJECT_ROOT, 'routes.json')
+
 # 扫描配置
 SCAN_DAYS = 30  # 扫描未来30天
 
+# 采集并发配置
+# Amadeus 测试环境配额：10 次/秒，且每 100ms 不超过 1 次请求
+COLLECT_MODE = 'concurrent'  # 可选: 'sequential', 'concurrent'
+COLLECT_WORKERS = 8          # 并发模式下同时在途的请求数
+API_RATE_LIMIT = 10          # 令牌桶速率（次/秒），所有线程共享
+API_BURST = 1                # 令牌桶容量（允许的突发请求数）
+ARCHIVE_RAW_RESPONSES = True # 是否归档原始 API 响应（用于离线回放重建数据）
+WRITE_PARTITIONED_STORE = True  # 采集结果是否同时写入分区列式存储 STORE_DIR（需要 pyarrow）
+SYNC_QUERY_STORE = True      # 采集结束后是否把新增数据增量导入查询库 QUERY_DB_FILE
+
+# 冷热分层：分区数据集只保留最近 HOT_RETENTION_DAYS 天的明细，更早的按报价每天聚合为最低/中位/最高价移入 COLD_STORE_DIR
+# 原始 CSV 仍完整追加；分析和扫描规划从数据集读取时自动合并两层
+TIERED_STORE_ENABLED = True
+HOT_RETENTION_DAYS = 60       # 不应小于 PLANNER_HISTORY_DAYS
+
+# 重试与熔断配置（仅对网络错误、429、5xx 重试）
+RETRY_MAX_ATTEMPTS = 4        # 每个请求最多尝试次数（含第一次）
+RETRY_BASE_DELAY = 1.0        # 指数退避基数（秒），带随机抖动；有 Retry-After 时以其为准
+RETRY_MAX_DELAY = 30.0        # 单次退避上限（秒）
+BREAKER_FAILURE_THRESHOLD = 5 # 同一航线连续失败多少次后熔断
+BREAKER_COOLDOWN = 60.0       # 熔断后多少秒放行一次试探请求
+
+# 自适应扫描规划（采集器 --plan 时启用）
+# 按价格波动、临近程度和距上次采集时间为 (航线, 起飞日期) 打分，在预算内优先查询价值最高的单元
+SCAN_RUN_BUDGET = None        # 单次运行最多调用次数，None 表示按月度预算折算
+SCAN_MONTHLY_BUDGET = None    # 每月调用预算，None 表示不限；扣除 CALL_LEDGER_FILE 中本月已用次数后按剩余运行次数平分
+PLANNER_HISTORY_DAYS = 14     # 规划时参考最近多少天的采集历史
+PLANNER_ALWAYS_DAYS = 3       # 提前天数不超过该值的日期始终查询
+
+# 无航班负缓存：最近返回“无航班”的 (航线, 起飞日期 / 星期几) 在 TTL 内跳过，只抽样复查
+NEGATIVE_CACHE_ENABLED = True
+NEGATIVE_CACHE_TTL_DAYS = 7           # 条目有效天数
+NEGATIVE_CACHE_SAMPLE_RATE = 0.2      # 命中缓存的日期仍被查询的概率
+NEGATIVE_CACHE_WEEKDAY_THRESHOLD = 3  # 同一星期几在多少个不同采集周里无航班后跳过该星期几（每周最多计一次）
+PRESCAN_ENABLED = False               # 正式扫描前是否用 flight-dates 接口预扫描（每条航线 1 次调用）
+
 # 模型配置
 MODEL_TYPE = 'random_forest'  # 可选: 'random_forest', 'gradient_boosting'
 TEST_SIZE = 0.2
@@ -61,6 +111,15 @@ RANDOM_STATE = 42
 # 可视化配置
 FIGURE_DPI = 300
 FIGURE_FORMAT = 'png'
+CHART_WORKERS = None             # 分析图表绘图进程数，None 表示 CPU 核数，1 表示在分析进程中依次绘制
+
+# 特征工程配置
+INCREMENTAL_FEATURES = True      # 调度器只对新增原始数据做特征工程并追加到特征数据集，图表和报告照常重新生成（run.py --mode analyze 仍全量分析）
+FEATURE_DRIFT_THRESHOLD = 0.05   # 归一化用的最小/最大值超出已用范围的比例超过该值（或主要航司变化）时全量重算
+FEATURE_WORKERS = None           # 特征工程进程数，None 表示 CPU 核数，1 表示单进程
+FEATURE_PARALLEL_MIN_ROWS = 1_000_000  # 数据少于该行数时不值得启动进程池，仍单进程计算
+ANALYSIS_STREAMING = False       # 全量分析改为分块流式统计（历史数据无法一次载入内存时开启，中位数等为近似值）
+STREAMING_CHUNK_MB = 64          # 流式分析每块读取的原始数据大小
 
 # ========================================
 # 调度周期配置
@@ -109,10 +168,29 @@ LOG_FILE = os.path.join(LOG_DIR, 'system.log')
 LOG_KEEP_DAYS = 30
 
 
+def load_routes(path=ROUTES_FILE):
+    """读取航线列表，routes.json 不存在时使用 ROUTES"""
+    if os.path.exists(path):
+        import json
+        with open(path, 'r', encoding='utf-8') as f:
+            return [(origin.upper(), destination.upper()) for origin, destination in json.load(f)]
+    return list(ROUTES)
+
+
+def route_data_file(origin, destination):
+    """航线对应的原始数据文件，SZX->YIH 即 RAW_DATA_FILE"""
+    return os.path.join(RAW_DATA_DIR, f'{origin.lower()}_{destination.lower()}_flight_data_cn.csv')
+
+
+def route_interval_file(origin, destination):
+    """航线对应的价格区间文件"""
+    return os.path.join(INTERVALS_DIR, f'{origin.lower()}_{destination.lower()}_price_intervals.csv')
+
+
 def ensure_directories():
     """确保所有必要的目录存在"""
     directories = [
-        DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR,
+        DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, ARCHIVE_DIR,
         MODELS_DIR, OUTPUTS_DIR, FIGURES_DIR, REPORTS_DIR
     ]
 
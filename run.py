@@ -5,7 +5,7 @@
 统一入口脚本，用于运行系统的各个模块。
 
 使用方法:
-    python run.py --mode [analyze|train|predict|advise|collect]
+    python run.py --mode [analyze|train|predict|advise|collect|replay|query]
     或
     python run.py --all
 
@@ -14,6 +14,8 @@
     python run.py --mode train      # 训练模型
     python run.py --mode predict    # 预测价格
     python run.py --mode collect    # 采集数据
+    python run.py --mode replay     # 从原始响应归档离线重建数据
+    python run.py --mode query --flight CZ3456 --date 2026-11-02   # 查询价格历史
     python run.py --mode advise     # 获取购买建议
     python run.py --all             # 运行完整流程
 """
@@ -49,8 +51,35 @@ def run_collector():
         print(f"错误: 找不到文件 {script_path}")
 
 
-def run_analyzer():
-    """运行数据分析器"""
+def run_replay():
+    """从原始响应归档离线重建原始数据"""
+    print("\n" + "="*80)
+    print("回放原始响应归档...")
+    print("="*80 + "\n")
+
+    script_path = os.path.join(SRC_DIR, 'collectors', 'replay_archive.py')
+    if os.path.exists(script_path):
+        subprocess.run([sys.executable, script_path])
+    else:
+        print(f"错误: 找不到文件 {script_path}")
+
+
+def run_query(extra_args=()):
+    """查询价格库（其余参数原样传给 src/utils/query_store.py）"""
+    script_path = os.path.join(SRC_DIR, 'utils', 'query_store.py')
+    if os.path.exists(script_path):
+        subprocess.run([sys.executable, script_path, '--sync', *extra_args])
+    else:
+        print(f"错误: 找不到文件 {script_path}")
+
+
+def run_analyzer(incremental=False):
+    """
+    运行数据分析器
+
+    参数:
+        incremental: 只对新增原始数据做特征工程，再由完整的特征数据集重新生成图表和报告
+    """
     print("\n" + "="*80)
     print("运行数据分析器...")
     print("="*80 + "\n")
@@ -70,8 +99,17 @@ def run_analyzer():
     if not os.path.exists(backup_path):
         shutil.copy2(script_path, backup_path)
 
-    # 更新数据文件路径
+    # 更新数据文件路径（分区数据集已导入全部历史时，完整分析直接从数据集读取；
+    # 增量模式按原始 CSV 的字节偏移续读，原始 CSV 仍完整追加，因此始终读 CSV）
     raw_data_file = os.path.join(RAW_DATA_DIR, 'szx_yih_flight_data_cn.csv')
+    try:
+        from config import ORIGIN, DESTINATION, STORE_DIR
+        from src.utils.partitioned_store import PartitionedStore
+        if not incremental and PartitionedStore(STORE_DIR).has_full_history(ORIGIN, DESTINATION):
+            raw_data_file = STORE_DIR
+            print(f"从分区数据集读取: {STORE_DIR}")
+    except ImportError:
+        pass
     output_dir = os.path.join(OUTPUTS_DIR, 'reports')
     featured_output = os.path.join(PROCESSED_DATA_DIR, 'flight_data_featured.csv')
 
@@ -98,7 +136,7 @@ def run_analyzer():
         f.write(content)
 
     try:
-        subprocess.run([sys.executable, script_path])
+        subprocess.run([sys.executable, script_path] + (['--incremental'] if incremental else []))
     finally:
         # 恢复原始内容
         with open(script_path, 'w', encoding='utf-8') as f:
@@ -211,6 +249,10 @@ def main():
   python run.py --mode train       # 训练模型
   python run.py --mode predict     # 预测价格
   python run.py --mode collect     # 采集数据
+  python run.py --mode replay      # 从原始响应归档离线重建数据
+  python run.py --mode query --flight CZ3456 --date 2026-11-02          # 航班价格历史
+  python run.py --mode query --dep-from 2026-11-01 --dep-to 2026-11-30 --cheapest
+  python run.py --mode query --date 2026-11-02 --flex 3                 # ±3 天内最低价
   python run.py --mode advise      # 获取购买建议
   python run.py --mode visualize   # 生成可视化
   python run.py --all              # 运行完整流程
@@ -220,16 +262,21 @@ def main():
     parser.add_argument(
         '--mode',
         type=str,
-        choices=['analyze', 'train', 'predict', 'collect', 'advise', 'visualize', 'all'],
+        choices=['analyze', 'train', 'predict', 'collect', 'replay', 'query', 'advise', 'visualize', 'all'],
         default='all',
         help='运行模式'
     )
 
-    args = parser.parse_args()
+    # query 模式的其余参数（--flight、--date 等）交给查询脚本解析
+    args, extra_args = parser.parse_known_args()
+    if extra_args and args.mode != 'query':
+        parser.error(f"无法识别的参数: {' '.join(extra_args)}")
 
     # 根据模式运行对应的函数
     mode_functions = {
         'collect': run_collector,
+        'replay': run_replay,
+        'query': lambda: run_query(extra_args),
         'analyze': run_analyzer,
         'train': run_predictor,
         'predict': run_predictor,
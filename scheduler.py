@@ -27,7 +27,6 @@ import time
 import argparse
 import logging
 from datetime import datetime, timedelta
-import pandas as pd
 
 # 添加项目根目录到路径
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
@@ -35,6 +34,7 @@ sys.path.insert(0, PROJECT_ROOT)
 
 # 导入配置
 from config import *
+from src.utils.manifest import DatasetManifest
 
 # 设置日志
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -133,12 +133,15 @@ class TaskScheduler:
 
         return False
 
+    def featured_row_count(self):
+        """特征数据集行数（来自数据集清单，文件被其他程序改动过时才重新扫描）"""
+        return DatasetManifest(MANIFEST_FILE).rows(FEATURED_DATA_FILE)
+
     def get_new_data_count(self):
         """获取新增数据量"""
         try:
             if os.path.exists(FEATURED_DATA_FILE):
-                df = pd.read_csv(FEATURED_DATA_FILE)
-                current_count = len(df)
+                current_count = self.featured_row_count()
 
                 if self.state['data_count'] > 0:
                     return current_count - self.state['data_count']
@@ -177,12 +180,11 @@ class TaskScheduler:
 
         try:
             from run import run_analyzer
-            run_analyzer()
+            run_analyzer(incremental=INCREMENTAL_FEATURES)
 
             # 更新数据量
             if os.path.exists(FEATURED_DATA_FILE):
-                df = pd.read_csv(FEATURED_DATA_FILE)
-                self.state['data_count'] = len(df)
+                self.state['data_count'] = self.featured_row_count()
 
             self.state['last_analysis'] = datetime.now().isoformat()
             self.save_state()
@@ -292,8 +294,14 @@ class TaskScheduler:
         print(f"\n📈 数据统计:")
         print(f"  当前数据量: {self.state['data_count']:,} 条")
         if os.path.exists(FEATURED_DATA_FILE):
-            df = pd.read_csv(FEATURED_DATA_FILE)
-            print(f"  实际数据量: {len(df):,} 条")
+            print(f"  实际数据量: {self.featured_row_count():,} 条")
+        manifest = DatasetManifest(MANIFEST_FILE)
+        for origin, destination in load_routes():
+            entry = manifest.entry(route_data_file(origin, destination))
+            if entry is not None:
+                fetched = entry['dates'].get('采集日期', ['-', '-'])
+                print(f"  {origin} -> {destination}: {entry['rows']:,} 条, {entry['bytes'] / 1e6:,.1f} MB, "
+                      f"采集日期 {fetched[0]} ~ {fetched[1]}")
 
         print("\n" + "="*60)
 
@@ -3,50 +3,85 @@
 分析 szx_yih_flight_data_cn.csv 数据集
 """
 
+import os
+import sys
+import time
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
-plt.rcParams['axes.unicode_minus'] = False
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.utils.features import (PRICE_BINS, PRICE_LABELS, DistinctValues, FeatureState, FeatureStats,
+                                clock_hour, date_parts, feature_state_file, load_spilled, spill_frame,
+                                parse_duration, parse_transfer_duration, seat_category, time_period,
+                                transfer_count)
+from src.utils.manifest import DatasetManifest, date_ranges
+from src.utils.price_intervals import expand_intervals, is_interval_file, read_intervals
+from src.utils.schema import DATE_COLUMNS, RAW_COLUMNS, iter_flight_csv, read_flight_csv, read_flight_csv_tail
+from src.utils.streaming_stats import AnalysisSummary
 
 def load_data(filepath):
-    """加载CSV数据"""
-    df = pd.read_csv(filepath, encoding='utf-8-sig')
+    """
+    加载CSV数据
+
+    filepath 为分区数据集目录时，从列式存储读取配置中的航线（启用冷热分层时合并近期明细和历史日聚合）；
+    为价格区间文件时还原为快照
+    """
+    if os.path.isdir(filepath):
+        from config import ORIGIN, DESTINATION, COLD_STORE_DIR, TIERED_STORE_ENABLED, HOT_RETENTION_DAYS
+        from src.utils.partitioned_store import PartitionedStore
+        from src.utils.tiered_store import TieredStore
+        if TIERED_STORE_ENABLED:
+            store = TieredStore(filepath, COLD_STORE_DIR, HOT_RETENTION_DAYS)
+        else:
+            store = PartitionedStore(filepath)
+        df = store.read(routes=[(ORIGIN, DESTINATION)])
+    elif is_interval_file(filepath):
+        df = expand_intervals(read_intervals(filepath))
+    else:
+        # 特征数据需与原实现逐字节一致：只用小整数和列投影，价格保持 float64、字符串保持 object
+        df = read_flight_csv(filepath, columns=RAW_COLUMNS, categorical=False, float32=False,
+                             parse_dates=False)
     print(f"数据集形状: {df.shape}")
     print(f"\n数据集前5行:")
     print(df.head())
     return df
 
-def basic_statistics(df):
-    """基础统计分析"""
+def basic_statistics(summary):
+    """基础统计分析（数据来自汇总统计量 AnalysisSummary）"""
     print("\n" + "="*80)
     print("基础统计信息")
     print("="*80)
 
     print("\n数据类型:")
-    print(df.dtypes)
+    print(summary.dtypes)
 
     print("\n缺失值统计:")
-    print(df.isnull().sum())
+    print(summary.nulls)
 
     print("\n数值型字段统计:")
-    print(df.describe())
+    print(summary.describe())
 
     print("\n分类字段统计:")
     categorical_cols = ['航司', '类型', '中转地']
     for col in categorical_cols:
-        if col in df.columns:
+        if col in summary.columns:
             print(f"\n{col} 分布:")
-            print(df[col].value_counts().head(10))
+            print(summary.value_counts(col).head(10))
+
+def feature_engineering(df, stats=None):
+    """
+    特征工程和特征提取
 
-def feature_engineering(df):
-    """特征工程和特征提取"""
+    参数:
+        df: 原始数据
+        stats: 归一化和主要航司使用的全局统计量（FeatureStats），None 表示由 df 本身计算；
+               增量处理时传入特征数据集已使用的统计量，使新旧行口径一致
+    """
     print("\n" + "="*80)
     print("特征工程")
     print("="*80)
@@ -56,70 +91,42 @@ def feature_engineering(df):
     # 1. 时间特征提取
     print("\n[1] 提取时间特征...")
 
-    # 转换日期列
-    df_new['采集日期'] = pd.to_datetime(df_new['采集日期'])
-    df_new['起飞日期'] = pd.to_datetime(df_new['起飞日期'])
+    # 转换日期列（按唯一值解析一次再广播）
+    collected = date_parts(df_new['采集日期'])
+    departure = date_parts(df_new['起飞日期'])
+    df_new['采集日期'] = collected['日期']
+    df_new['起飞日期'] = departure['日期']
 
     # 提取日期特征
-    df_new['采集_星期'] = df_new['采集日期'].dt.dayofweek
-    df_new['采集_月份'] = df_new['采集日期'].dt.month
-    df_new['采集_日期'] = df_new['采集日期'].dt.day
+    df_new['采集_星期'] = collected['星期']
+    df_new['采集_月份'] = collected['月份']
+    df_new['采集_日期'] = collected['日期数']
 
-    df_new['起飞_星期'] = df_new['起飞日期'].dt.dayofweek
-    df_new['起飞_月份'] = df_new['起飞日期'].dt.month
-    df_new['起飞_日期'] = df_new['起飞日期'].dt.day
+    df_new['起飞_星期'] = departure['星期']
+    df_new['起飞_月份'] = departure['月份']
+    df_new['起飞_日期'] = departure['日期数']
 
     # 2. 起飞和到达时间特征
     print("[2] 处理起飞和到达时间...")
-    df_new['起飞小时'] = pd.to_datetime(df_new['起飞时间'], format='%H:%M').dt.hour
-    df_new['到达小时'] = pd.to_datetime(df_new['到达时间'], format='%H:%M').dt.hour
-
-    # 时间段分类
-    def get_time_period(hour):
-        if 6 <= hour < 12:
-            return '上午'
-        elif 12 <= hour < 18:
-            return '下午'
-        elif 18 <= hour < 24:
-            return '晚上'
-        else:
-            return '凌晨'
+    df_new['起飞小时'] = clock_hour(df_new['起飞时间'])
+    df_new['到达小时'] = clock_hour(df_new['到达时间'])
 
-    df_new['起飞时段'] = df_new['起飞小时'].apply(get_time_period)
-    df_new['到达时段'] = df_new['到达小时'].apply(get_time_period)
+    # 时间段分类：6-12 上午，12-18 下午，18-24 晚上，其余凌晨
+    df_new['起飞时段'] = time_period(df_new['起飞小时'])
+    df_new['到达时段'] = time_period(df_new['到达小时'])
 
     # 3. 飞行时长特征（转换为分钟）
     print("[3] 计算飞行时长...")
-    def parse_duration(duration_str):
-        """解析时长字符串，返回分钟数"""
-        if '小时' in duration_str:
-            parts = duration_str.replace('小时', 'h').replace('分', 'm').split('h')
-            hours = int(parts[0])
-            minutes = int(parts[1].replace('m', '')) if 'm' in parts[1] else 0
-            return hours * 60 + minutes
-        return 0
-
-    df_new['飞行时长_分钟'] = df_new['总时长'].apply(parse_duration)
+    df_new['飞行时长_分钟'] = DistinctValues(df_new['总时长']).map(parse_duration)
 
     # 4. 中转时长特征（转换为分钟）
     print("[4] 计算中转时长...")
-    def parse_transfer_duration(duration_str):
-        """解析中转时长，返回分钟数"""
-        if pd.isna(duration_str) or duration_str == '':
-            return 0
-        duration_str = str(duration_str).lower().replace('h', '').replace('m', '')
-        if ' ' in duration_str:
-            parts = duration_str.split()
-            if len(parts) == 2:
-                return int(parts[0]) * 60 + int(parts[1])
-        return 0
-
-    df_new['中转时长_分钟'] = df_new['中转时长'].apply(parse_transfer_duration)
+    df_new['中转时长_分钟'] = DistinctValues(df_new['中转时长']).map(parse_transfer_duration)
 
     # 5. 中转特征
     print("[5] 提取中转特征...")
     # 中转次数（通过中转地计算）
-    df_new['中转次数'] = df_new['中转地'].apply(lambda x: len(str(x).split('/')) if pd.notna(x) else 0)
+    df_new['中转次数'] = DistinctValues(df_new['中转地']).map(transfer_count)
 
     # 是否有中转
     df_new['是否有中转'] = (df_new['中转次数'] > 0).astype(int)
@@ -127,32 +134,22 @@ def feature_engineering(df):
     # 6. 航司特征
     print("[6] 编码航司特征...")
     # 主要航司标识
-    top_airlines = df_new['航司'].value_counts().head(5).index.tolist()
-    df_new['主要航司'] = df_new['航司'].apply(lambda x: 1 if x in top_airlines else 0)
+    if stats is None:
+        stats = FeatureStats.from_frame(df_new)
+    top_airlines = stats.top_airlines
+    df_new['主要航司'] = df_new['航司'].isin(top_airlines).astype(int)
 
     # 7. 价格特征
     print("[7] 分析价格特征...")
     df_new['价格_百元'] = df_new['价格'] / 100
 
     # 价格分段
-    price_bins = [0, 400, 500, 600, 800, 10000]
-    price_labels = ['低价(<400)', '中低价(400-500)', '中价(500-600)', '中高价(600-800)', '高价(>800)']
-    df_new['价格区间'] = pd.cut(df_new['价格'], bins=price_bins, labels=price_labels)
+    df_new['价格区间'] = pd.cut(df_new['价格'], bins=PRICE_BINS, labels=PRICE_LABELS)
 
     # 8. 座位特征
     print("[8] 分析座位特征...")
-    # 剩余座位分类
-    def seat_category(seats):
-        if seats <= 2:
-            return '紧张(<=2)'
-        elif seats <= 5:
-            return '较少(3-5)'
-        elif seats <= 9:
-            return '中等(6-9)'
-        else:
-            return '充足(>9)'
-
-    df_new['座位状态'] = df_new['剩余座位'].apply(seat_category)
+    # 剩余座位分类：<=2 紧张，3-5 较少，6-9 中等，>9 充足
+    df_new['座位状态'] = seat_category(df_new['剩余座位'])
 
     # 9. 性价比特征（价格/座位）
     print("[9] 计算性价比特征...")
@@ -165,165 +162,127 @@ def feature_engineering(df):
     # 11. 综合效率评分
     print("[11] 计算综合效率评分...")
     # 标准化各项指标
-    df_new['时长标准化'] = (df_new['飞行时长_分钟'] - df_new['飞行时长_分钟'].min()) / (df_new['飞行时长_分钟'].max() - df_new['飞行时长_分钟'].min())
-    df_new['价格标准化'] = (df_new['价格'] - df_new['价格'].min()) / (df_new['价格'].max() - df_new['价格'].min())
+    df_new['时长标准化'] = (df_new['飞行时长_分钟'] - stats.duration_min) / (stats.duration_max - stats.duration_min)
+    df_new['价格标准化'] = (df_new['价格'] - stats.price_min) / (stats.price_max - stats.price_min)
 
     # 效率评分：时长越短、价格越低、座位越多越好
-    df_new['效率评分'] = 1 - (df_new['时长标准化'] * 0.4 + df_new['价格标准化'] * 0.4 - (df_new['剩余座位'] / df_new['剩余座位'].max()) * 0.2)
+    df_new['效率评分'] = 1 - (df_new['时长标准化'] * 0.4 + df_new['价格标准化'] * 0.4 - (df_new['剩余座位'] / stats.seats_max) * 0.2)
 
     print(f"\n特征工程完成！新增特征数量: {len(df_new.columns) - len(df.columns)}")
     print(f"新数据集形状: {df_new.shape}")
 
     return df_new
 
-def exploratory_analysis(df, df_featured):
-    """探索性数据分析和可视化"""
+# 并行特征工程的子进程数据：fork 时直接继承父进程内存，spawn 时每个子进程接收一次
+_worker_frame = None
+
+def _init_feature_worker(df):
+    global _worker_frame
+    _worker_frame = df
+
+def _feature_block(bounds, stats, spill_dir):
+    """
+    子进程：对 [start, stop) 行计算特征（不打印步骤），结果写入 spill_dir 由父进程映射读取
+
+    只返回新增的特征列和被转换为日期的两列，其余原始列父进程已有，不必再传回
+    """
+    import contextlib
+    import io
+    start, stop = bounds
+    block = _worker_frame.iloc[start:stop]
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_new = feature_engineering(block, stats=stats)
+    features = df_new[[name for name in df_new.columns if name not in block.columns or name in DATE_COLUMNS]]
+    return spill_frame(features, spill_dir)
+
+def parallel_feature_engineering(df, workers=None, stats=None, blocks_per_worker=2):
+    """
+    多进程特征工程
+
+    先在主进程计算一次全局统计量（FeatureStats.from_frame，时长只解析唯一值），再把数据切成连续的行块
+    分给进程池，各进程使用同一份统计量计算特征，结果按块顺序拼接。特征在统计量确定后逐行计算，
+    因此输出与单进程 feature_engineering 逐字节相同。
+
+    参数:
+        df: 原始数据
+        workers: 进程数，None 表示 CPU 核数
+        stats: 全局统计量，None 表示由 df 计算
+        blocks_per_worker: 每个进程分到的块数，块越多负载越均衡、每块的固定开销越多
+    """
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+
+    workers = workers or os.cpu_count() or 1
+    if stats is None:
+        stats = FeatureStats.from_frame(df)
+    if workers <= 1 or len(df) < 2:
+        return feature_engineering(df, stats=stats)
+
     print("\n" + "="*80)
-    print("探索性数据分析")
+    print("特征工程（并行）")
     print("="*80)
+    edges = np.linspace(0, len(df), min(workers * blocks_per_worker, len(df)) + 1).astype(int)
+    bounds = list(zip(edges[:-1], edges[1:]))
+    print(f"\n{workers} 个进程，{len(bounds)} 块，每块约 {len(df) // len(bounds):,} 行")
+
+    with tempfile.TemporaryDirectory(prefix='features-', ignore_cleanup_errors=True) as spill_dir:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_feature_worker, initargs=(df,)) as pool:
+            parts = [load_spilled(spilled) for spilled in pool.map(_feature_block, bounds, repeat(stats),
+                                                                   repeat(spill_dir))]
+        features = pd.concat(parts)
+        del parts
+
+    # 与 feature_engineering 相同的列顺序：原始列（日期列替换为转换后的值）在前，新增特征在后
+    df_new = df.copy()
+    for name in features.columns:
+        df_new[name] = features[name]
 
-    # 创建输出目录
-    import os
-    output_dir = 'analysis_output'
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    # 1. 价格分布分析
-    print("\n[1] 价格分布分析...")
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-
-    # 价格直方图
-    axes[0, 0].hist(df['价格'], bins=30, edgecolor='black', alpha=0.7)
-    axes[0, 0].set_title('价格分布直方图')
-    axes[0, 0].set_xlabel('价格 (元)')
-    axes[0, 0].set_ylabel('频数')
-
-    # 价格箱线图
-    axes[0, 1].boxplot(df['价格'])
-    axes[0, 1].set_title('价格箱线图')
-    axes[0, 1].set_ylabel('价格 (元)')
-
-    # 按航司的价格分布
-    airline_prices = df.groupby('航司')['价格'].mean().sort_values(ascending=False).head(10)
-    axes[1, 0].barh(range(len(airline_prices)), airline_prices.values)
-    axes[1, 0].set_yticks(range(len(airline_prices)))
-    axes[1, 0].set_yticklabels(airline_prices.index)
-    axes[1, 0].set_title('各航司平均价格')
-    axes[1, 0].set_xlabel('平均价格 (元)')
-
-    # 提前天数 vs 价格
-    axes[1, 1].scatter(df['提前天数'], df['价格'], alpha=0.5)
-    axes[1, 1].set_title('提前天数 vs 价格')
-    axes[1, 1].set_xlabel('提前天数')
-    axes[1, 1].set_ylabel('价格 (元)')
-
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/price_analysis.png', dpi=300, bbox_inches='tight')
-    print(f"保存: {output_dir}/price_analysis.png")
-    plt.close()
-
-    # 2. 时间特征分析
-    print("[2] 时间特征分析...")
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-
-    # 起飞时段分布
-    if '起飞时段' in df_featured.columns:
-        df_featured['起飞时段'].value_counts().plot(kind='bar', ax=axes[0, 0])
-        axes[0, 0].set_title('起飞时段分布')
-        axes[0, 0].set_xlabel('起飞时段')
-        axes[0, 0].set_ylabel('航班数')
-        axes[0, 0].tick_params(axis='x', rotation=45)
-
-    # 飞行时长分布
-    if '飞行时长_分钟' in df_featured.columns:
-        axes[0, 1].hist(df_featured['飞行时长_分钟'], bins=30, edgecolor='black', alpha=0.7)
-        axes[0, 1].set_title('飞行时长分布')
-        axes[0, 1].set_xlabel('飞行时长 (分钟)')
-        axes[0, 1].set_ylabel('频数')
-
-    # 中转次数分布
-    if '中转次数' in df_featured.columns:
-        df_featured['中转次数'].value_counts().sort_index().plot(kind='bar', ax=axes[1, 0])
-        axes[1, 0].set_title('中转次数分布')
-        axes[1, 0].set_xlabel('中转次数')
-        axes[1, 0].set_ylabel('航班数')
-        axes[1, 0].tick_params(axis='x', rotation=0)
-
-    # 剩余座位分布
-    axes[1, 1].hist(df['剩余座位'], bins=20, edgecolor='black', alpha=0.7)
-    axes[1, 1].set_title('剩余座位分布')
-    axes[1, 1].set_xlabel('剩余座位数')
-    axes[1, 1].set_ylabel('频数')
-
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/time_analysis.png', dpi=300, bbox_inches='tight')
-    print(f"保存: {output_dir}/time_analysis.png")
-    plt.close()
-
-    # 3. 相关性分析
-    print("[3] 相关性分析...")
-    numerical_cols = ['提前天数', '剩余座位', '价格', '飞行时长_分钟', '中转时长_分钟', '中转次数', '性价比']
-    numerical_cols = [col for col in numerical_cols if col in df_featured.columns]
-
-    if len(numerical_cols) > 1:
-        correlation_matrix = df_featured[numerical_cols].corr()
-
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
-                    square=True, linewidths=1, cbar_kws={"shrink": 0.8})
-        plt.title('特征相关性热力图')
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/correlation_heatmap.png', dpi=300, bbox_inches='tight')
-        print(f"保存: {output_dir}/correlation_heatmap.png")
-        plt.close()
-
-    # 4. 综合分析图
-    print("[4] 生成综合分析图...")
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-
-    # 航司市场份额
-    if '航司' in df.columns:
-        df['航司'].value_counts().head(10).plot(kind='pie', ax=axes[0, 0], autopct='%1.1f%%')
-        axes[0, 0].set_title('航司市场份额 (前10)')
-        axes[0, 0].set_ylabel('')
-
-    # 价格区间分布
-    if '价格区间' in df_featured.columns:
-        df_featured['价格区间'].value_counts().plot(kind='bar', ax=axes[0, 1])
-        axes[0, 1].set_title('价格区间分布')
-        axes[0, 1].set_xlabel('价格区间')
-        axes[0, 1].set_ylabel('航班数')
-        axes[0, 1].tick_params(axis='x', rotation=45)
-
-    # 座位状态分布
-    if '座位状态' in df_featured.columns:
-        df_featured['座位状态'].value_counts().plot(kind='bar', ax=axes[1, 0])
-        axes[1, 0].set_title('座位状态分布')
-        axes[1, 0].set_xlabel('座位状态')
-        axes[1, 0].set_ylabel('航班数')
-        axes[1, 0].tick_params(axis='x', rotation=45)
-
-    # 效率评分分布
-    if '效率评分' in df_featured.columns:
-        axes[1, 1].hist(df_featured['效率评分'], bins=30, edgecolor='black', alpha=0.7)
-        axes[1, 1].set_title('效率评分分布')
-        axes[1, 1].set_xlabel('效率评分')
-        axes[1, 1].set_ylabel('频数')
-
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/comprehensive_analysis.png', dpi=300, bbox_inches='tight')
-    print(f"保存: {output_dir}/comprehensive_analysis.png")
-    plt.close()
+    print(f"\n特征工程完成！新增特征数量: {len(df_new.columns) - len(df.columns)}")
+    print(f"新数据集形状: {df_new.shape}")
+    return df_new
+
+def run_feature_engineering(df, stats=None):
+    """按 config 的 FEATURE_WORKERS 选择单进程或多进程特征工程"""
+    from config import FEATURE_WORKERS, FEATURE_PARALLEL_MIN_ROWS
+    if FEATURE_WORKERS != 1 and len(df) >= FEATURE_PARALLEL_MIN_ROWS:
+        return parallel_feature_engineering(df, workers=FEATURE_WORKERS, stats=stats)
+    return feature_engineering(df, stats=stats)
+
+def exploratory_analysis(summary, output_dir):
+    """
+    探索性数据分析和可视化（数据来自汇总统计量 AnalysisSummary）
+
+    四张图按 config 的 CHART_WORKERS 并行绘制；聚合结果和绘图参数未变化的图直接沿用已有图片
+    """
+    from config import CHART_WORKERS, FIGURE_DPI
+    from src.utils.analysis_figures import render_figures
+    print("\n" + "="*80)
+    print("探索性数据分析")
+    print("="*80 + "\n")
+
+    start = time.perf_counter()
+    results = render_figures(summary, output_dir, dpi=FIGURE_DPI, workers=CHART_WORKERS)
+    for name, status, seconds in results:
+        if status == 'rendered':
+            print(f"保存: {output_dir}/{name} (渲染 {seconds:.2f} 秒)")
+        elif status == 'cached':
+            print(f"♻️ 跳过: {output_dir}/{name} (输入未变化)")
+    statuses = [status for _, status, _ in results]
+    print(f"图表完成: 渲染 {statuses.count('rendered')} 张，沿用 {statuses.count('cached')} 张，"
+          f"耗时 {time.perf_counter() - start:.2f} 秒")
 
     return output_dir
 
-def generate_summary_report(df, df_featured, output_dir):
-    """生成分析摘要报告"""
+def generate_summary_report(summary, output_dir):
+    """生成分析摘要报告（数据来自汇总统计量 AnalysisSummary）"""
     print("\n" + "="*80)
     print("生成分析报告")
     print("="*80)
 
     report_path = f'{output_dir}/analysis_report.txt'
+    rows = summary.rows
+    price = summary.moments['价格']
 
     with open(report_path, 'w', encoding='utf-8') as f:
         f.write("="*80 + "\n")
@@ -333,75 +292,80 @@ def generate_summary_report(df, df_featured, output_dir):
         # 1. 数据概览
         f.write("一、数据概览\n")
         f.write("-"*80 + "\n")
-        f.write(f"数据集大小: {df.shape[0]} 行 x {df.shape[1]} 列\n")
-        f.write(f"数据采集时间范围: {df['采集日期'].min()} 至 {df['采集日期'].max()}\n")
-        f.write(f"航班起飞时间范围: {df['起飞日期'].min()} 至 {df['起飞日期'].max()}\n\n")
+        f.write(f"数据集大小: {rows} 行 x {len(summary.columns)} 列\n")
+        f.write(f"数据采集时间范围: {summary.dates['采集日期'][0]} 至 {summary.dates['采集日期'][1]}\n")
+        f.write(f"航班起飞时间范围: {summary.dates['起飞日期'][0]} 至 {summary.dates['起飞日期'][1]}\n\n")
 
         # 2. 价格分析
         f.write("二、价格分析\n")
         f.write("-"*80 + "\n")
-        f.write(f"平均价格: {df['价格'].mean():.2f} 元\n")
-        f.write(f"价格中位数: {df['价格'].median():.2f} 元\n")
-        f.write(f"最低价格: {df['价格'].min():.2f} 元\n")
-        f.write(f"最高价格: {df['价格'].max():.2f} 元\n")
-        f.write(f"价格标准差: {df['价格'].std():.2f} 元\n\n")
+        f.write(f"平均价格: {price.mean:.2f} 元\n")
+        f.write(f"价格中位数: {summary.sketches['价格'].median():.2f} 元\n")
+        f.write(f"最低价格: {price.min:.2f} 元\n")
+        f.write(f"最高价格: {price.max:.2f} 元\n")
+        f.write(f"价格标准差: {price.std:.2f} 元\n\n")
 
         # 3. 航司分析
+        airline_counts = summary.categories['航司']
         f.write("三、航司分析\n")
         f.write("-"*80 + "\n")
-        f.write(f"航司数量: {df['航司'].nunique()}\n")
+        f.write(f"航司数量: {airline_counts.nunique()}\n")
         f.write(f"\n航司航班数量排名 (前5):\n")
-        for i, (airline, count) in enumerate(df['航司'].value_counts().head(5).items(), 1):
+        for i, (airline, count) in enumerate(airline_counts.value_counts().head(5).items(), 1):
             f.write(f"  {i}. {airline}: {count} 个航班\n")
         f.write(f"\n航司平均价格排名 (前5):\n")
-        for i, (airline, price) in enumerate(df.groupby('航司')['价格'].mean().sort_values(ascending=False).head(5).items(), 1):
-            f.write(f"  {i}. {airline}: {price:.2f} 元\n\n")
+        for i, (airline, mean_price) in enumerate(summary.airline_price.mean().sort_values(ascending=False).head(5).items(), 1):
+            f.write(f"  {i}. {airline}: {mean_price:.2f} 元\n\n")
 
         # 4. 时间特征分析
-        if '飞行时长_分钟' in df_featured.columns:
+        if '飞行时长_分钟' in summary.featured_columns:
+            duration = summary.moments['飞行时长_分钟']
             f.write("四、时间特征分析\n")
             f.write("-"*80 + "\n")
-            f.write(f"平均飞行时长: {df_featured['飞行时长_分钟'].mean()/60:.2f} 小时\n")
-            f.write(f"最短飞行时长: {df_featured['飞行时长_分钟'].min()/60:.2f} 小时\n")
-            f.write(f"最长飞行时长: {df_featured['飞行时长_分钟'].max()/60:.2f} 小时\n\n")
+            f.write(f"平均飞行时长: {duration.mean/60:.2f} 小时\n")
+            f.write(f"最短飞行时长: {duration.min/60:.2f} 小时\n")
+            f.write(f"最长飞行时长: {duration.max/60:.2f} 小时\n\n")
 
         # 5. 中转分析
-        if '中转次数' in df_featured.columns:
+        if '中转次数' in summary.featured_columns:
+            transfers = summary.value_counts('中转次数').sort_index()
             f.write("五、中转分析\n")
             f.write("-"*80 + "\n")
-            f.write(f"中转航班占比: {(df_featured['中转次数'] > 0).sum() / len(df) * 100:.2f}%\n")
+            f.write(f"中转航班占比: {transfers[transfers.index > 0].sum() / rows * 100:.2f}%\n")
             f.write(f"\n中转次数分布:\n")
-            for transfer_count, count in df_featured['中转次数'].value_counts().sort_index().items():
-                f.write(f"  {transfer_count} 次中转: {count} 个航班 ({count/len(df)*100:.2f}%)\n")
+            for transfer_count, count in transfers.items():
+                f.write(f"  {transfer_count} 次中转: {count} 个航班 ({count/rows*100:.2f}%)\n")
             f.write("\n")
 
         # 6. 座位分析
+        seats = summary.moments['剩余座位']
         f.write("六、座位分析\n")
         f.write("-"*80 + "\n")
-        f.write(f"平均剩余座位: {df['剩余座位'].mean():.2f}\n")
-        f.write(f"最少剩余座位: {df['剩余座位'].min()}\n")
-        f.write(f"最多剩余座位: {df['剩余座位'].max()}\n")
-        if '座位状态' in df_featured.columns:
+        f.write(f"平均剩余座位: {seats.mean:.2f}\n")
+        f.write(f"最少剩余座位: {seats.min}\n")
+        f.write(f"最多剩余座位: {seats.max}\n")
+        if '座位状态' in summary.featured_columns:
             f.write(f"\n座位状态分布:\n")
-            for status, count in df_featured['座位状态'].value_counts().items():
-                f.write(f"  {status}: {count} 个航班 ({count/len(df)*100:.2f}%)\n")
+            for status, count in summary.value_counts('座位状态').items():
+                f.write(f"  {status}: {count} 个航班 ({count/rows*100:.2f}%)\n")
         f.write("\n")
 
         # 7. 提前预订分析
+        ahead = summary.moments['提前天数']
         f.write("七、提前预订分析\n")
         f.write("-"*80 + "\n")
-        f.write(f"平均提前天数: {df['提前天数'].mean():.2f} 天\n")
-        f.write(f"最短提前天数: {df['提前天数'].min()} 天\n")
-        f.write(f"最长提前天数: {df['提前天数'].max()} 天\n\n")
+        f.write(f"平均提前天数: {ahead.mean:.2f} 天\n")
+        f.write(f"最短提前天数: {ahead.min} 天\n")
+        f.write(f"最长提前天数: {ahead.max} 天\n\n")
 
         # 8. 提取的特征列表
         f.write("八、特征工程总结\n")
         f.write("-"*80 + "\n")
-        f.write(f"原始特征数量: {len(df.columns)}\n")
-        f.write(f"新增特征数量: {len(df_featured.columns) - len(df.columns)}\n")
-        f.write(f"总特征数量: {len(df_featured.columns)}\n\n")
+        f.write(f"原始特征数量: {len(summary.columns)}\n")
+        f.write(f"新增特征数量: {len(summary.featured_columns) - len(summary.columns)}\n")
+        f.write(f"总特征数量: {len(summary.featured_columns)}\n\n")
         f.write("新增特征列表:\n")
-        new_features = set(df_featured.columns) - set(df.columns)
+        new_features = set(summary.featured_columns) - set(summary.columns)
         for i, feature in enumerate(sorted(new_features), 1):
             f.write(f"  {i}. {feature}\n")
 
@@ -412,40 +376,259 @@ def generate_summary_report(df, df_featured, output_dir):
     print(f"分析报告已保存: {report_path}")
     return report_path
 
+def save_featured(df_featured, featured_output, append=False):
+    """写入（append=True 时追加）特征数据并更新数据集清单"""
+    # 更新数据集清单（调度器据此判断数据量，无需重新解析 CSV）；追加时只扫描追加的部分
+    from config import MANIFEST_FILE
+    manifest = DatasetManifest(MANIFEST_FILE)
+    if append:
+        offset = os.path.getsize(featured_output)
+        df_featured.to_csv(featured_output, mode='a', header=False, index=False, encoding='utf-8')
+        manifest.record_append(featured_output, offset, date_ranges(df_featured))
+    else:
+        df_featured.to_csv(featured_output, index=False, encoding='utf-8-sig')
+        manifest.record(featured_output, dates=date_ranges(df_featured))
+    manifest.save()
+
+def is_appendable_csv(data_file):
+    """原始数据是否为只追加的 CSV（分区数据集目录和价格区间文件不支持增量）"""
+    return os.path.isfile(data_file) and not is_interval_file(data_file)
+
+def record_feature_state(data_file, offset, featured_output, df_featured):
+    """全量生成特征数据后记录增量状态，下次 --incremental 从 offset 继续"""
+    if offset is None:
+        return
+    stats = FeatureStats.from_frame(df_featured)
+    state = FeatureState(feature_state_file(featured_output))
+    state.record(data_file, offset, featured_output, len(df_featured), applied=stats, observed=stats)
+    state.save()
+
+def update_features(data_file, featured_output, drift_threshold):
+    """
+    增量特征工程：只处理上次运行后原始 CSV 追加的行，追加写入特征数据集（不生成图表和报告）
+
+    全局统计量沿用特征数据集已使用的值；没有可用的增量状态、原始文件被改写，
+    或新数据使统计量漂移超过 drift_threshold 时全量重算。
+    增量状态是原始 CSV 的字节偏移，data_file 须为原始 CSV（run.py 的增量模式在数据迁移到分区数据集后仍传入 CSV）；
+    传入分区数据集目录或价格区间文件时每次都全量重算。
+
+    返回:
+        int: 本次写入的特征行数
+    """
+    state = FeatureState(feature_state_file(featured_output))
+    if is_appendable_csv(data_file):
+        problem = state.resume_problem(data_file, featured_output)
+    else:
+        problem = "增量模式只支持原始 CSV（分区数据集和价格区间文件没有可续读的偏移）"
+
+    if problem is None:
+        df_new, offset = read_flight_csv_tail(data_file, state.offset, columns=RAW_COLUMNS, categorical=False,
+                                              float32=False, parse_dates=False)
+        if not len(df_new):
+            print("✅ 没有新增数据，特征数据集已是最新")
+            return 0
+        applied = state.applied
+        observed = state.observed.merge(FeatureStats.from_frame(df_new))
+        drift = applied.drift(observed)
+        drift_text = '主要航司变化' if drift == float('inf') else f"{drift:.1%}"
+        if drift <= drift_threshold:
+            print(f"新增 {len(df_new):,} 行，全局统计量漂移 {drift_text}（阈值 {drift_threshold:.0%}），增量处理")
+            df_featured = run_feature_engineering(df_new, stats=applied)
+            save_featured(df_featured, featured_output, append=True)
+            state.record(data_file, offset, featured_output, state.data['rows'] + len(df_featured), applied, observed)
+            state.save()
+            print(f"特征数据已追加: {featured_output} (+{len(df_featured):,} 行，共 {state.data['rows']:,} 行)")
+            return len(df_featured)
+        problem = f"全局统计量漂移 {drift_text} 超过阈值 {drift_threshold:.0%}"
+
+    print(f"⚠️ {problem}，全量重算特征")
+    offset = os.path.getsize(data_file) if is_appendable_csv(data_file) else None
+    df = load_data(data_file)
+    df_featured = run_feature_engineering(df)
+    save_featured(df_featured, featured_output)
+    record_feature_state(data_file, offset, featured_output, df_featured)
+    print(f"特征数据已保存: {featured_output}")
+    return len(df_featured)
+
+def refresh_report(data_file, featured_output, output_dir):
+    """
+    增量更新特征后重新生成基础统计、图表和报告
+
+    读取原始数据和已有的特征数据集计算汇总统计量，不重新做特征工程、不重写特征数据集。
+
+    返回:
+        str: 报告路径
+    """
+    df = load_data(data_file)
+    df_featured = read_flight_csv(featured_output, categorical=False, float32=False)
+    summary = AnalysisSummary.from_frames(df, df_featured)
+    print("\n基础统计分析...")
+    basic_statistics(summary)
+    print("\n探索性数据分析和可视化...")
+    exploratory_analysis(summary, output_dir)
+    print("\n生成分析报告...")
+    return generate_summary_report(summary, output_dir)
+
+# 价格区间文件按区间分批还原时，把分块字节数换算为行数（原始 CSV 每行约 100-130 字节）
+RAW_ROW_BYTES = 128
+
+def iter_raw_chunks(data_file, chunk_bytes):
+    """
+    逐块读取原始数据，每块大小有上限，用于流式分析
+
+    CSV 按字节分块；分区数据集按采集月份分块（启用冷热分层时合并近期明细和历史日聚合）；
+    价格区间文件读取区间后分批还原为快照
+    """
+    if os.path.isdir(data_file):
+        from config import ORIGIN, DESTINATION, COLD_STORE_DIR, TIERED_STORE_ENABLED, HOT_RETENTION_DAYS
+        from src.utils.partitioned_store import PartitionedStore
+        from src.utils.tiered_store import TieredStore
+        routes = [(ORIGIN, DESTINATION)]
+        if TIERED_STORE_ENABLED:
+            store = TieredStore(data_file, COLD_STORE_DIR, HOT_RETENTION_DAYS)
+            layers = [store.hot, store.cold]
+        else:
+            store = PartitionedStore(data_file)
+            layers = [store]
+        months = sorted({day[:7] for layer in layers for _, _, day, _ in layer.partitions(routes)})
+        for month in months:
+            df = store.read(routes=routes, since=f'{month}-01', until=f'{month}-31')
+            if len(df):
+                yield df
+    elif is_interval_file(data_file):
+        intervals = read_intervals(data_file)
+        lengths = (pd.to_datetime(intervals['有效止']) - pd.to_datetime(intervals['有效起'])).dt.days + 1
+        block = (lengths.cumsum() // max(chunk_bytes // RAW_ROW_BYTES, 1)).to_numpy()
+        for _, part in intervals.groupby(block, sort=True):
+            yield expand_intervals(part.reset_index(drop=True))
+    else:
+        yield from iter_flight_csv(data_file, chunk_bytes, columns=RAW_COLUMNS, categorical=False, float32=False,
+                                   parse_dates=False)
+
+def streaming_analysis(data_file, featured_output, output_dir, chunk_bytes):
+    """
+    分块流式分析：历史数据无法一次载入内存时使用，内存只与分块大小有关
+
+    第一遍只累积特征工程需要的全局统计量；第二遍逐块做特征工程并追加写入特征数据集，
+    同时累积基础统计、图表和报告用到的统计量（AnalysisSummary），最后由汇总结果输出。
+    特征数据集与全量模式逐字节相同；中位数等近似统计量的精度见 src/utils/streaming_stats.py。
+
+    返回:
+        str: 报告路径
+    """
+    import contextlib
+    import io
+
+    # 1. 第一遍：全局统计量（归一化范围和主要航司）
+    print("步骤 1: 扫描全局统计量...")
+    offset = os.path.getsize(data_file) if is_appendable_csv(data_file) else None
+    stats = None
+    for df in iter_raw_chunks(data_file, chunk_bytes):
+        chunk_stats = FeatureStats.from_frame(df)
+        stats = chunk_stats if stats is None else stats.merge(chunk_stats)
+    if stats is None:
+        print("⚠️ 没有可分析的数据")
+        return None
+
+    # 2. 第二遍：逐块特征工程，追加写入特征数据并累积统计量
+    print("\n步骤 2: 分块特征工程和统计...")
+    summary = AnalysisSummary()
+    chunks = 0
+    for df in iter_raw_chunks(data_file, chunk_bytes):
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_featured = feature_engineering(df, stats=stats)
+        if chunks:
+            df_featured.to_csv(featured_output, mode='a', header=False, index=False, encoding='utf-8')
+        else:
+            df_featured.to_csv(featured_output, index=False, encoding='utf-8-sig')
+        summary.update(df, df_featured)
+        chunks += 1
+        print(f"  第 {chunks} 块: {len(df):,} 行，累计 {summary.rows:,} 行")
+    print(f"数据集形状: ({summary.rows}, {len(summary.columns)})")
+
+    from config import MANIFEST_FILE
+    manifest = DatasetManifest(MANIFEST_FILE)
+    manifest.record(featured_output, dates={name: [str(lo)[:10], str(hi)[:10]]
+                                            for name, (lo, hi) in summary.dates.items()})
+    manifest.save()
+    if offset is not None:
+        state = FeatureState(feature_state_file(featured_output))
+        state.record(data_file, offset, featured_output, summary.rows, applied=stats, observed=stats)
+        state.save()
+    print(f"特征数据已保存: {featured_output}")
+
+    # 3. 基础统计、图表和报告
+    print("\n步骤 3: 基础统计分析...")
+    basic_statistics(summary)
+    print("\n步骤 4: 探索性数据分析和可视化...")
+    exploratory_analysis(summary, output_dir)
+    print("\n步骤 5: 生成分析报告...")
+    return generate_summary_report(summary, output_dir)
+
 def main():
     """主函数"""
+    import argparse
+    parser = argparse.ArgumentParser(description='航班数据分析和特征提取')
+    parser.add_argument('--incremental', action='store_true',
+                        help='只对新增原始数据做特征工程并追加到特征数据集，再由完整的特征数据集重新生成图表和报告')
+    parser.add_argument('--features-only', action='store_true',
+                        help='配合 --incremental：只追加特征数据，不生成图表和报告')
+    parser.add_argument('--streaming', action='store_true',
+                        help='分块流式分析，内存只与分块大小有关（中位数等为近似值，默认见 config.ANALYSIS_STREAMING）')
+    args = parser.parse_args()
+
     print("\n" + "="*80)
     print("航班数据分析和特征提取系统")
     print("="*80 + "\n")
 
     # 数据文件路径
     data_file = 'szx_yih_flight_data_cn.csv'
-
-    # 1. 加载数据
-    print("步骤 1: 加载数据...")
-    df = load_data(data_file)
-
-    # 2. 基础统计分析
-    print("\n步骤 2: 基础统计分析...")
-    basic_statistics(df)
-
-    # 3. 特征工程
-    print("\n步骤 3: 特征工程...")
-    df_featured = feature_engineering(df)
-
-    # 4. 保存特征数据
-    print("\n步骤 4: 保存特征数据...")
     featured_output = 'flight_data_featured.csv'
-    df_featured.to_csv(featured_output, index=False, encoding='utf-8-sig')
-    print(f"特征数据已保存: {featured_output}")
 
-    # 5. 探索性数据分析和可视化
-    print("\n步骤 5: 探索性数据分析和可视化...")
-    output_dir = exploratory_analysis(df, df_featured)
+    if args.incremental:
+        from config import FEATURE_DRIFT_THRESHOLD
+        print("增量特征工程...")
+        update_features(data_file, featured_output, FEATURE_DRIFT_THRESHOLD)
+        if args.features_only:
+            return
 
-    # 6. 生成分析报告
-    print("\n步骤 6: 生成分析报告...")
-    report_path = generate_summary_report(df, df_featured, output_dir)
+    output_dir = 'analysis_output'
+    from config import ANALYSIS_STREAMING, STREAMING_CHUNK_MB
+    if args.incremental:
+        print("\n重新生成图表和报告...")
+        report_path = refresh_report(data_file, featured_output, output_dir)
+    elif args.streaming or ANALYSIS_STREAMING:
+        report_path = streaming_analysis(data_file, featured_output, output_dir, STREAMING_CHUNK_MB * 1024 * 1024)
+        if report_path is None:
+            return
+    else:
+        # 1. 加载数据
+        print("步骤 1: 加载数据...")
+        offset = os.path.getsize(data_file) if is_appendable_csv(data_file) else None
+        df = load_data(data_file)
+
+        # 2. 特征工程
+        print("\n步骤 2: 特征工程...")
+        df_featured = run_feature_engineering(df)
+
+        # 3. 保存特征数据
+        print("\n步骤 3: 保存特征数据...")
+        save_featured(df_featured, featured_output)
+        record_feature_state(data_file, offset, featured_output, df_featured)
+        print(f"特征数据已保存: {featured_output}")
+
+        # 4. 汇总统计（一次计算，基础统计、图表和报告共用）和基础统计分析
+        print("\n步骤 4: 基础统计分析...")
+        summary = AnalysisSummary.from_frames(df, df_featured)
+        basic_statistics(summary)
+
+        # 5. 探索性数据分析和可视化
+        print("\n步骤 5: 探索性数据分析和可视化...")
+        exploratory_analysis(summary, output_dir)
+
+        # 6. 生成分析报告
+        print("\n步骤 6: 生成分析报告...")
+        report_path = generate_summary_report(summary, output_dir)
 
     print("\n" + "="*80)
     print("分析完成!")
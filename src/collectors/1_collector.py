@@ -1,133 +1,210 @@
-import pandas as pd
-from amadeus import Client, ResponseError
+from amadeus import Client
 from datetime import datetime, timedelta
+import argparse
 import os
-import time
-import re
 import sys
 
-# --- 1. 初始化配置 ---
-def log(msg):
-    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+# 使用绝对路径确保数据写入正确位置
+# collector 在 src/collectors/ 目录下，需要向上两级到项目根目录
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
 
+from config import (SCAN_DAYS, COLLECT_MODE, COLLECT_WORKERS, API_RATE_LIMIT, API_BURST,
+                    ARCHIVE_DIR, ARCHIVE_RAW_RESPONSES, CHECKPOINT_DIR,
+                    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+                    BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN, COLLECTION_TIMES,
+                    SCAN_RUN_BUDGET, SCAN_MONTHLY_BUDGET, PLANNER_HISTORY_DAYS, PLANNER_ALWAYS_DAYS,
+                    NEGATIVE_CACHE_ENABLED, NEGATIVE_CACHE_FILE, NEGATIVE_CACHE_TTL_DAYS,
+                    NEGATIVE_CACHE_SAMPLE_RATE, NEGATIVE_CACHE_WEEKDAY_THRESHOLD, PRESCAN_ENABLED,
+                    STORE_DIR, WRITE_PARTITIONED_STORE, QUERY_DB_FILE, SYNC_QUERY_STORE,
+                    COLD_STORE_DIR, TIERED_STORE_ENABLED, HOT_RETENTION_DAYS, MANIFEST_FILE,
+                    CALL_LEDGER_FILE, load_routes, route_data_file)
+from src.collectors.call_budget import CallLedger, runs_left_in_month
+from src.collectors.checkpoint import ScanCheckpoint, StreamingScanWriter
+from src.collectors.negative_cache import NegativeCache
+from src.collectors.rate_limiter import TokenBucket
+from src.collectors.raw_archive import RawArchive
+from src.collectors.retry import RetryPolicy, CircuitBreaker, ResilientCaller
+from src.collectors.scan_engine import (log, build_target_dates, build_work_units, prescan_routes,
+                                       scan_routes, SCAN_MODES)
+from src.utils.manifest import DatasetManifest
+from src.utils.partitioned_store import PartitionedStore
+# 扫描规划、查询库和冷热分层都依赖 pandas，只在用到时才导入，采集器启动时不载入 pandas
+
+# --- 1. 初始化配置 ---
 API_KEY = os.environ.get('AMADEUS_CLIENT_ID')
 API_SECRET = os.environ.get('AMADEUS_CLIENT_SECRET')
+# 可选：指向本地模拟服务，如 AMADEUS_HOST=127.0.0.1:8080（使用 http）
+API_HOST = os.environ.get('AMADEUS_HOST')
 
-if not API_KEY or not API_SECRET:
-    log("❌ 错误：未找到 API 密钥。")
-    sys.exit(1)
 
-ORIGIN = 'SZX'        
-DESTINATION = 'YIH'   
-SCAN_DAYS = 30        
-# 使用绝对路径确保数据写入正确位置
-# collector 在 src/collectors/ 目录下，需要向上两级到项目根目录
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-FILE_NAME = os.path.join(PROJECT_ROOT, 'data', 'raw', 'szx_yih_flight_data_cn.csv')
-
-# --- 2. 辅助工具函数 ---
-
-def parse_duration(iso_duration):
-    if not iso_duration: return ""
-    hours = re.search(r'(\d+)H', iso_duration)
-    minutes = re.search(r'(\d+)M', iso_duration)
-    h_str = f"{hours.group(1)}小时" if hours else ""
-    m_str = f"{minutes.group(1)}分" if minutes else ""
-    return h_str + m_str
-
-def calculate_layover(segments):
-    if len(segments) < 2: return "无", "0"
-    total_wait_seconds = 0
-    layover_locs = []
-    for i in range(len(segments) - 1):
-        layover_locs.append(segments[i]['arrival']['iataCode'])
-        arr = datetime.strptime(segments[i]['arrival']['at'], "%Y-%m-%dT%H:%M:%S")
-        dep = datetime.strptime(segments[i+1]['departure']['at'], "%Y-%m-%dT%H:%M:%S")
-        total_wait_seconds += (dep - arr).total_seconds()
-    return "/".join(layover_locs), f"{int(total_wait_seconds // 3600)}h{int((total_wait_seconds % 3600) // 60)}m"
-
-# --- 3. 主程序 ---
-
-def run_daily_scan():
+def create_client():
+    """根据环境变量创建 Amadeus 客户端；缺少密钥时退出"""
+    if not API_KEY or not API_SECRET:
+        log("❌ 错误：未找到 API 密钥。")
+        sys.exit(1)
+    if API_HOST:
+        host, _, port = API_HOST.partition(':')
+        return Client(client_id=API_KEY, client_secret=API_SECRET,
+                      host=host, port=int(port or 80), ssl=False)
+    return Client(client_id=API_KEY, client_secret=API_SECRET)
+
+
+# --- 2. 主程序 ---
+
+def plan_budget(budget, ledger, today):
+    """本次运行的调用预算：单次预算与（月度预算 - 本月已用）/ 本月剩余运行次数 取较小值，未配置时为 None"""
+    from src.collectors.scan_planner import run_budget
+    spent = ledger.spent(today)
+    budget = run_budget(budget if budget is not None else SCAN_RUN_BUDGET, SCAN_MONTHLY_BUDGET,
+                        spent=spent, runs_left=runs_left_in_month(today, len(COLLECTION_TIMES)))
+    if budget is not None and SCAN_MONTHLY_BUDGET is not None:
+        log(f"💰 调用预算: 本月已用 {spent}/{SCAN_MONTHLY_BUDGET} 次，本次最多 {budget} 次")
+    return budget
+
+
+def plan_units(routes, units, budget=None, store=None):
+    """用自适应规划器在预算内挑选工作单元（budget 为本次还能发出的调用次数）"""
+    from src.collectors.scan_planner import ScanPlanner, load_history
+    if budget is None:
+        log("ℹ️ 未配置调用预算，规划器不裁剪工作单元")
+        return units
+    since = (datetime.now() - timedelta(days=PLANNER_HISTORY_DAYS)).strftime('%Y-%m-%d')
+    history = load_history(routes, route_data_file, since=since, store=store)
+    planner = ScanPlanner(history, always_days=PLANNER_ALWAYS_DAYS)
+    selected = planner.select(units, budget)
+    always = planner.always_count(units)
+    if always > budget:
+        log(f"⚠️ 临近起飞的 {always} 个单元超出预算 {budget} 次，只查询提前天数最近的 {budget} 个")
+    log(f"🧭 扫描规划: 预算 {budget} 次, 选中 {len(selected)}/{len(units)} 个单元")
+    return selected
+
+
+def run_daily_scan(mode=COLLECT_MODE, workers=COLLECT_WORKERS, client=None, routes=None, resume=False,
+                   plan=False, budget=None, negative_cache=NEGATIVE_CACHE_ENABLED, prescan=PRESCAN_ENABLED):
     # 关闭 debug 模式，保持清爽
-    amadeus = Client(client_id=API_KEY, client_secret=API_SECRET)
-    
-    fetch_date = datetime.now().strftime('%Y-%m-%d')
-    today = datetime.now()
-    buffer_data = []
+    amadeus = client or create_client()
+    run_id = datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+    today = datetime.now().strftime('%Y-%m-%d')
+    ledger = CallLedger(CALL_LEDGER_FILE)
+    limiter = TokenBucket(API_RATE_LIMIT, API_BURST)
+    caller = ResilientCaller(RetryPolicy(RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY),
+                             CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN))
+    cache = None
+    if negative_cache:
+        cache = NegativeCache(NEGATIVE_CACHE_FILE, ttl_days=NEGATIVE_CACHE_TTL_DAYS,
+                              sample_rate=NEGATIVE_CACHE_SAMPLE_RATE,
+                              weekday_threshold=NEGATIVE_CACHE_WEEKDAY_THRESHOLD)
+    store = None
+    if WRITE_PARTITIONED_STORE:
+        try:
+            store = PartitionedStore(STORE_DIR)
+        except ImportError as e:
+            log(f"⚠️ {e}，本次只写入 CSV")
 
-    log(f"🚀 开始采集: {ORIGIN} -> {DESTINATION} (未来 {SCAN_DAYS} 天)")
+    if resume:
+        checkpoint = ScanCheckpoint.latest(CHECKPOINT_DIR)
+        if checkpoint is None or checkpoint.complete:
+            log("ℹ️ 没有未完成的采集任务，无需续采。")
+            return
+        units = checkpoint.pending_units()
+        fetch_date = checkpoint.fetch_date
+        routes = list(dict.fromkeys((u[0], u[1]) for u in units))
+        log(f"♻️ 续采 {checkpoint.run_id}: 剩余 {len(units)}/{len(checkpoint.units)} 个单元")
+    else:
+        routes = routes or load_routes()
+        fetch_date = datetime.now().strftime('%Y-%m-%d')
+        target_dates = build_target_dates(SCAN_DAYS)
+        units = build_work_units(routes, target_dates)
+        budget = plan_budget(budget, ledger, today) if plan else None
+        if cache is not None:
+            if prescan and budget is not None and budget <= len(routes):
+                log(f"ℹ️ 预算 {budget} 次不足以预扫描 {len(routes)} 条航线后再采集，跳过预扫描")
+            elif prescan:
+                prescan_routes(amadeus, routes, target_dates, cache, fetch_date, limiter, caller)
+            units, skipped = cache.filter_units(units, fetch_date)
+            if skipped:
+                log(f"🗂️ 负缓存: 跳过 {len(skipped)} 个近期无航班的单元")
+        if plan:
+            # 预扫描（含重试）已发出的调用计入本次预算；负缓存抽样复查的单元仍在 units 中，由规划器一并计入
+            if budget is not None:
+                budget = max(0, budget - caller.stats.counters['attempts'])
+            units = plan_units(routes, units, budget, store)
+        checkpoint = ScanCheckpoint.create(CHECKPOINT_DIR, run_id, fetch_date, units)
+
+    archive = RawArchive(ARCHIVE_DIR, run_id=run_id) if ARCHIVE_RAW_RESPONSES else None
+    writer = StreamingScanWriter(checkpoint, route_data_file, store=store)
+
+    route_desc = ", ".join(f"{o} -> {d}" for o, d in routes[:3]) + (" ..." if len(routes) > 3 else "")
+    log(f"🚀 开始采集: {route_desc} ({len(routes)} 条航线, {len(units)} 个单元, 模式: {mode}, 并发: {workers})")
     log("-" * 50)
 
-    for i in range(1, SCAN_DAYS + 1):
-        target_date = (today + timedelta(days=i)).strftime('%Y-%m-%d')
-        # 紧凑型进度打印
-        progress = f"🔎 [{i:02d}/{SCAN_DAYS}] {target_date}"
-        
-        try:
-            response = amadeus.shopping.flight_offers_search.get(
-                originLocationCode=ORIGIN,
-                destinationLocationCode=DESTINATION,
-                departureDate=target_date,
-                adults=1
-            )
-            
-            if not response.data:
-                print(f"{progress} -> ℹ️ 无航班", flush=True)
-                continue
-
-            daily_flights = []
-            for flight in response.data:
-                itinerary = flight['itineraries'][0]
-                segments = itinerary['segments']
-                
-                daily_flights.append({
-                    '采集日期': fetch_date,
-                    '起飞日期': target_date,
-                    '提前天数': i,
-                    '航班号': segments[0]['carrierCode'] + segments[0]['number'],
-                    '航司': flight['validatingAirlineCodes'][0],
-                    '类型': "直飞" if len(segments) == 1 else "中转",
-                    '起飞时间': segments[0]['departure']['at'].split('T')[1][:5],
-                    '到达时间': segments[-1]['arrival']['at'].split('T')[1][:5],
-                    '总时长': parse_duration(itinerary['duration']),
-                    '中转地': calculate_layover(segments)[0],
-                    '中转时长': calculate_layover(segments)[1],
-                    '剩余座位': flight['numberOfBookableSeats'],
-                    '价格': float(flight['price']['total']),
-                    '_dept': segments[0]['departure']['at'],
-                    '_arr': segments[-1]['arrival']['at']
-                })
-
-            if daily_flights:
-                df = pd.DataFrame(daily_flights)
-                df = df.sort_values(by='价格').drop_duplicates(subset=['_dept', '_arr'], keep='first')
-                df = df.drop(columns=['_dept', '_arr'])
-                buffer_data.append(df)
-                print(f"{progress} -> ✅ 抓取到 {len(df)} 条数据", flush=True)
-
-        except ResponseError as e:
-            print(f"{progress} -> ❌ API错误: {e}", flush=True)
-        
-        time.sleep(0.2) # 稍微缩短间隔
-
-   # --- 保存逻辑 ---
-    if buffer_data:
-        final_df = pd.concat(buffer_data, ignore_index=True)
-        
-        # 检查文件是否已经存在
-        file_exists = os.path.isfile(FILE_NAME)
-        
-        if not file_exists:
-            # 如果文件不存在，创建新文件，包含表头
-            final_df.to_csv(FILE_NAME, index=False, encoding='utf-8-sig')
-            log(f"✨ 首次运行，已创建新文件: {FILE_NAME}")
+    # --- 流式保存：每个单元完成后立即追加写入并记录检查点 ---
+    scan_routes(amadeus, routes, None, fetch_date, mode=mode, workers=workers,
+                limiter=limiter, archive=archive, units=units, sink=writer, caller=caller,
+                negative_cache=cache)
+    if cache is not None:
+        cache.prune(fetch_date)
+        cache.save()
+    if store is not None:
+        # 每个单元各写一个 part 文件，运行结束后合并本次采集日期的分区
+        store.compact(routes=routes, since=fetch_date, until=fetch_date)
+        if TIERED_STORE_ENABLED:
+            from src.utils.tiered_store import TieredStore
+            # 只处理刚移出热窗口的分区（通常是一天），代价与本次新增数据相当
+            tiers = TieredStore(STORE_DIR, COLD_STORE_DIR, HOT_RETENTION_DAYS)
+            partitions, rows_in, rows_out = tiers.roll(routes, today=fetch_date)
+            if partitions:
+                log(f"🧊 冷热分层: {partitions} 个分区移出热窗口，{rows_in} 行明细 -> {rows_out} 行日聚合")
+    if SYNC_QUERY_STORE:
+        from src.utils.query_store import QueryStore, sync_routes
+        with QueryStore(QUERY_DB_FILE) as query_store:
+            imported = sum(sync_routes(query_store, routes, route_data_file).values())
+        log(f"🗄️ 查询库增量导入 {imported} 行 -> {QUERY_DB_FILE}")
+
+    manifest = DatasetManifest(MANIFEST_FILE)
+    for origin, destination in routes:
+        rows = writer.rows_written.get((origin, destination), 0)
+        if rows:
+            log(f"💾 {origin} -> {destination}: 本次写入 {rows} 条 -> {route_data_file(origin, destination)}")
+            # 只扫描本次追加的字节；清单条目与追加前的文件不一致时 record_append 退回全量扫描
+            manifest.record_append(route_data_file(origin, destination),
+                                   writer.start_offsets[(origin, destination)],
+                                   writer.date_ranges[(origin, destination)])
         else:
-            # 如果文件已存在，使用 mode='a' (append) 追加数据
-            # header=False 表示不重复写入表头
-            final_df.to_csv(FILE_NAME, mode='a', index=False, header=False, encoding='utf-8-sig')
-            log(f"💾 数据已追加至现有文件: {FILE_NAME}")
+            log(f"⚠️ {origin} -> {destination} 本次未采集到数据，文件未更新。")
+    manifest.save()
+
+    log(f"📈 API 调用统计: {caller.stats.summary()}, 限流阻塞 {limiter.blocked_seconds:.1f} 秒（墙钟时间）")
+    # 实际发出的全部请求（预扫描、采集、重试）计入本月账本，下次运行从月度预算中扣除
+    ledger.add(today, caller.stats.counters['attempts'])
+    ledger.save()
+
+    if checkpoint.complete:
+        log("✅ 全部单元采集完成")
     else:
-        log("⚠️ 本次未采集到数据，文件未更新。")
+        missing = len(checkpoint.pending_units())
+        log(f"⚠️ 仍有 {missing} 个单元未完成，可运行 --resume 只补采这些单元")
+
+
+def parse_routes_arg(value):
+    """解析命令行航线参数，如 'SZX-YIH,SZX-PEK'"""
+    return [tuple(part.strip().upper().split('-')) for part in value.split(',') if part.strip()]
+
+
 if __name__ == "__main__":
-    run_daily_scan()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Amadeus 航班数据采集器')
+    parser.add_argument('--mode', choices=SCAN_MODES, default=COLLECT_MODE, help='采集模式')
+    parser.add_argument('--workers', type=int, default=COLLECT_WORKERS, help='并发请求数')
+    parser.add_argument('--routes', type=parse_routes_arg, default=None,
+                        help='航线列表，如 SZX-YIH,SZX-PEK（默认读取 config.py / routes.json）')
+    parser.add_argument('--resume', action='store_true', help='只补采上次运行中未完成的单元')
+    parser.add_argument('--plan', action='store_true', help='按价格波动规划，只查询预算内价值最高的单元')
+    parser.add_argument('--budget', type=int, default=None, help='本次运行的调用预算（配合 --plan）')
+    parser.add_argument('--no-negative-cache', action='store_true', help='不跳过近期无航班的日期')
+    parser.add_argument('--prescan', action='store_true', default=PRESCAN_ENABLED,
+                        help='正式扫描前用 flight-dates 接口预扫描有航班的日期')
+    args = parser.parse_args()
+    run_daily_scan(mode=args.mode, workers=args.workers, routes=args.routes, resume=args.resume,
+                   plan=args.plan, budget=args.budget, negative_cache=not args.no_negative_cache,
+                   prescan=args.prescan)
@@ -0,0 +1,61 @@
+"""
+API 调用账本
+====================
+
+按月记录实际发出的 API 请求数（含预扫描、重试和负缓存抽样复查，即 ResilientCaller 统计的全部尝试次数），
+每次采集前从月度预算中扣除本月已用的次数，再按本月剩余的运行次数平分，保证月度预算不被超出。
+
+文件格式:
+    {"months": {"2026-10": {"calls": 812, "runs": 30, "updated": "2026-10-18T08:03:12"}}}
+"""
+
+import calendar
+import json
+import os
+from datetime import datetime
+
+
+def month_key(day):
+    """采集日期（YYYY-MM-DD）所在月份，如 '2026-10'"""
+    return day[:7]
+
+
+def runs_left_in_month(day, runs_per_day):
+    """从 day（含当天）到月底还有多少次计划运行"""
+    date = datetime.strptime(day, '%Y-%m-%d')
+    days_left = calendar.monthrange(date.year, date.month)[1] - date.day + 1
+    return days_left * max(1, runs_per_day)
+
+
+class CallLedger:
+    """按月累计的 API 调用账本"""
+
+    def __init__(self, path):
+        """
+        参数:
+            path: 账本文件路径，不存在时从空账本开始
+        """
+        self.path = path
+        self.months = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.months = json.load(f).get('months', {})
+
+    def spent(self, day):
+        """day 所在月份已用的调用次数"""
+        return self.months.get(month_key(day), {}).get('calls', 0)
+
+    def add(self, day, calls):
+        """把一次运行实际发出的调用次数计入 day 所在月份（不自动保存）"""
+        entry = self.months.setdefault(month_key(day), {'calls': 0, 'runs': 0})
+        entry['calls'] += calls
+        entry['runs'] += 1
+        entry['updated'] = datetime.now().isoformat(timespec='seconds')
+
+    def save(self):
+        """原子写回账本文件"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'months': self.months}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
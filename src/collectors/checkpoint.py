@@ -0,0 +1,228 @@
+"""
+流式写入与断点续采
+====================
+
+每完成一个 (航线, 起飞日期) 工作单元就立即把数据追加写入 CSV，并在检查点文件中记录该单元已完成。
+采集中途崩溃或遇到大量 API 错误时，用 --resume 只重新请求未完成的单元。
+
+检查点文件（data/checkpoints/scan-<run_id>.jsonl）每行一条 JSON:
+    {"type": "header", "run_id": ..., "fetch_date": ..., "units": [[出发地, 目的地, 提前天数, 起飞日期], ...]}
+    {"type": "done", "unit": [...], "status": "ok" | "empty", "rows": n}
+    {"type": "complete"}
+
+请求失败的单元不会记为完成，续采时会重新请求。CSV 追加成功后才记录完成，
+若恰好在两步之间崩溃，续采会再次写入该单元（至少一次语义）。
+
+全部单元完成后检查点文件即被删除；新运行开始时删除更早的检查点（它们已不会再被续采），
+因此目录中最多保留一个未完成的检查点。
+"""
+
+import io
+import json
+import os
+import threading
+
+
+def _fsync_append(path, payload):
+    """以 O_APPEND 一次写入并 fsync，保证数据落盘后才返回"""
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, payload)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+TAIL_BLOCK = 8192  # 修复末行时每次从文件末尾向前读取的字节数
+
+
+def _repair_tail(path):
+    """截掉上次崩溃时写了一半的末行（文件不以换行结尾时），只从末尾向前读到最后一个换行"""
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b'\n':
+            return
+        end = size
+        while end > 0:
+            start = max(0, end - TAIL_BLOCK)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            end = start
+        f.truncate(0)
+
+
+def append_csv_rows(file_name, df):
+    """
+    原子追加一批行到 CSV
+
+    整批数据先序列化到内存，再一次性追加写入并 fsync；文件不存在时带表头和 BOM 创建，
+    与原来 to_csv(encoding='utf-8-sig') 的输出格式相同。
+    """
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    exists = os.path.isfile(file_name) and os.path.getsize(file_name) > 0
+    if exists:
+        _repair_tail(file_name)
+
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=not exists)
+    payload = buf.getvalue().encode('utf-8')
+    if not exists:
+        payload = '\ufeff'.encode('utf-8') + payload
+    _fsync_append(file_name, payload)
+
+
+class ScanCheckpoint:
+    """一次采集运行的检查点"""
+
+    def __init__(self, path, run_id, fetch_date, units, done=None, complete=False):
+        self.path = path
+        self.run_id = run_id
+        self.fetch_date = fetch_date
+        self.units = [tuple(u) for u in units]
+        self.done = done or {}
+        self.complete = complete
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_name(checkpoint_dir, run_id):
+        return os.path.join(checkpoint_dir, f"scan-{run_id.replace(':', '')}.jsonl")
+
+    @classmethod
+    def create(cls, checkpoint_dir, run_id, fetch_date, units):
+        """为新的采集运行创建检查点文件"""
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        path = cls.file_name(checkpoint_dir, run_id)
+        # --resume 只续采最近一次运行，更早的检查点从此不再可达
+        for name in cls._names(checkpoint_dir):
+            if os.path.join(checkpoint_dir, name) < path:
+                os.remove(os.path.join(checkpoint_dir, name))
+        header = {'type': 'header', 'run_id': run_id, 'fetch_date': fetch_date, 'units': [list(u) for u in units]}
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        return cls(path, run_id, fetch_date, units)
+
+    @classmethod
+    def load(cls, path):
+        """读取检查点文件（忽略崩溃时写了一半的末行）"""
+        header, done, complete = None, {}, False
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry['type'] == 'header':
+                    header = entry
+                elif entry['type'] == 'done':
+                    done[tuple(entry['unit'])] = entry['status']
+                elif entry['type'] == 'complete':
+                    complete = True
+        if header is None:
+            raise ValueError(f"检查点文件缺少表头: {path}")
+        return cls(path, header['run_id'], header['fetch_date'], header['units'], done, complete)
+
+    @staticmethod
+    def _names(checkpoint_dir):
+        """目录中的检查点文件名（按运行先后排序）"""
+        if not os.path.isdir(checkpoint_dir):
+            return []
+        return sorted(n for n in os.listdir(checkpoint_dir) if n.startswith('scan-') and n.endswith('.jsonl'))
+
+    @classmethod
+    def latest(cls, checkpoint_dir):
+        """返回最近一次采集运行的检查点，没有时返回 None"""
+        names = cls._names(checkpoint_dir)
+        return cls.load(os.path.join(checkpoint_dir, names[-1])) if names else None
+
+    def pending_units(self):
+        """尚未完成的工作单元（保持原有顺序）"""
+        return [u for u in self.units if u not in self.done]
+
+    def mark_done(self, unit, status, rows):
+        with self._lock:
+            entry = {'type': 'done', 'unit': list(unit), 'status': status, 'rows': rows}
+            _fsync_append(self.path, (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+            self.done[tuple(unit)] = status
+            if not self.complete and len(self.done) == len(self.units):
+                # 先写完成标记（删除失败时 latest 仍能识别为已完成），再删除文件
+                _fsync_append(self.path, b'{"type": "complete"}\n')
+                self.complete = True
+                os.remove(self.path)
+
+
+class StreamingScanWriter:
+    """
+    按工作单元顺序流式写出采集结果
+
+    并发模式下单元完成顺序不确定，这里缓存先完成的结果，只按工作单元顺序连续提交，
+    因此输出文件的行顺序与顺序模式一致；崩溃时已缓存但未提交的单元不会记为完成。
+    """
+
+    def __init__(self, checkpoint, file_for_route, store=None):
+        """
+        参数:
+            checkpoint: ScanCheckpoint 实例
+            file_for_route: 函数 (出发地, 目的地) -> CSV 路径
+            store: PartitionedStore，不为 None 时同时写入分区列式存储
+        """
+        self.checkpoint = checkpoint
+        self.file_for_route = file_for_route
+        self.store = store
+        self.rows_written = {}
+        self.date_ranges = {}
+        # 每条航线本次第一次追加前的文件大小（数据集清单据此只扫描追加的部分）
+        self.start_offsets = {}
+        self._pending = {}
+        self._next_seq = 1
+        self._lock = threading.Lock()
+
+    def commit(self, seq, unit, status, df):
+        """
+        提交一个工作单元的结果
+
+        参数:
+            seq: 单元在本次扫描中的序号（从 1 开始）
+            unit: (出发地, 目的地, 提前天数, 起飞日期)
+            status: 'ok' / 'empty' / 'error'
+            df: status 为 'ok' 时的数据
+        """
+        with self._lock:
+            self._pending[seq] = (unit, status, df)
+            while self._next_seq in self._pending:
+                unit, status, df = self._pending.pop(self._next_seq)
+                self._next_seq += 1
+                self._flush(unit, status, df)
+
+    def _flush(self, unit, status, df):
+        origin, destination = unit[0], unit[1]
+        rows = 0
+        if status == 'ok' and df is not None and len(df):
+            file_name = self.file_for_route(origin, destination)
+            if (origin, destination) not in self.start_offsets:
+                if os.path.isfile(file_name):
+                    _repair_tail(file_name)
+                self.start_offsets[(origin, destination)] = (os.path.getsize(file_name)
+                                                             if os.path.isfile(file_name) else 0)
+            append_csv_rows(file_name, df)
+            if self.store is not None:
+                self.store.append(df, origin, destination)
+            rows = len(df)
+            self.rows_written[(origin, destination)] = self.rows_written.get((origin, destination), 0) + rows
+            self._track_dates((origin, destination), unit[3])
+        if status != 'error':
+            self.checkpoint.mark_done(unit, status, rows)
+
+    def _track_dates(self, route, departure_date):
+        """记录每条航线本次写入的采集日期 / 起飞日期范围（供数据集清单合并）"""
+        ranges = self.date_ranges.setdefault(route, {'采集日期': [self.checkpoint.fetch_date] * 2,
+                                                     '起飞日期': [departure_date] * 2})
+        low, high = ranges['起飞日期']
+        ranges['起飞日期'] = [min(low, departure_date), max(high, departure_date)]
@@ -0,0 +1,336 @@
+"""
+本地 Amadeus 模拟服务
+====================
+
+在本机启动一个模拟 OAuth、flight-offers 和 flight-dates 接口的 HTTP 服务，
+用于在没有真实 API 密钥的情况下测试和压测采集器。
+
+使用方法:
+    with MockAmadeusServer(latency=0.2) as server:
+        client = server.client()
+        client.shopping.flight_offers_search.get(...)
+
+故障注入:
+    MockAmadeusServer(error_rate=0.3, error_status=429, retry_after=1)  # 30% 请求返回 429
+    MockAmadeusServer(failing_routes={('SZX', 'PEK')})                  # 该航线始终返回 500
+    MockAmadeusServer(empty_weekdays={1, 3, 5})                         # 周二、四、六起飞无航班（稀疏航线）
+
+录制回放:
+    MockAmadeusServer(recorded=load_recorded_responses('data/archive'))  # 返回归档中的真实响应
+
+独立运行（配合采集器的 AMADEUS_HOST 环境变量）:
+    python src/collectors/mock_amadeus.py --port 8080 --latency 0.2 --error-rate 0.05
+    AMADEUS_HOST=127.0.0.1:8080 AMADEUS_CLIENT_ID=mock AMADEUS_CLIENT_SECRET=mock \
+        python src/collectors/1_collector.py
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+CARRIERS = ['CZ', 'MU', 'HU', 'ZH', 'CA']
+HUBS = ['CAN', 'PEK', 'SHA', 'CKG', 'WUH']
+
+
+def generate_offers(origin, destination, departure_date, count, seed=0):
+    """
+    生成某一天的合成报价（同一参数多次调用结果一致）
+
+    返回:
+        list: 与 Amadeus flight-offers 响应 data 字段结构相同的报价列表
+    """
+    rng = random.Random(f"{seed}-{origin}-{destination}-{departure_date}")
+    day = datetime.strptime(departure_date, '%Y-%m-%d')
+    offers = []
+    for n in range(count):
+        carrier = rng.choice(CARRIERS)
+        stops = rng.choice([0, 1, 1, 2])
+        dept = day + timedelta(hours=rng.randint(6, 22), minutes=rng.choice([0, 15, 30, 45]))
+        segments = []
+        current = dept
+        route = [origin] + rng.sample(HUBS, stops) + [destination]
+        for a, b in zip(route[:-1], route[1:]):
+            arr = current + timedelta(minutes=rng.randint(90, 180))
+            segments.append({
+                'departure': {'iataCode': a, 'at': current.strftime('%Y-%m-%dT%H:%M:%S')},
+                'arrival': {'iataCode': b, 'at': arr.strftime('%Y-%m-%dT%H:%M:%S')},
+                'carrierCode': carrier,
+                'number': str(rng.randint(1000, 9999)),
+            })
+            current = arr + timedelta(minutes=rng.randint(60, 300))
+        total_minutes = int((datetime.strptime(segments[-1]['arrival']['at'], '%Y-%m-%dT%H:%M:%S') - dept).total_seconds() // 60)
+        offers.append({
+            'type': 'flight-offer',
+            'id': str(n + 1),
+            'numberOfBookableSeats': rng.randint(1, 9),
+            'itineraries': [{
+                'duration': f"PT{total_minutes // 60}H{total_minutes % 60}M",
+                'segments': segments,
+            }],
+            'price': {'currency': 'CNY', 'total': f"{rng.uniform(320, 1500):.2f}"},
+            'validatingAirlineCodes': [carrier],
+        })
+    return offers
+
+
+def synthetic_routes(count):
+    """生成 count 条合成航线（第一条为 SZX->YIH），用于多航线压测"""
+    airports = ['SZX', 'YIH'] + HUBS + ['KMG', 'CTU', 'XIY', 'HGH', 'NKG', 'TAO', 'XMN',
+                                        'CSX', 'HAK', 'SYX', 'DLC', 'SHE', 'HRB', 'URC']
+    routes = [('SZX', 'YIH')]
+    for a in airports:
+        for b in airports:
+            if len(routes) >= count:
+                return routes
+            if a != b and (a, b) not in routes:
+                routes.append((a, b))
+    return routes
+
+
+def load_recorded_responses(archive_dir):
+    """
+    从原始响应归档加载录制的报价
+
+    返回:
+        dict: {(出发地, 目的地): [offers, ...]}，只包含非空响应
+    """
+    from src.collectors.raw_archive import RawArchive
+
+    recorded = {}
+    if not os.path.isdir(archive_dir):
+        return recorded
+    for record in RawArchive(archive_dir).iter_records():
+        offers = (record['response'] or {}).get('data')
+        if offers:
+            recorded.setdefault((record['origin'], record['destination']), []).append(offers)
+    return recorded
+
+
+def _shift_offers(offers, departure_date):
+    """把录制报价的日期平移到请求的起飞日期，保留时刻和时长"""
+    first_day = offers[0]['itineraries'][0]['segments'][0]['departure']['at'][:10]
+    delta = datetime.strptime(departure_date, '%Y-%m-%d') - datetime.strptime(first_day, '%Y-%m-%d')
+    if not delta:
+        return offers
+    shifted = json.loads(json.dumps(offers))
+    for offer in shifted:
+        for segment in offer['itineraries'][0]['segments']:
+            for end in ('departure', 'arrival'):
+                at = datetime.strptime(segment[end]['at'], '%Y-%m-%dT%H:%M:%S') + delta
+                segment[end]['at'] = at.strftime('%Y-%m-%dT%H:%M:%S')
+    return shifted
+
+
+class MockAmadeusServer:
+    """模拟 Amadeus API 的本地 HTTP 服务"""
+
+    def __init__(self, latency=0.0, offers_per_day=20, seed=0, host='127.0.0.1', port=0,
+                 error_rate=0.0, error_status=503, retry_after=None, failing_routes=(),
+                 latency_jitter=0.0, empty_rate=0.0, recorded=None, empty_weekdays=()):
+        """
+        参数:
+            latency: 每个 flight-offers 请求的模拟延迟（秒）
+            latency_jitter: 在 latency 之上叠加的随机延迟上限（秒，均匀分布）
+            offers_per_day: 每个起飞日期返回的报价数，也可以是 (最少, 最多) 区间
+            empty_rate: 返回空结果（无航班）的比例
+            empty_weekdays: 始终无航班的起飞星期几集合（0 为周一），flight-dates 也不列出这些日期
+            seed: 合成数据和故障注入的随机种子
+            port: 监听端口，0 表示自动分配
+            error_rate: flight-offers 请求随机失败的比例
+            error_status: 注入故障的 HTTP 状态码
+            retry_after: 注入故障时附带的 Retry-After 秒数，None 表示不带
+            failing_routes: 始终返回 500 的 (出发地, 目的地) 集合
+            recorded: load_recorded_responses 的返回值；有录制数据的航线返回录制报价（日期平移到请求日期），
+                      其余航线返回合成报价
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.empty_rate = empty_rate
+        self.empty_weekdays = set(empty_weekdays)
+        self.recorded = recorded or {}
+        self.offers_per_day = offers_per_day
+        self.seed = seed
+        self.host = host
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.failing_routes = set(failing_routes)
+        self._fault_rng = random.Random(seed)
+        self.request_count = 0
+        self.error_count = 0
+        self._count_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/vnd.amadeus+json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                if urlparse(self.path).path == '/v1/security/oauth2/token':
+                    self._send_json(200, {
+                        'type': 'amadeusOAuth2Token',
+                        'access_token': 'mock-token',
+                        'token_type': 'Bearer',
+                        'expires_in': 1799,
+                    })
+                else:
+                    self._send_json(404, {'errors': [{'status': 404, 'title': 'NOT FOUND'}]})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path == '/v2/shopping/flight-offers':
+                    route = (params.get('originLocationCode'), params.get('destinationLocationCode'))
+                elif url.path == '/v1/shopping/flight-dates':
+                    route = (params.get('origin'), params.get('destination'))
+                else:
+                    self._send_json(404, {'errors': [{'status': 404, 'title': 'NOT FOUND'}]})
+                    return
+                with server._count_lock:
+                    server.request_count += 1
+                    status = None
+                    if route in server.failing_routes:
+                        status = 500
+                    elif server.error_rate and server._fault_rng.random() < server.error_rate:
+                        status = server.error_status
+                    if status:
+                        server.error_count += 1
+                    empty = bool(server.empty_rate) and server._fault_rng.random() < server.empty_rate
+                    delay = server.latency + (server._fault_rng.uniform(0, server.latency_jitter)
+                                             if server.latency_jitter else 0.0)
+                if delay:
+                    time.sleep(delay)
+                if status:
+                    headers = {'Retry-After': str(server.retry_after)} if server.retry_after is not None else None
+                    self._send_json(status, {'errors': [{'status': status, 'code': 0, 'title': 'INJECTED FAULT'}]}, headers)
+                    return
+                if url.path == '/v1/shopping/flight-dates':
+                    dates = server.flight_dates_for(route, params.get('departureDate'))
+                    self._send_json(200, {'data': dates})
+                    return
+                offers = [] if empty else server.offers_for(route, params['departureDate'])
+                self._send_json(200, {'meta': {'count': len(offers)}, 'data': offers})
+
+        return Handler
+
+    def offers_for(self, route, departure_date):
+        """某航线某起飞日期返回的报价（同一参数多次调用结果一致）"""
+        if datetime.strptime(departure_date, '%Y-%m-%d').weekday() in self.empty_weekdays:
+            return []
+        recorded = self.recorded.get(route)
+        if recorded:
+            day = datetime.strptime(departure_date, '%Y-%m-%d').toordinal()
+            return _shift_offers(recorded[day % len(recorded)], departure_date)
+
+        count = self.offers_per_day
+        if isinstance(count, (tuple, list)):
+            count = random.Random(f"{self.seed}-{route}-{departure_date}").randint(*count)
+        return generate_offers(route[0] or '', route[1] or '', departure_date, count, self.seed)
+
+    def flight_dates_for(self, route, window=None):
+        """
+        flight-dates 接口：窗口内有航班的起飞日期及最低价
+
+        参数:
+            window: 'YYYY-MM-DD,YYYY-MM-DD' 或单个日期，默认从明天起 30 天
+        """
+        if window:
+            first, _, last = window.partition(',')
+            start = datetime.strptime(first, '%Y-%m-%d')
+            end = datetime.strptime(last or first, '%Y-%m-%d')
+        else:
+            start = datetime.now() + timedelta(days=1)
+            end = start + timedelta(days=29)
+        dates = []
+        day = start
+        while day <= end:
+            departure_date = day.strftime('%Y-%m-%d')
+            offers = self.offers_for(route, departure_date)
+            if offers:
+                cheapest = min(float(offer['price']['total']) for offer in offers)
+                dates.append({'type': 'flight-date', 'origin': route[0], 'destination': route[1],
+                              'departureDate': departure_date, 'price': {'total': f"{cheapest:.2f}"}})
+            day += timedelta(days=1)
+        return dates
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def client(self):
+        """创建指向本服务的 amadeus.Client"""
+        from amadeus import Client
+        return Client(client_id='mock', client_secret='mock',
+                      host=self.host, port=self.port, ssl=False)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地 Amadeus 模拟服务')
+    parser.add_argument('--port', type=int, default=8080, help='监听端口')
+    parser.add_argument('--latency', type=float, default=0.0, help='固定延迟（秒）')
+    parser.add_argument('--latency-jitter', type=float, default=0.0, help='随机附加延迟上限（秒）')
+    parser.add_argument('--offers', type=int, nargs='+', default=[20], help='每天报价数，或 最少 最多')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='随机失败比例')
+    parser.add_argument('--error-status', type=int, default=503, help='注入故障的状态码')
+    parser.add_argument('--retry-after', type=float, default=None, help='故障响应的 Retry-After 秒数')
+    parser.add_argument('--empty-rate', type=float, default=0.0, help='返回无航班的比例')
+    parser.add_argument('--recorded', default=None, help='回放该归档目录中录制的响应')
+    parser.add_argument('--empty-weekdays', type=int, nargs='*', default=[],
+                        help='始终无航班的起飞星期几（0 为周一）')
+    args = parser.parse_args()
+
+    offers = args.offers[0] if len(args.offers) == 1 else tuple(args.offers[:2])
+    recorded = load_recorded_responses(args.recorded) if args.recorded else None
+    server = MockAmadeusServer(latency=args.latency, latency_jitter=args.latency_jitter,
+                               offers_per_day=offers, port=args.port, error_rate=args.error_rate,
+                               error_status=args.error_status, retry_after=args.retry_after,
+                               empty_rate=args.empty_rate, recorded=recorded,
+                               empty_weekdays=args.empty_weekdays)
+    print(f"模拟 Amadeus 服务已启动: http://{server.host}:{server.port}  (Ctrl+C 停止)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    main()
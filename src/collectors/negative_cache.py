@@ -0,0 +1,150 @@
+"""
+无航班负缓存
+====================
+
+记录最近返回“无航班”的 (航线, 起飞日期) 和 (航线, 星期几)，在 TTL 内跳过这些查询，
+只按 sample_rate 抽样复查，避免稀疏航线每次运行都为同样的空结果付出 API 调用和等待时间。
+
+- 日期条目: 某航线某起飞日期搜索为空（或预扫描未列出该日期），TTL 内跳过
+- 星期条目: 某航线同一星期几在 weekday_threshold 个不同的采集周里搜索为空，且为空的起飞日期也至少有
+  weekday_threshold 个（如只在周二、周五执行的航线），TTL 内该星期几的新日期也跳过。
+  每个采集周最多计一次：一次 30 天扫描里同一星期几的 4-5 个日期、一天两次采集重复查到的同一日期都不会叠加计数
+
+任何一次搜索到航班都会立即清除对应的日期和星期条目。缓存保存在 JSON 文件中，写入时先写临时文件再替换。
+
+文件格式:
+    {"dates": {"SZX-YIH|2026-01-05": {"checked": "2026-01-01", "source": "search" | "prescan"}},
+     "weekdays": {"SZX-YIH|0": {"weeks": ["2025-W52", "2026-W01"], "dates": ["2026-01-05", "2026-01-12"],
+                                "checked": "2026-01-01"}}}
+"""
+
+import json
+import os
+import random
+import threading
+from datetime import datetime
+
+
+def _date_key(origin, destination, target_date):
+    return f"{origin}-{destination}|{target_date}"
+
+
+def _weekday_key(origin, destination, target_date):
+    weekday = datetime.strptime(target_date, '%Y-%m-%d').weekday()
+    return f"{origin}-{destination}|{weekday}"
+
+
+def _iso_week(day):
+    year, week, _ = datetime.strptime(day, '%Y-%m-%d').isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _add_recent(values, value, keep):
+    """把 value 并入有序列表，只保留最近的 keep 个（判断是否达到阈值只需要这么多）"""
+    return sorted(set(values) | {value})[-keep:]
+
+
+def _age_days(checked, today):
+    return (datetime.strptime(today, '%Y-%m-%d') - datetime.strptime(checked, '%Y-%m-%d')).days
+
+
+class NegativeCache:
+    """带 TTL 的无航班负缓存（线程安全）"""
+
+    def __init__(self, path, ttl_days=7, sample_rate=0.1, weekday_threshold=3, seed=None):
+        """
+        参数:
+            path: 缓存文件路径，不存在时从空缓存开始
+            ttl_days: 条目有效天数（按采集日期计算）
+            sample_rate: 命中缓存的单元仍被查询的概率，用于发现新开的航班
+            weekday_threshold: 同一星期几在多少个不同采集周里为空（且为空的起飞日期不少于该数）后跳过该星期几
+            seed: 抽样随机种子
+        """
+        self.path = path
+        self.ttl_days = ttl_days
+        self.sample_rate = sample_rate
+        self.weekday_threshold = weekday_threshold
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.dates = {}
+        self.weekdays = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.dates = data.get('dates', {})
+            # 旧格式的星期条目（按次数累计的 'empty'）会高估，丢弃后重新积累
+            self.weekdays = {k: v for k, v in data.get('weekdays', {}).items() if 'weeks' in v}
+
+    def _fresh(self, entry, today):
+        return entry is not None and _age_days(entry['checked'], today) < self.ttl_days
+
+    def is_cached(self, unit, today):
+        """单元 (出发地, 目的地, 提前天数, 起飞日期) 是否命中有效的日期或星期条目"""
+        origin, destination, _, target_date = unit
+        if self._fresh(self.dates.get(_date_key(origin, destination, target_date)), today):
+            return True
+        weekday = self.weekdays.get(_weekday_key(origin, destination, target_date))
+        return (self._fresh(weekday, today) and len(weekday['weeks']) >= self.weekday_threshold
+                and len(weekday['dates']) >= self.weekday_threshold)
+
+    def filter_units(self, units, today):
+        """
+        去掉命中缓存的单元（按 sample_rate 抽样保留）
+
+        返回:
+            tuple: (要查询的单元, 跳过的单元)，均保持原有顺序
+        """
+        kept, skipped = [], []
+        for unit in units:
+            if self.is_cached(unit, today) and self._rng.random() >= self.sample_rate:
+                skipped.append(unit)
+            else:
+                kept.append(unit)
+        return kept, skipped
+
+    def record(self, unit, status, today):
+        """记录一次搜索结果：'empty' 写入缓存，'ok' 清除缓存，'error' 忽略"""
+        origin, destination, _, target_date = unit
+        date_key = _date_key(origin, destination, target_date)
+        weekday_key = _weekday_key(origin, destination, target_date)
+        with self._lock:
+            if status == 'empty':
+                self.dates[date_key] = {'checked': today, 'source': 'search'}
+                weekday = self.weekdays.get(weekday_key)
+                if not self._fresh(weekday, today):
+                    weekday = {'weeks': [], 'dates': []}
+                keep = self.weekday_threshold
+                self.weekdays[weekday_key] = {
+                    'weeks': _add_recent(weekday['weeks'], _iso_week(today), keep),
+                    'dates': _add_recent(weekday['dates'], target_date, keep),
+                    'checked': today,
+                }
+            elif status == 'ok':
+                self.dates.pop(date_key, None)
+                self.weekdays.pop(weekday_key, None)
+
+    def mark_prescan(self, origin, destination, target_date, has_flights, today):
+        """记录预扫描结果：未列出的日期写入缓存，列出的日期清除日期条目和所在星期几的条目"""
+        key = _date_key(origin, destination, target_date)
+        with self._lock:
+            if has_flights:
+                self.dates.pop(key, None)
+                self.weekdays.pop(_weekday_key(origin, destination, target_date), None)
+            else:
+                self.dates[key] = {'checked': today, 'source': 'prescan'}
+
+    def prune(self, today):
+        """删除过期条目"""
+        with self._lock:
+            self.dates = {k: v for k, v in self.dates.items() if self._fresh(v, today)}
+            self.weekdays = {k: v for k, v in self.weekdays.items() if self._fresh(v, today)}
+
+    def save(self):
+        """原子写回缓存文件"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            data = {'dates': self.dates, 'weekdays': self.weekdays}
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,118 @@
+"""
+航班报价解析
+====================
+
+把 Amadeus flight-offers 接口返回的 JSON 解析为 13 列的中文数据表。
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+COLUMNS = ['采集日期', '起飞日期', '提前天数', '航班号', '航司', '类型', '起飞时间', '到达时间',
+           '总时长', '中转地', '中转时长', '剩余座位', '价格']
+
+
+@lru_cache(maxsize=4096)
+def parse_duration(iso_duration):
+    if not iso_duration: return ""
+    hours = re.search(r'(\d+)H', iso_duration)
+    minutes = re.search(r'(\d+)M', iso_duration)
+    h_str = f"{hours.group(1)}小时" if hours else ""
+    m_str = f"{minutes.group(1)}分" if minutes else ""
+    return h_str + m_str
+
+
+def calculate_layover(segments):
+    if len(segments) < 2: return "无", "0"
+    total_wait_seconds = 0
+    layover_locs = []
+    for i in range(len(segments) - 1):
+        layover_locs.append(segments[i]['arrival']['iataCode'])
+        # fromisoformat 比 strptime 快一个数量级，格式同为 %Y-%m-%dT%H:%M:%S
+        arr = datetime.fromisoformat(segments[i]['arrival']['at'])
+        dep = datetime.fromisoformat(segments[i+1]['departure']['at'])
+        total_wait_seconds += (dep - arr).total_seconds()
+    return "/".join(layover_locs), f"{int(total_wait_seconds // 3600)}h{int((total_wait_seconds % 3600) // 60)}m"
+
+
+def parse_offers_columnar(offers):
+    """
+    一次遍历把整批报价解析为列式数组
+
+    每个派生字段只计算一次；按价格稳定排序后，用哈希集合按 (首段起飞时间, 末段到达时间)
+    去重，保留最低价，取代 DataFrame 的 sort_values + drop_duplicates。
+
+    返回:
+        dict: {列名: list}，不含采集日期/起飞日期/提前天数三个常量列，行按价格升序
+    """
+    parsed = []
+    for flight in offers:
+        itinerary = flight['itineraries'][0]
+        segments = itinerary['segments']
+        first, last = segments[0], segments[-1]
+        dept_at = first['departure']['at']
+        arr_at = last['arrival']['at']
+        layover_loc, layover_time = calculate_layover(segments)
+        parsed.append((
+            float(flight['price']['total']),
+            dept_at,
+            arr_at,
+            first['carrierCode'] + first['number'],
+            flight['validatingAirlineCodes'][0],
+            "直飞" if len(segments) == 1 else "中转",
+            dept_at[11:16],
+            arr_at[11:16],
+            parse_duration(itinerary['duration']),
+            layover_loc,
+            layover_time,
+            flight['numberOfBookableSeats'],
+        ))
+
+    parsed.sort(key=lambda row: row[0])
+
+    columns = {name: [] for name in COLUMNS[3:]}
+    seen = set()
+    for (price, dept_at, arr_at, flight_no, airline, kind, dept_time, arr_time,
+         duration, layover_loc, layover_time, seats) in parsed:
+        key = (dept_at, arr_at)
+        if key in seen:
+            continue
+        seen.add(key)
+        columns['航班号'].append(flight_no)
+        columns['航司'].append(airline)
+        columns['类型'].append(kind)
+        columns['起飞时间'].append(dept_time)
+        columns['到达时间'].append(arr_time)
+        columns['总时长'].append(duration)
+        columns['中转地'].append(layover_loc)
+        columns['中转时长'].append(layover_time)
+        columns['剩余座位'].append(seats)
+        columns['价格'].append(price)
+    return columns
+
+
+def build_daily_frame(offers, fetch_date, target_date, days_ahead):
+    """
+    解析某一起飞日期的全部报价
+
+    参数:
+        offers: response.data 列表
+        fetch_date: 采集日期 (YYYY-MM-DD)
+        target_date: 起飞日期 (YYYY-MM-DD)
+        days_ahead: 提前天数
+
+    返回:
+        DataFrame: 按价格排序并按起降时间去重后的当日数据，无数据时返回 None
+    """
+    if not offers:
+        return None
+
+    # 采集器启动时不载入 pandas，第一批报价到达时才载入
+    import pandas as pd
+
+    columns = parse_offers_columnar(offers)
+    n = len(columns['价格'])
+    data = {'采集日期': [fetch_date] * n, '起飞日期': [target_date] * n, '提前天数': [days_ahead] * n}
+    data.update(columns)
+    return pd.DataFrame(data, columns=COLUMNS)
@@ -0,0 +1,60 @@
+"""
+令牌桶限流器
+====================
+
+所有采集线程共享同一个令牌桶，保证整体请求速率不超过 Amadeus 配额
+（测试环境 10 次/秒，且每 100ms 不超过 1 次）。
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """线程安全的令牌桶限流器"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        初始化限流器
+
+        参数:
+            rate: 每秒补充的令牌数（即允许的请求速率），为 None 或 0 时不限流
+            capacity: 桶容量（允许的最大突发请求数）
+        """
+        self.rate = float(rate) if rate else 0.0
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        # 至少有一个线程在等待令牌的墙钟时间（各线程的等待区间取并集，不按线程数重复累加）
+        self.blocked_seconds = 0.0
+        self._blocked_until = self._last
+
+    def acquire(self, tokens=1):
+        """
+        获取令牌，不足时阻塞等待
+
+        在锁内预占令牌（余额可以为负），再在锁外休眠到轮到自己的时刻，
+        这样多个线程按到达顺序排队，不会在锁上忙等。
+
+        返回:
+            float: 本次等待的秒数
+        """
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait > 0:
+                # 排队线程的等待结束时刻单调递增，只需累加超出上一段等待区间的部分
+                end = now + wait
+                self.blocked_seconds += end - max(now, self._blocked_until)
+                self._blocked_until = end
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
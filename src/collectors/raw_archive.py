@@ -0,0 +1,153 @@
+"""
+原始响应归档
+====================
+
+把每一次 Amadeus flight-offers 响应原样追加到压缩归档中，
+以便在解析逻辑或数据表结构变化后离线重建历史数据，无需再次调用 API。
+
+存储结构（data/archive/）:
+    raw-YYYY-MM-DD.jsonl.gz   按采集日期分段，每条记录是一个独立的 gzip 成员（一行 JSON）
+    index.jsonl               偏移索引，每行记录一条响应所在的分段、偏移量、长度和元数据
+
+多个 gzip 成员拼接后仍是合法的 gzip 文件，因此分段既可以整体顺序读取，
+也可以按索引定位单条记录随机读取。分段文件只追加、不改写。
+"""
+
+import gzip
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+
+INDEX_FILE = 'index.jsonl'
+
+
+def segment_name(fetch_date):
+    return f'raw-{fetch_date}.jsonl.gz'
+
+
+class RawArchive:
+    """只追加的原始响应归档（线程安全）"""
+
+    def __init__(self, archive_dir, run_id=None):
+        """
+        参数:
+            archive_dir: 归档目录
+            run_id: 本次采集运行的标识，默认为当前时间；用于回放时区分同一天的多次采集
+        """
+        self.archive_dir = archive_dir
+        self.run_id = run_id or datetime.now().strftime('%Y-%m-%dT%H:%M:%S')
+        self.index_path = os.path.join(archive_dir, INDEX_FILE)
+        self._lock = threading.Lock()
+
+    def append(self, fetch_date, origin, destination, departure_date, days_ahead, result):
+        """
+        追加一条原始响应
+
+        参数:
+            result: response.result（接口返回的完整 JSON）
+        """
+        record = {
+            'run_id': self.run_id,
+            'fetch_date': fetch_date,
+            'origin': origin,
+            'destination': destination,
+            'departure_date': departure_date,
+            'days_ahead': days_ahead,
+            'response': result,
+        }
+        member = gzip.compress(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        segment = segment_name(fetch_date)
+
+        with self._lock:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            with open(os.path.join(self.archive_dir, segment), 'ab') as f:
+                offset = f.tell()
+                f.write(member)
+            entry = {key: record[key] for key in record if key != 'response'}
+            entry.update({'segment': segment, 'offset': offset, 'length': len(member)})
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def read_index(self):
+        """读取偏移索引"""
+        if not os.path.exists(self.index_path):
+            return []
+        entries = []
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entries.append(json.loads(line))
+        return entries
+
+    def iter_records(self, routes=None, since=None, until=None):
+        """
+        按索引读取归档记录
+
+        参数:
+            routes: 只读取这些 (出发地, 目的地) 航线，None 表示全部
+            since / until: 采集日期范围（含两端，YYYY-MM-DD），None 表示不限
+
+        返回:
+            generator: 记录字典，顺序为 (run_id, 出发地, 目的地, 提前天数)，与采集器写入顺序一致
+        """
+        routes = set(routes) if routes else None
+        entries = [
+            e for e in self.read_index()
+            if (routes is None or (e['origin'], e['destination']) in routes)
+            and (since is None or e['fetch_date'] >= since)
+            and (until is None or e['fetch_date'] <= until)
+        ]
+        entries.sort(key=lambda e: (e['run_id'], e['origin'], e['destination'], e['days_ahead']))
+
+        handles = {}
+        try:
+            for entry in entries:
+                f = handles.get(entry['segment'])
+                if f is None:
+                    f = handles[entry['segment']] = open(os.path.join(self.archive_dir, entry['segment']), 'rb')
+                f.seek(entry['offset'])
+                yield json.loads(gzip.decompress(f.read(entry['length'])))
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def rebuild_index(self):
+        """
+        扫描所有分段重建偏移索引（索引丢失或损坏时使用）
+
+        分段末尾若有写了一半的 gzip 成员（采集进程崩溃），会被跳过。
+
+        返回:
+            int: 索引记录数
+        """
+        entries = []
+        for name in sorted(os.listdir(self.archive_dir)):
+            if not (name.startswith('raw-') and name.endswith('.jsonl.gz')):
+                continue
+            with open(os.path.join(self.archive_dir, name), 'rb') as f:
+                buf = f.read()
+            offset = 0
+            while offset < len(buf):
+                decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                try:
+                    payload = decoder.decompress(buf[offset:])
+                except zlib.error:
+                    break
+                if not decoder.eof:
+                    break
+                length = len(buf) - offset - len(decoder.unused_data)
+                record = json.loads(payload)
+                entry = {key: record[key] for key in record if key != 'response'}
+                entry.update({'segment': name, 'offset': offset, 'length': length})
+                entries.append(entry)
+                offset += length
+
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.index_path)
+        return len(entries)
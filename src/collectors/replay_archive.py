@@ -0,0 +1,110 @@
+"""
+归档回放
+====================
+
+从 data/archive/ 中的原始响应离线重建原始数据 CSV，全程不访问网络。
+解析逻辑或数据表结构变化后，用它按新格式重建全部历史数据。
+
+使用方法:
+    python src/collectors/replay_archive.py                        # 输出到 data/replay/
+    python src/collectors/replay_archive.py --output-dir data/raw  # 覆盖现有原始数据
+    python src/collectors/replay_archive.py --routes SZX-YIH --since 2026-10-01
+    python src/collectors/replay_archive.py --rebuild-index        # 先根据分段重建索引
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from config import ARCHIVE_DIR, DATA_DIR, route_data_file
+from src.collectors.offer_parser import build_daily_frame
+from src.collectors.raw_archive import RawArchive
+
+REPLAY_DIR = os.path.join(DATA_DIR, 'replay')
+
+
+def replay(archive, output_dir, parse_fn=build_daily_frame, routes=None, since=None, until=None):
+    """
+    回放归档并写出每条航线的 CSV
+
+    参数:
+        archive: RawArchive 实例
+        output_dir: 输出目录，文件名与采集器一致
+        parse_fn: 解析函数，签名同 build_daily_frame(offers, fetch_date, target_date, days_ahead)，
+                  可替换为新版本解析逻辑
+        routes / since / until: 过滤条件，见 RawArchive.iter_records
+
+    返回:
+        dict: {(出发地, 目的地): 写出行数}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    handles = {}
+    counts = {}
+
+    try:
+        for record in archive.iter_records(routes=routes, since=since, until=until):
+            offers = (record['response'] or {}).get('data')
+            if not offers:
+                continue
+            df = parse_fn(offers, record['fetch_date'], record['departure_date'], record['days_ahead'])
+            if df is None or df.empty:
+                continue
+
+            route = (record['origin'], record['destination'])
+            if route not in handles:
+                file_name = os.path.join(output_dir, os.path.basename(route_data_file(*route)))
+                # 先写临时文件，全部完成后再原子替换，避免中途失败留下半成品
+                handles[route] = (open(file_name + '.tmp', 'w', encoding='utf-8-sig', newline=''), file_name)
+                counts[route] = 0
+            f, _ = handles[route]
+            df.to_csv(f, index=False, header=counts[route] == 0)
+            counts[route] += len(df)
+    except BaseException:
+        for f, file_name in handles.values():
+            f.close()
+            os.remove(file_name + '.tmp')
+        raise
+
+    for f, file_name in handles.values():
+        f.close()
+        os.replace(file_name + '.tmp', file_name)
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从原始响应归档离线重建原始数据')
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR, help='归档目录')
+    parser.add_argument('--output-dir', default=REPLAY_DIR, help='输出目录')
+    parser.add_argument('--routes', default=None, help='只回放这些航线，如 SZX-YIH,SZX-PEK')
+    parser.add_argument('--since', default=None, help='起始采集日期 (YYYY-MM-DD)')
+    parser.add_argument('--until', default=None, help='结束采集日期 (YYYY-MM-DD)')
+    parser.add_argument('--rebuild-index', action='store_true', help='回放前根据分段文件重建索引')
+    args = parser.parse_args()
+
+    archive = RawArchive(args.archive_dir)
+    if args.rebuild_index:
+        print(f"重建索引: {archive.rebuild_index()} 条记录")
+
+    routes = None
+    if args.routes:
+        routes = [tuple(part.strip().upper().split('-')) for part in args.routes.split(',') if part.strip()]
+
+    start = time.perf_counter()
+    counts = replay(archive, args.output_dir, routes=routes, since=args.since, until=args.until)
+    elapsed = time.perf_counter() - start
+
+    if not counts:
+        print("⚠️ 归档中没有可回放的数据")
+        return
+    for (origin, destination), rows in counts.items():
+        print(f"✅ {origin} -> {destination}: {rows} 行")
+    print(f"输出目录: {args.output_dir}  耗时: {elapsed:.2f} 秒")
+
+
+if __name__ == "__main__":
+    main()
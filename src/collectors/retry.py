@@ -0,0 +1,208 @@
+"""
+重试、退避与熔断
+====================
+
+包装 Amadeus 接口调用：
+
+- RetryPolicy: 带抖动的指数退避（full jitter），遵守 429/503 响应的 Retry-After
+- CircuitBreaker: 按航线熔断，连续失败达到阈值后暂停请求该航线，冷却后放行一次试探请求
+- RetryStats: 本次运行的重试次数、放弃次数、熔断拒绝次数和退避等待时间
+
+只有可恢复的错误（网络错误、429、5xx）会重试；400/401/404 等直接失败。
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from amadeus import ResponseError
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """航线处于熔断状态，请求未发出"""
+    pass
+
+
+def is_retryable(error):
+    """判断 ResponseError 是否值得重试（status_code 为 None 表示网络错误）"""
+    status = getattr(error.response, 'status_code', None)
+    return status is None or status in RETRYABLE_STATUS
+
+
+def retry_after_seconds(error):
+    """解析响应头中的 Retry-After（秒数或 HTTP 日期），没有时返回 None"""
+    headers = getattr(error.response, 'headers', None) or {}
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """带抖动的指数退避策略"""
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=30.0, rng=None):
+        """
+        参数:
+            max_attempts: 最多尝试次数（含第一次）
+            base_delay: 第一次重试的退避上限（秒），之后每次翻倍
+            max_delay: 单次退避上限（秒）
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt, retry_after=None):
+        """
+        第 attempt 次失败后的等待时间
+
+        服务端给出 Retry-After 时以它为准（不超过 max_delay），
+        否则在 [0, min(max_delay, base_delay * 2^(attempt-1))] 内均匀抖动。
+        """
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """按 key（航线）独立计数的熔断器"""
+
+    def __init__(self, failure_threshold=5, cooldown=60.0, clock=time.monotonic):
+        """
+        参数:
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断后多少秒放行一次试探请求
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures = {}
+        self._opened_at = {}
+        self._probing = set()
+        self._lock = threading.Lock()
+
+    def state(self, key):
+        with self._lock:
+            if key not in self._opened_at:
+                return 'closed'
+            if self._clock() - self._opened_at[key] >= self.cooldown:
+                return 'half-open'
+            return 'open'
+
+    def allow(self, key):
+        """是否允许对该 key 发出请求；半开状态下同一时间只放行一个试探请求"""
+        with self._lock:
+            opened_at = self._opened_at.get(key)
+            if opened_at is None:
+                return True
+            if self._clock() - opened_at < self.cooldown or key in self._probing:
+                return False
+            self._probing.add(key)
+            return True
+
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened_at.pop(key, None)
+            self._probing.discard(key)
+
+    def record_failure(self, key):
+        """记录一次失败，返回是否因此进入熔断"""
+        with self._lock:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            probing = key in self._probing
+            self._probing.discard(key)
+            if probing or self._failures[key] >= self.failure_threshold:
+                newly_opened = key not in self._opened_at or probing
+                self._opened_at[key] = self._clock()
+                return newly_opened
+            return False
+
+
+class RetryStats:
+    """单次采集运行的重试统计（线程安全）"""
+
+    FIELDS = ('attempts', 'successes', 'retries', 'give_ups', 'circuit_rejections', 'circuit_opens')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {name: 0 for name in self.FIELDS}
+        self.wait_seconds = 0.0
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def add_wait(self, seconds):
+        with self._lock:
+            self.wait_seconds += seconds
+
+    def summary(self):
+        c = self.counters
+        return (f"请求 {c['attempts']} 次, 成功 {c['successes']}, 重试 {c['retries']}, "
+                f"放弃 {c['give_ups']}, 熔断拒绝 {c['circuit_rejections']} (熔断 {c['circuit_opens']} 次), "
+                f"退避等待 {self.wait_seconds:.1f} 秒")
+
+
+class ResilientCaller:
+    """把重试策略、熔断器和统计组合在一起的调用器，所有采集线程共享一个实例"""
+
+    def __init__(self, policy=None, breaker=None, stats=None, sleep=time.sleep):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = stats or RetryStats()
+        self._sleep = sleep
+
+    def call(self, key, fn):
+        """
+        调用 fn()，失败时按策略重试
+
+        参数:
+            key: 熔断器的 key（航线）
+            fn: 无参函数，发出一次请求并返回响应
+
+        返回:
+            fn() 的返回值
+
+        异常:
+            CircuitOpenError: 航线处于熔断状态
+            ResponseError: 不可重试的错误，或重试次数用尽
+        """
+        for attempt in range(1, self.policy.max_attempts + 1):
+            if not self.breaker.allow(key):
+                self.stats.incr('circuit_rejections')
+                raise CircuitOpenError(f"{key} 熔断中")
+
+            self.stats.incr('attempts')
+            try:
+                result = fn()
+            except ResponseError as e:
+                if not is_retryable(e):
+                    # 参数错误等不是服务端故障，不计入熔断
+                    self.stats.incr('give_ups')
+                    raise
+                if self.breaker.record_failure(key):
+                    self.stats.incr('circuit_opens')
+                if attempt == self.policy.max_attempts:
+                    self.stats.incr('give_ups')
+                    raise
+                wait = self.policy.delay(attempt, retry_after_seconds(e))
+                self.stats.incr('retries')
+                self.stats.add_wait(wait)
+                self._sleep(wait)
+                continue
+
+            self.breaker.record_success(key)
+            self.stats.incr('successes')
+            return result
@@ -0,0 +1,210 @@
+"""
+采集引擎
+====================
+
+按 (航线 × 起飞日期) 调用 Amadeus 航班搜索接口，支持两种模式：
+
+- sequential: 逐个顺序请求（原有行为）
+- concurrent: 线程池保持 N 个请求同时在途
+
+所有航线的工作单元拆分到同一个线程池中，共享同一个 OAuth 客户端和令牌桶限流器，
+结果按航线分组、按起飞日期顺序返回。
+
+可选的预扫描（prescan_routes）每条航线只调用一次 Flight Cheapest Date Search，
+把未列出的起飞日期写入无航班负缓存，正式扫描前即可跳过这些日期。
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from amadeus import ResponseError
+
+from src.collectors.offer_parser import build_daily_frame
+from src.collectors.rate_limiter import TokenBucket
+from src.collectors.retry import CircuitOpenError
+
+SCAN_MODES = ('sequential', 'concurrent')
+
+
+def log(msg):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+def build_target_dates(scan_days, today=None):
+    """
+    生成扫描日期列表
+
+    返回:
+        list: [(提前天数, 'YYYY-MM-DD'), ...]，从明天开始共 scan_days 天
+    """
+    today = today or datetime.now()
+    return [(i, (today + timedelta(days=i)).strftime('%Y-%m-%d')) for i in range(1, scan_days + 1)]
+
+
+def fetch_one_date(client, origin, destination, target_date, days_ahead, fetch_date, limiter,
+                   progress='', archive=None, caller=None):
+    """
+    查询单个起飞日期的航班并解析
+
+    archive 不为 None 时，先把原始响应追加到 RawArchive，再解析。
+    caller 不为 None 时（ResilientCaller），请求按其策略重试并受航线熔断器保护；
+    每次重试都会重新获取限流令牌。
+
+    返回:
+        tuple: (状态, DataFrame)，状态为 'ok' / 'empty'（无航班）/ 'error'（请求失败），
+               非 'ok' 时 DataFrame 为 None
+    """
+    def request():
+        limiter.acquire()
+        return client.shopping.flight_offers_search.get(
+            originLocationCode=origin,
+            destinationLocationCode=destination,
+            departureDate=target_date,
+            adults=1
+        )
+
+    try:
+        response = caller.call((origin, destination), request) if caller else request()
+    except CircuitOpenError:
+        print(f"{progress} -> ⛔ 航线熔断中，跳过", flush=True)
+        return 'error', None
+    except ResponseError as e:
+        print(f"{progress} -> ❌ API错误: {e}", flush=True)
+        return 'error', None
+
+    if archive is not None:
+        archive.append(fetch_date, origin, destination, target_date, days_ahead, response.result)
+
+    if not response.data:
+        print(f"{progress} -> ℹ️ 无航班", flush=True)
+        return 'empty', None
+
+    df = build_daily_frame(response.data, fetch_date, target_date, days_ahead)
+    print(f"{progress} -> ✅ 抓取到 {len(df)} 条数据", flush=True)
+    return 'ok', df
+
+
+def prescan_routes(client, routes, target_dates, negative_cache, fetch_date, limiter=None, caller=None):
+    """
+    预扫描：每条航线调用一次 flight-dates 接口，获取扫描窗口内有航班的起飞日期
+
+    列出的日期清除负缓存，未列出的日期写入负缓存（来源 'prescan'）。
+    接口报错或返回为空（该航线没有缓存数据）时不修改缓存，由正式扫描兜底。
+
+    返回:
+        dict: {(出发地, 目的地): 有航班的日期数}，预扫描失败的航线不在其中
+    """
+    limiter = limiter or TokenBucket(None)
+    dates = [target_date for _, target_date in target_dates]
+    window = f"{min(dates)},{max(dates)}"
+    covered = {}
+
+    for origin, destination in routes:
+        def request():
+            limiter.acquire()
+            return client.shopping.flight_dates.get(origin=origin, destination=destination,
+                                                    departureDate=window, oneWay='true')
+
+        try:
+            response = caller.call((origin, destination), request) if caller else request()
+        except (CircuitOpenError, ResponseError) as e:
+            log(f"⚠️ 预扫描 {origin} -> {destination} 失败，跳过: {e}")
+            continue
+        if not response.data:
+            log(f"ℹ️ 预扫描 {origin} -> {destination} 无缓存数据，跳过")
+            continue
+
+        available = {item.get('departureDate') for item in response.data}
+        for target_date in dates:
+            negative_cache.mark_prescan(origin, destination, target_date,
+                                        target_date in available, fetch_date)
+        covered[(origin, destination)] = len(available & set(dates))
+        log(f"🛰️ 预扫描 {origin} -> {destination}: {covered[(origin, destination)]}/{len(dates)} 天有航班")
+    return covered
+
+
+def build_work_units(routes, target_dates):
+    """
+    展开 (航线 × 起飞日期) 工作矩阵
+
+    返回:
+        list: [(出发地, 目的地, 提前天数, 起飞日期), ...]，按航线、日期排序
+    """
+    return [(origin, destination, days_ahead, target_date)
+            for origin, destination in routes
+            for days_ahead, target_date in target_dates]
+
+
+def scan_routes(client, routes, target_dates, fetch_date,
+                mode='sequential', workers=1, limiter=None, archive=None,
+                units=None, sink=None, caller=None, negative_cache=None):
+    """
+    扫描多条航线的一组起飞日期
+
+    参数:
+        client: amadeus.Client 实例（线程间共享，OAuth 令牌只获取一次）
+        routes: [(出发地, 目的地), ...]
+        target_dates: build_target_dates 的返回值
+        fetch_date: 采集日期
+        mode: 'sequential' 或 'concurrent'
+        workers: 并发模式下同时在途的请求数
+        limiter: 共享的 TokenBucket，为 None 时不限流
+        archive: 共享的 RawArchive，为 None 时不归档原始响应
+        units: 要执行的工作单元列表，默认为完整的 (航线 × 日期) 矩阵；续采时只传未完成的单元
+        sink: 流式写出器（StreamingScanWriter），每个单元完成后立即调用 sink.commit，
+              此时结果不在内存中累积
+        caller: 共享的 ResilientCaller（重试/退避/熔断），为 None 时失败不重试
+        negative_cache: NegativeCache，不为 None 时记录每个单元的结果（空结果写入，有航班清除）
+
+    返回:
+        dict: {(出发地, 目的地): [DataFrame, ...]}，每条航线的列表按起飞日期排序；
+              指定 sink 时各列表为空
+    """
+    if mode not in SCAN_MODES:
+        raise ValueError(f"不支持的采集模式: {mode}")
+
+    limiter = limiter or TokenBucket(None)
+    units = units if units is not None else build_work_units(routes, target_dates)
+    total = len(units)
+    show_route = len(routes) > 1
+
+    def task(item):
+        idx, (origin, destination, days_ahead, target_date) = item
+        label = f"{origin}->{destination} {target_date}" if show_route else target_date
+        progress = f"🔎 [{idx:02d}/{total}] {label}"
+        status, df = fetch_one_date(client, origin, destination, target_date, days_ahead,
+                                    fetch_date, limiter, progress, archive, caller)
+        if negative_cache is not None:
+            negative_cache.record(item[1], status, fetch_date)
+        if sink is not None:
+            sink.commit(idx, item[1], status, df)
+            return None
+        return df
+
+    items = list(enumerate(units, 1))
+    if mode == 'sequential' or workers <= 1:
+        results = [task(item) for item in items]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # map 按提交顺序返回结果，保证输出顺序与工作矩阵顺序一致
+            results = list(pool.map(task, items))
+
+    frames = {(origin, destination): [] for origin, destination in routes}
+    for (origin, destination, _, _), df in zip(units, results):
+        if df is not None:
+            frames[(origin, destination)].append(df)
+    return frames
+
+
+def scan_dates(client, origin, destination, target_dates, fetch_date,
+               mode='sequential', workers=1, limiter=None, archive=None, caller=None):
+    """
+    扫描单条航线的一组起飞日期
+
+    返回:
+        list: 按起飞日期排序的 DataFrame 列表（已去掉无数据的日期）
+    """
+    frames = scan_routes(client, [(origin, destination)], target_dates, fetch_date,
+                         mode=mode, workers=workers, limiter=limiter, archive=archive,
+                         caller=caller)
+    return frames[(origin, destination)]
@@ -0,0 +1,184 @@
+"""
+自适应扫描规划
+====================
+
+根据原始 CSV 历史为每个 (航线, 起飞日期) 工作单元打分，在 API 调用预算内优先查询价格最可能变化的单元。
+
+评分 = 价格波动 × 临近程度 × 陈旧程度
+
+- 价格波动: 同航线同提前天数下，相邻两次采集最低价发生变化的比例（不足时退回全部航线同提前天数），
+  再乘以该起飞日期自身的活跃程度（该日期观测到的变化次数 / 按提前天数期望的变化次数）
+- 临近程度: 1 / (1 + 提前天数 / urgency_scale)，越临近起飞价格越敏感
+- 陈旧程度: 距上次采集该单元的天数 / stale_days（上限 1），从未采集过的单元为 1
+
+提前天数不超过 always_days 的单元优先入选，预算先扣除这些单元，剩余额度按得分分配；
+这些单元本身多于预算时按提前天数从近到远截断，预算始终是硬上限。
+"""
+
+import math
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from src.utils.schema import read_flight_csv
+
+HISTORY_COLUMNS = ['采集日期', '起飞日期', '价格']
+MIN_VOLATILITY = 0.01
+CHANGE_EPSILON = 1e-6
+ACTIVITY_PRIOR = 3  # 活跃程度的平滑强度（相当于几次平均观测）
+
+
+def load_history(routes, file_for_route, since=None, store=None):
+    """
+    读取多条航线的历史数据（只读取规划需要的列）
+
+    参数:
+        routes: [(出发地, 目的地), ...]
+        file_for_route: 函数 (出发地, 目的地) -> CSV 路径
+        since: 只保留该采集日期（YYYY-MM-DD）之后的数据，None 表示全部
+        store: PartitionedStore，已导入全部历史的航线从数据集按分区读取，不再解析 CSV
+
+    返回:
+        DataFrame: 出发地, 目的地, 采集日期, 起飞日期, 价格
+    """
+    frames = []
+    for origin, destination in routes:
+        path = file_for_route(origin, destination)
+        if store is not None and store.has_full_history(origin, destination):
+            df = store.read(columns=HISTORY_COLUMNS, routes=[(origin, destination)], since=since)
+        elif os.path.exists(path):
+            # 日期保持 YYYY-MM-DD 字符串（与分区数据集和工作单元的键一致），价格保持 float64
+            df = read_flight_csv(path, columns=HISTORY_COLUMNS, float32=False, parse_dates=False)
+            if since is not None:
+                df = df[df['采集日期'] >= since]
+        else:
+            continue
+        df.insert(0, '目的地', destination)
+        df.insert(0, '出发地', origin)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['出发地', '目的地'] + HISTORY_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+class ScanPlanner:
+    """按价值挑选工作单元的扫描规划器"""
+
+    def __init__(self, history, today=None, urgency_scale=7.0, stale_days=2.0, always_days=3):
+        """
+        参数:
+            history: load_history 的返回值
+            today: 规划日期，默认今天
+            urgency_scale: 临近程度衰减尺度（天）
+            stale_days: 多少天未采集视为完全陈旧
+            always_days: 提前天数不超过该值的单元优先查询（仍受预算限制）
+        """
+        self.today = pd.Timestamp((today or datetime.now()).strftime('%Y-%m-%d'))
+        self.urgency_scale = urgency_scale
+        self.stale_days = stale_days
+        self.always_days = always_days
+        self._fit(history)
+
+    def _fit(self, history):
+        keys = ['出发地', '目的地', '起飞日期']
+        if history.empty:
+            self.activity = {}
+            self.last_fetch = {}
+            self.route_prior = {}
+            self.global_prior = {}
+            self.overall = 1.0
+            return
+
+        # 同一采集日期内多次采集（早晚各一次）按最低价合并
+        daily = (history.groupby(keys + ['采集日期'], sort=False)['价格'].min()
+                 .reset_index().sort_values(keys + ['采集日期']))
+        # 相邻两次采集之间最低价是否变化（每个起飞日期的第一次观测没有前值，记为 NaN）
+        moved = daily.groupby(keys, sort=False)['价格'].pct_change().abs().gt(CHANGE_EPSILON)
+        daily['变化'] = moved.where(daily.duplicated(keys)).astype(float)
+        daily['提前天数'] = (pd.to_datetime(daily['起飞日期']) - pd.to_datetime(daily['采集日期'])).dt.days
+
+        self.last_fetch = pd.to_datetime(daily.groupby(keys, sort=False)['采集日期'].max()).to_dict()
+
+        changes = daily.dropna(subset=['变化'])
+        self.route_prior = changes.groupby(['出发地', '目的地', '提前天数'])['变化'].mean().to_dict()
+        self.global_prior = changes.groupby('提前天数')['变化'].mean().to_dict()
+        self.overall = float(changes['变化'].mean()) if len(changes) else 1.0
+
+        # 起飞日期的活跃程度：实际变化之和 / 同提前天数下的期望变化之和（平滑后），
+        # 把“周末、节假日更活跃”这类日期特征和“越临近越活跃”的提前天数特征分开
+        expected = changes['提前天数'].map(self.global_prior)
+        ratio = (changes.assign(期望=expected)
+                 .groupby(keys, sort=False)[['变化', '期望']].sum())
+        prior = ACTIVITY_PRIOR * self.overall
+        self.activity = ((ratio['变化'] + prior) / (ratio['期望'] + prior)).to_dict()
+
+    def score(self, unit):
+        """为单个工作单元 (出发地, 目的地, 提前天数, 起飞日期) 打分"""
+        origin, destination, days_ahead, target_date = unit
+        if days_ahead <= self.always_days:
+            return math.inf
+
+        vol = self.route_prior.get((origin, destination, days_ahead))
+        if vol is None:
+            vol = self.global_prior.get(days_ahead, self.overall)
+        vol = max(vol, MIN_VOLATILITY) * self.activity.get((origin, destination, target_date), 1.0)
+
+        urgency = 1.0 / (1.0 + days_ahead / self.urgency_scale)
+
+        last = self.last_fetch.get((origin, destination, target_date))
+        if last is None:
+            staleness = 1.0
+        else:
+            # 当天已采集过的单元也保留少量权重（+0.5 天），避免永远不被选中
+            staleness = min(1.0, ((self.today - last).days + 0.5) / self.stale_days)
+
+        return vol * urgency * staleness
+
+    def select(self, units, budget):
+        """
+        在预算内选出得分最高的单元（提前天数不超过 always_days 的单元优先入选）
+
+        参数:
+            units: 候选工作单元列表
+            budget: 最多查询的单元数，None 表示不限；优先单元多于预算时按提前天数从近到远截断
+
+        返回:
+            list: 入选单元（不超过 budget 个），保持 units 中的原有顺序（输出行顺序不受规划影响）
+        """
+        if budget is None or budget >= len(units):
+            return list(units)
+        always = sorted((i for i, unit in enumerate(units) if unit[2] <= self.always_days),
+                        key=lambda i: (units[i][2], i))
+        always_set = set(always)
+        rest = [i for i in range(len(units)) if i not in always_set]
+        ranked = always + sorted(rest, key=lambda i: (-self.score(units[i]), i))
+        chosen = set(ranked[:max(0, budget)])
+        return [unit for i, unit in enumerate(units) if i in chosen]
+
+    def always_count(self, units):
+        """units 中提前天数不超过 always_days 的单元数"""
+        return sum(1 for unit in units if unit[2] <= self.always_days)
+
+
+def run_budget(run_budget=None, monthly_budget=None, runs_per_month=60, spent=0, runs_left=None):
+    """
+    根据单次预算和月度预算计算本次运行可用的调用次数，均未配置时返回 None（不限）
+
+    参数:
+        run_budget: 单次运行预算
+        monthly_budget: 月度预算
+        runs_per_month: 每月运行次数（未给出 runs_left 时使用）
+        spent: 本月已用的调用次数（见 call_budget.CallLedger）
+        runs_left: 本月剩余的运行次数（含本次）
+
+    返回:
+        int: 两者都配置时取较小值；月度预算按 (月度预算 - 已用) / 剩余运行次数 平分
+    """
+    budgets = []
+    if run_budget is not None:
+        budgets.append(run_budget)
+    if monthly_budget is not None:
+        runs = runs_left if runs_left is not None else runs_per_month
+        budgets.append(max(0, monthly_budget - spent) // max(1, runs))
+    return min(budgets) if budgets else None
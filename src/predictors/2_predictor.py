@@ -18,21 +18,67 @@
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.preprocessing import LabelEncoder
 import warnings
 import pickle
 import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.predictors.flat_forest import FlatForest
+from src.predictors.model_artifact import artifact_path, is_artifact, load_artifact, save_artifact
+from src.utils.schema import read_flight_csv
 
 warnings.filterwarnings('ignore')
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
-plt.rcParams['axes.unicode_minus'] = False
+# sklearn 和 matplotlib 只在训练、评估、绘图时导入；只做预测时由 pickle.load 按需载入模型用到的 sklearn 模块，
+# 从模型产物目录加载则完全不需要 sklearn
+
+# 模型使用的特征
+NUMERICAL_FEATURES = [
+    '提前天数', '剩余座位', '飞行时长_分钟',
+    '中转时长_分钟', '中转次数', '性价比',
+    '时间压力', '效率评分'
+]
+CATEGORICAL_FEATURES = ['航司', '起飞时段', '价格区间', '座位状态']
+
+# 训练时未出现过的类别（以及输入中缺少的分类特征）编码为 NaN，由各分裂节点的缺失值规则决定走向
+# （sklearn 对训练时没有缺失值的节点，把 NaN 送往样本较多的子节点）。
+# 不能用 -1：各分类特征的分裂阈值都 >= 0.5，-1 永远走左子节点，与 classes_[0] 的路径完全相同
+UNKNOWN_CODE = np.nan
+# 批量预测每块的行数（每块调用一次 model.predict）
+BATCH_CHUNK_ROWS = 100_000
+# 不超过该行数的块用扁平化森林（纯 NumPy）预测，省去 sklearn 每次调用的校验和线程分派开销；
+# 更大的块交给 sklearn，其 Cython 逐树遍历的吞吐量更高
+FLAT_FOREST_MAX_ROWS = 4096
+
+
+def encode_categories(values, table):
+    """
+    用预先构建的查找表一次编码整列类别
+
+    对已知类别与 LabelEncoder.transform(values.astype(str)) 结果相同（缺失值按 'nan' 查找），
+    未知类别编码为 UNKNOWN_CODE（NaN）。每个不同取值只查找一次，不逐行调用 Python。
+
+    参数:
+        values: Series（object 或 category）
+        table: pd.Index，按编码顺序排列的已知类别（即 encoder.classes_）
+
+    返回:
+        ndarray: float64 编码
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories.astype(str)
+        # 末尾追加 'nan' 的编码，缺失值的 code 为 -1，正好取到最后一个
+        lookup = np.append(table.get_indexer(uniques), table.get_indexer(['nan']))
+    else:
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        lookup = table.get_indexer(pd.Index(uniques).astype(str))
+    # get_indexer 对查不到的类别返回 -1
+    lookup = np.where(lookup >= 0, lookup, UNKNOWN_CODE)
+    return lookup[codes]
 
 
 class FlightPricePredictor:
@@ -49,22 +95,28 @@ class FlightPricePredictor:
         self.model = None
         self.feature_columns = None
         self.label_encoders = {}
+        self.code_tables = {}
+        self.code_maps = {}
+        self.flat_model = None
         self.scaler = None
 
         print(f"初始化航班价格预测器 (模型: {model_type})")
 
-    def load_data(self, filepath):
+    def load_data(self, filepath, columns=None):
         """
-        加载特征数据集
+        加载特征数据集（紧凑类型，默认只读取模型用到的特征列和价格）
 
         参数:
             filepath: CSV文件路径
+            columns: 需要读取的列，默认为模型特征 + 价格
 
         返回:
             DataFrame: 加载的数据
         """
         print(f"正在加载数据: {filepath}")
-        df = pd.read_csv(filepath, encoding='utf-8-sig')
+        if columns is None:
+            columns = NUMERICAL_FEATURES + CATEGORICAL_FEATURES + ['价格']
+        df = read_flight_csv(filepath, columns=columns)
         print(f"数据加载成功: {df.shape[0]} 行 x {df.shape[1]} 列")
         return df
 
@@ -81,20 +133,13 @@ class FlightPricePredictor:
             y: 目标变量
         """
         print("\n准备训练特征...")
-
-        # 选择数值型特征
-        numerical_features = [
-            '提前天数', '剩余座位', '飞行时长_分钟',
-            '中转时长_分钟', '中转次数', '性价比',
-            '时间压力', '效率评分'
-        ]
+        from sklearn.preprocessing import LabelEncoder
 
         # 选择可用的数值特征
-        available_numerical = [col for col in numerical_features if col in df.columns]
+        available_numerical = [col for col in NUMERICAL_FEATURES if col in df.columns]
 
         # 分类特征
-        categorical_features = ['航司', '起飞时段', '价格区间', '座位状态']
-        available_categorical = [col for col in categorical_features if col in df.columns]
+        available_categorical = [col for col in CATEGORICAL_FEATURES if col in df.columns]
 
         print(f"数值特征 ({len(available_numerical)}): {available_numerical}")
         print(f"分类特征 ({len(available_categorical)}): {available_categorical}")
@@ -112,10 +157,11 @@ class FlightPricePredictor:
                 # 使用已保存的编码器
                 X[col] = self.label_encoders[col].transform(X[col].astype(str))
 
-        # 目标变量
-        y = df[target_column]
+        # 目标变量（价格按 float32 读入，训练目标转回 float64，避免模型以 float32 精度拟合和评估）
+        y = df[target_column].astype('float64')
 
         self.feature_columns = X.columns.tolist()
+        self.build_code_tables()
 
         print(f"特征准备完成: {X.shape}")
         return X, y
@@ -133,6 +179,8 @@ class FlightPricePredictor:
             dict: 训练结果和评估指标
         """
         print(f"\n开始训练模型 (测试集比例: {test_size})...")
+        from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+        from sklearn.model_selection import train_test_split
 
         # 划分训练集和测试集
         X_train, X_test, y_train, y_test = train_test_split(
@@ -165,6 +213,7 @@ class FlightPricePredictor:
         # 训练模型
         print("正在训练...")
         self.model.fit(X_train, y_train)
+        self.export_flat_model()
         print("模型训练完成!")
 
         # 评估模型
@@ -180,6 +229,7 @@ class FlightPricePredictor:
             dict: 评估指标
         """
         print("\n模型评估:")
+        from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
         # 预测
         y_train_pred = self.model.predict(X_train)
@@ -225,68 +275,119 @@ class FlightPricePredictor:
 
         return metrics
 
-    def predict(self, input_data):
+    def build_code_tables(self, vocabularies=None):
         """
-        预测航班价格
+        预先构建 类别 -> 编码 查找表（整列用 pd.Index，单行用 dict）
 
         参数:
-            input_data: 输入数据 (字典或DataFrame)
+            vocabularies: {分类特征: 按编码顺序排列的类别}，默认取各 LabelEncoder 的 classes_
+        """
+        if vocabularies is None:
+            vocabularies = {col: encoder.classes_ for col, encoder in self.label_encoders.items()}
+        self.code_tables = {col: pd.Index(values) for col, values in vocabularies.items()}
+        self.code_maps = {col: {value: code for code, value in enumerate(table)}
+                          for col, table in self.code_tables.items()}
 
-        返回:
-            float: 预测价格
+    def export_flat_model(self):
+        """把训练好的树集成导出为连续数组（FlatForest），用于低延迟的小批量和单行预测"""
+        self.flat_model = FlatForest.from_sklearn(self.model)
+
+    def encode_row(self, row):
         """
-        if isinstance(input_data, dict):
-            input_df = pd.DataFrame([input_data])
-        else:
-            input_df = input_data.copy()
+        把单行字典编码为特征向量（与 encode_features 对该行的结果相同）
+
+        参数:
+            row: {特征名: 值}
 
-        # 确保所有必需的特征都存在
+        返回:
+            ndarray: float32，顺序为 feature_columns
+        """
+        values = []
         for col in self.feature_columns:
-            if col not in input_df.columns:
-                input_df[col] = 0  # 默认值
+            if col in self.code_maps:
+                values.append(self.code_maps[col].get(str(row[col]), UNKNOWN_CODE) if col in row
+                              else UNKNOWN_CODE)
+            else:
+                values.append(row.get(col, 0))
+        return np.array(values, dtype=np.float32)
 
-        # 选择特征列
-        X = input_df[self.feature_columns]
+    def encode_features(self, input_df):
+        """
+        把输入整块编码为模型的特征矩阵（分类特征按列查表，缺少的数值特征填 0，缺少的分类特征为未知类别）
 
-        # 编码分类特征
-        for col, encoder in self.label_encoders.items():
-            if col in X.columns:
-                # 处理未见过的类别
-                if X[col].dtype == 'object':
-                    unique_values = set(X[col].unique())
-                    known_values = set(encoder.classes_)
-                    unknown_values = unique_values - known_values
+        参数:
+            input_df: DataFrame
 
-                    if unknown_values:
-                        # 将未知值替换为最常见的类别
-                        most_common = encoder.classes_[0]
-                        X[col] = X[col].apply(lambda x: most_common if x not in known_values else x)
+        返回:
+            DataFrame: 列顺序为 feature_columns
+        """
+        if self.label_encoders and len(self.code_tables) != len(self.label_encoders):
+            self.build_code_tables()
+        n = len(input_df)
+        data = {}
+        for col in self.feature_columns:
+            if col not in input_df.columns:
+                # 缺少的数值特征填 0，缺少的分类特征归入未知类别
+                data[col] = np.full(n, UNKNOWN_CODE if col in self.code_tables else 0)
+            elif col in self.code_tables:
+                data[col] = encode_categories(input_df[col], self.code_tables[col])
+            else:
+                data[col] = input_df[col].to_numpy()
+        return pd.DataFrame(data, columns=self.feature_columns)
 
-                X[col] = encoder.transform(X[col].astype(str))
+    def predict(self, input_data):
+        """
+        预测航班价格
 
-        # 预测
-        prediction = self.model.predict(X)
+        参数:
+            input_data: 输入数据 (字典或DataFrame)
 
-        return prediction[0]
+        返回:
+            float: 预测价格（DataFrame 输入时为第一行的预测值）
+        """
+        if isinstance(input_data, dict):
+            if self.flat_model is not None:
+                # 单个航班查询：不构造 DataFrame，直接查表编码后遍历扁平化森林
+                return self.flat_model.predict_one(self.encode_row(input_data))
+            input_data = pd.DataFrame([input_data])
+        return self.predict_batch(input_data.iloc[:1])[0]
 
-    def predict_batch(self, input_data):
+    def predict_batch(self, input_data, chunk_size=BATCH_CHUNK_ROWS):
         """
-        批量预测
+        批量预测：按块整列编码，每块调用一次模型（小块用扁平化森林，大块用 sklearn）
 
         参数:
             input_data: 输入数据 (DataFrame)
+            chunk_size: 每块行数
 
         返回:
             array: 预测价格数组
         """
-        predictions = []
-        for idx, row in input_data.iterrows():
-            pred = self.predict(row.to_dict())
-            predictions.append(pred)
-        return np.array(predictions)
+        predictions = np.empty(len(input_data))
+        for start in range(0, len(input_data), chunk_size):
+            chunk = input_data.iloc[start:start + chunk_size]
+            X = self.encode_features(chunk)
+            # 从模型产物加载时没有 sklearn 模型，全部由扁平化森林预测；
+            # 含未知类别（NaN）而 sklearn 模型不接受 NaN 时（梯度提升），同样交给扁平化森林按缺失值规则遍历
+            if self.flat_model is not None and (self.model is None or len(X) <= FLAT_FOREST_MAX_ROWS
+                                                or (not self.model_accepts_nan() and X.isna().any().any())):
+                predictions[start:start + len(chunk)] = self.flat_model.predict(X)
+            else:
+                predictions[start:start + len(chunk)] = self.model.predict(X)
+        return predictions
+
+    def model_accepts_nan(self):
+        """sklearn 模型的 predict 是否接受 NaN（随机森林接受，GradientBoostingRegressor 不接受）"""
+        return self.model.__sklearn_tags__().input_tags.allow_nan
 
     def save_model(self, filepath):
-        """保存模型到文件"""
+        """
+        保存模型：pickle 文件保留完整的 sklearn 模型和编码器（继续训练、评估用），
+        同时在旁边写出可内存映射的模型产物目录（预测服务用，见 model_artifact）
+
+        参数:
+            filepath: pickle 文件路径，产物目录为同名的 .model 目录
+        """
         model_data = {
             'model': self.model,
             'feature_columns': self.feature_columns,
@@ -296,9 +397,35 @@ class FlightPricePredictor:
         with open(filepath, 'wb') as f:
             pickle.dump(model_data, f)
         print(f"模型已保存: {filepath}")
+        self.save_artifact(artifact_path(filepath))
+
+    def save_artifact(self, directory):
+        """保存可内存映射的模型产物（扁平化森林数组 + JSON 头）"""
+        if self.flat_model is None:
+            self.export_flat_model()
+        vocabularies = {col: table.tolist() for col, table in self.code_tables.items()}
+        save_artifact(directory, self.flat_model, self.model_type, self.feature_columns, vocabularies)
+        print(f"模型产物已保存: {directory}")
+
+    def load_model(self, filepath, mmap_mode='r'):
+        """
+        加载模型：产物目录按内存映射加载（不需要 sklearn，多个进程共享数据页），
+        pickle 文件加载完整的 sklearn 模型后再导出扁平化森林
+
+        参数:
+            filepath: 模型产物目录或 pickle 文件路径
+            mmap_mode: 产物数组的映射模式，None 表示整体读入内存
+        """
+        if is_artifact(filepath):
+            header, self.flat_model = load_artifact(filepath, mmap_mode=mmap_mode)
+            self.model = None
+            self.label_encoders = {}
+            self.feature_columns = header['feature_columns']
+            self.model_type = header['model_type']
+            self.build_code_tables(header['vocabularies'])
+            print(f"模型产物已加载: {filepath}")
+            return
 
-    def load_model(self, filepath):
-        """从文件加载模型"""
         with open(filepath, 'rb') as f:
             model_data = pickle.load(f)
 
@@ -306,6 +433,8 @@ class FlightPricePredictor:
         self.feature_columns = model_data['feature_columns']
         self.label_encoders = model_data['label_encoders']
         self.model_type = model_data['model_type']
+        self.build_code_tables()
+        self.export_flat_model()
         print(f"模型已加载: {filepath}")
 
     def plot_predictions(self, y_true, y_pred, save_path=None):
@@ -317,6 +446,12 @@ class FlightPricePredictor:
             y_pred: 预测值
             save_path: 保存路径
         """
+        import matplotlib.pyplot as plt
+
+        # 设置中文字体
+        plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
+        plt.rcParams['axes.unicode_minus'] = False
+
         fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 
         # 散点图：预测值 vs 真实值
@@ -444,6 +579,7 @@ def main():
 
     # 7. 可视化预测结果
     print("\n生成可视化图表...")
+    from sklearn.model_selection import train_test_split
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     y_test_pred = predictor.model.predict(X_test)
     predictor.plot_predictions(y_test, y_test_pred, save_path='prediction_results.png')
@@ -453,7 +589,8 @@ def main():
     print("="*80)
     print(f"\n生成文件:")
     print(f"  1. {model_file} - 训练好的模型")
-    print(f"  2. prediction_results.png - 预测结果可视化")
+    print(f"  2. {artifact_path(model_file)} - 可内存映射的模型产物（预测服务加载）")
+    print(f"  3. prediction_results.png - 预测结果可视化")
     print()
 
 
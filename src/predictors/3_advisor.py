@@ -1,8 +1,8 @@
 import pandas as pd
 from datetime import datetime, timedelta
-import joblib # 用于加载训练好的模型
 
 # 假设你已经训练好了模型并保存为 'flight_model.pkl'
+# import joblib  # 用于加载训练好的模型（用到时再导入，导入 joblib 约 0.2 秒）
 # model = joblib.load('flight_model.pkl') 
 
 # 为了演示，我们先定义一个模拟的预测函数 (等你数据够了就替换成真的模型)
@@ -71,5 +71,6 @@ def get_buying_advice(target_date_str):
         print(f"未来的预测价格都比现在高，越等越贵。")
 
 # --- 运行测试 ---
-# 假设你想查 2月20日 的票
-get_buying_advice('2026-01-25')
\ No newline at end of file
+if __name__ == "__main__":
+    # 假设你想查 2月20日 的票
+    get_buying_advice('2026-01-25')
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+扁平化树集成
+====================
+
+把训练好的 sklearn 树集成（RandomForestRegressor / ExtraTreesRegressor / GradientBoostingRegressor）
+导出为几个连续的 NumPy 数组，用纯 NumPy 同时遍历一批输入的全部树：
+
+- feature:   intp，节点的分裂特征（叶子为 0）
+- threshold: float32，分裂阈值（叶子为 +inf，永远走左子节点 = 自己）
+- left:      intp，左子节点；每棵树按层序重新编号，右子节点恒为 left + 1，叶子的 left 指向自己
+- missing_right: uint8，缺失值是否走右子节点（sklearn 的 missing_go_to_left 取反）
+- value:     float64，节点取值（只用到叶子）
+- roots:     intp，各棵树根节点的位置
+
+下标数组使用 intp：NumPy 花式索引遇到其他整数类型会先转换一次，单行预测每层要多花约 1 微秒。
+
+每一步所有 (行, 树) 同时下降一层：node = left[node] + (x[feature[node]] > threshold[node])，
+叶子指向自己，因此固定走 depth 步即可，不需要判断是否到达叶子。
+预测值为 bias + scale * 各树叶子取值之和（随机森林 scale = 1 / 树数，梯度提升 scale = 学习率）。
+
+与 sklearn 逐位一致的比较：sklearn 把输入转为 float32 后与 float64 阈值比较（x <= t 走左），
+对 float32 的 x，x > t 等价于 x > (不大于 t 的最大 float32)，因此阈值向下取整为 float32 后
+直接在 float32 下比较。各树取值的求和顺序与 sklearn 不同，结果只在浮点舍入误差内一致。
+"""
+
+import numpy as np
+
+# 批量预测时每块的行数（每块的节点下标数组为 行数 x 树数）
+CHUNK_ROWS = 8192
+
+
+def _flatten_tree(tree, offset):
+    """
+    按层序重新编号一棵树，使兄弟节点相邻（右子节点 = 左子节点 + 1）
+
+    返回:
+        tuple: (旧编号按新编号排列的数组, 新编号下的 left 数组（已加 offset）)
+    """
+    children_left, children_right = tree.children_left, tree.children_right
+    order = [np.array([0])]
+    frontier = order[0]
+    while True:
+        internal = frontier[children_left[frontier] >= 0]
+        if not len(internal):
+            break
+        frontier = np.stack([children_left[internal], children_right[internal]], axis=1).ravel()
+        order.append(frontier)
+    order = np.concatenate(order)
+    new_id = np.empty(tree.node_count, dtype=np.int64)
+    new_id[order] = np.arange(tree.node_count)
+    left = np.where(children_left[order] >= 0, new_id[np.maximum(children_left[order], 0)],
+                    np.arange(tree.node_count))
+    return order, (left + offset).astype(np.intp)
+
+
+def _float32_below(threshold):
+    """不大于 threshold 的最大 float32（x32 > 结果 与 x32 > threshold 等价）"""
+    rounded = threshold.astype(np.float32)
+    over = rounded.astype(np.float64) > threshold
+    rounded[over] = np.nextafter(rounded[over], np.float32(-np.inf))
+    return rounded
+
+
+class FlatForest:
+    """数组化的树集成，纯 NumPy 批量遍历"""
+
+    def __init__(self, feature, threshold, left, missing_right, value, roots, depth, scale, bias, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.missing_right = missing_right
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.scale = float(scale)
+        self.bias = float(bias)
+        self.n_features = int(n_features)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        从训练好的 sklearn 回归树集成导出
+
+        参数:
+            model: RandomForestRegressor / ExtraTreesRegressor / GradientBoostingRegressor（单输出）
+
+        返回:
+            FlatForest
+        """
+        estimators = np.asarray(model.estimators_, dtype=object).ravel()
+        if hasattr(model, 'learning_rate'):
+            # 梯度提升：init_ 为 'zero' 或均值型 DummyRegressor
+            scale = model.learning_rate
+            bias = 0.0 if isinstance(model.init_, str) else float(np.ravel(model.init_.constant_)[0])
+        else:
+            scale, bias = 1.0 / len(estimators), 0.0
+        trees = [estimator.tree_ for estimator in estimators]
+        if any(tree.n_outputs != 1 for tree in trees):
+            raise ValueError("只支持单输出回归模型")
+
+        features, thresholds, lefts, missing, values, roots = [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            order, left = _flatten_tree(tree, offset)
+            leaf = tree.children_left[order] < 0
+            features.append(np.where(leaf, 0, tree.feature[order]).astype(np.intp))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold[order]))
+            lefts.append(left)
+            missing.append((~leaf & (tree.missing_go_to_left[order] == 0)).astype(np.uint8))
+            values.append(tree.value[order, 0, 0].astype(np.float64))
+            roots.append(offset)
+            offset += tree.node_count
+        return cls(
+            feature=np.concatenate(features),
+            threshold=_float32_below(np.concatenate(thresholds)),
+            left=np.concatenate(lefts),
+            missing_right=np.concatenate(missing),
+            value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            depth=max(tree.max_depth for tree in trees),
+            scale=scale,
+            bias=bias,
+            n_features=model.n_features_in_,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def predict_one(self, x):
+        """
+        单行预测（每层只对 树数 个节点做几次 NumPy 运算）
+
+        参数:
+            x: 长度为 n_features 的一维数组
+
+        返回:
+            float: 预测值
+        """
+        x = np.asarray(x, dtype=np.float32)
+        feature, threshold, left = self.feature, self.threshold, self.left
+        node = self.roots
+        if np.isnan(x).any():
+            missing_right = self.missing_right
+            for _ in range(self.depth):
+                v = x[feature[node]]
+                node = left[node] + ((v > threshold[node]) | (np.isnan(v) & missing_right[node]))
+        else:
+            for _ in range(self.depth):
+                node = left[node] + (x[feature[node]] > threshold[node])
+        return self.bias + self.scale * self.value[node].sum()
+
+    def predict(self, X, chunk_rows=CHUNK_ROWS):
+        """
+        批量预测：每块内所有 (行, 树) 同时下降一层
+
+        参数:
+            X: (行数, n_features) 的数组或 DataFrame（列顺序与训练时相同）
+            chunk_rows: 每块行数
+
+        返回:
+            ndarray: float64 预测值
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"输入应为 (行数, {self.n_features}) 的二维数组，实际为 {X.shape}")
+        if len(X) == 1:
+            return np.array([self.predict_one(X[0])])
+        predictions = np.empty(len(X))
+        for start in range(0, len(X), chunk_rows):
+            chunk = X[start:start + chunk_rows]
+            predictions[start:start + len(chunk)] = self._predict_chunk(chunk)
+        return predictions
+
+    def _predict_chunk(self, X):
+        flat = X.ravel()
+        # 每行在展平数组中的起始位置，广播到 (行数, 树数)
+        base = (np.arange(len(X), dtype=np.int64) * self.n_features)[:, None]
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        has_missing = np.isnan(flat).any()
+        for _ in range(self.depth):
+            v = flat[base + self.feature[node]]
+            go_right = v > self.threshold[node]
+            if has_missing:
+                go_right |= np.isnan(v) & self.missing_right[node].astype(bool)
+            node = self.left[node] + go_right
+        return self.bias + self.scale * self.value[node].sum(axis=1)
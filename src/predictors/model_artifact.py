@@ -0,0 +1,139 @@
+"""
+模型产物（可内存映射）
+====================
+
+把预测所需的全部内容保存为一个目录，加载时不反序列化任何 Python 对象：
+
+    flight_price_model.model/
+        header.json          格式名、版本、model_type、feature_columns、各分类特征的类别表、森林标量参数、数组清单
+        feature.npy          FlatForest 的各个数组，原始 NumPy 缓冲区（.npy 头 + 连续数据）
+        threshold.npy
+        left.npy
+        missing_right.npy
+        value.npy
+        roots.npy
+
+header.json 示例:
+
+    {
+      "format": "flight-price-model", "version": 1, "model_type": "random_forest",
+      "feature_columns": ["提前天数", ..., "座位状态"],
+      "vocabularies": {"航司": ["CZ", "HU", "MU", ...], ...},
+      "forest": {"depth": 15, "scale": 0.01, "bias": 0.0, "n_features": 12},
+      "arrays": {"feature": {"dtype": "<i8", "shape": [1066516]}, ...}
+    }
+
+加载时用 np.load(mmap_mode='r') 映射各数组：加载耗时与模型大小基本无关，数据页在首次访问时才读入，
+且属于文件页缓存，同一台机器上加载同一产物的多个进程共享这些物理页。
+写入先在临时目录完成再整体替换，已映射旧产物的进程不受影响（旧文件删除后映射仍然有效）。
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from src.predictors.flat_forest import FlatForest
+
+ARTIFACT_FORMAT = 'flight-price-model'
+ARTIFACT_VERSION = 1
+ARTIFACT_SUFFIX = '.model'
+HEADER_FILE = 'header.json'
+FOREST_ARRAYS = ('feature', 'threshold', 'left', 'missing_right', 'value', 'roots')
+
+
+def artifact_path(model_file):
+    """与 pickle 模型文件对应的产物目录（models/flight_price_model.pkl -> models/flight_price_model.model）"""
+    return os.path.splitext(model_file)[0] + ARTIFACT_SUFFIX
+
+
+def is_artifact(path):
+    """path 是否为模型产物目录"""
+    return os.path.isfile(os.path.join(path, HEADER_FILE))
+
+
+def save_artifact(directory, forest, model_type, feature_columns, vocabularies):
+    """
+    保存模型产物（先写临时目录，再整体替换已有产物）
+
+    参数:
+        directory: 产物目录
+        forest: FlatForest
+        model_type: 模型类型
+        feature_columns: 特征列顺序
+        vocabularies: {分类特征: 按编码顺序排列的类别列表}
+    """
+    directory = os.path.abspath(directory)
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=os.path.basename(directory) + '.tmp-')
+    try:
+        arrays = {}
+        for name in FOREST_ARRAYS:
+            array = np.ascontiguousarray(getattr(forest, name))
+            np.save(os.path.join(tmp_dir, name + '.npy'), array)
+            arrays[name] = {'dtype': array.dtype.str, 'shape': list(array.shape)}
+        header = {
+            'format': ARTIFACT_FORMAT,
+            'version': ARTIFACT_VERSION,
+            'model_type': model_type,
+            'feature_columns': list(feature_columns),
+            'vocabularies': {col: [str(value) for value in values] for col, values in vocabularies.items()},
+            'forest': {
+                'depth': forest.depth,
+                'scale': forest.scale,
+                'bias': forest.bias,
+                'n_features': forest.n_features,
+            },
+            'arrays': arrays,
+        }
+        with open(os.path.join(tmp_dir, HEADER_FILE), 'w', encoding='utf-8') as f:
+            json.dump(header, f, ensure_ascii=False, indent=2)
+
+        # 目录不能用 os.replace 覆盖非空目录：先把旧产物挪开，再换上新产物
+        old_dir = None
+        if os.path.exists(directory):
+            old_dir = f"{directory}.old-{os.getpid()}"
+            os.rename(directory, old_dir)
+        os.rename(tmp_dir, directory)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_artifact(directory, mmap_mode='r'):
+    """
+    加载模型产物
+
+    参数:
+        directory: 产物目录
+        mmap_mode: 传给 np.load 的映射模式，None 表示整体读入内存
+
+    返回:
+        tuple: (header 字典, FlatForest)
+    """
+    with open(os.path.join(directory, HEADER_FILE), 'r', encoding='utf-8') as f:
+        header = json.load(f)
+    if header.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"不是航班价格模型产物: {directory}")
+    if header.get('version') != ARTIFACT_VERSION:
+        raise ValueError(f"不支持的模型产物版本 {header.get('version')}（当前版本 {ARTIFACT_VERSION}）: {directory}")
+
+    arrays = {}
+    for name in FOREST_ARRAYS:
+        array = np.load(os.path.join(directory, name + '.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+        expected = header['arrays'][name]
+        if array.dtype.str != expected['dtype'] or list(array.shape) != expected['shape']:
+            raise ValueError(f"模型产物数组 {name} 与 header 不一致: {array.dtype}{array.shape}")
+        # 转为普通 ndarray 视图（不复制，仍由映射支撑），避免 np.memmap 子类在每次运算后的额外包装
+        arrays[name] = np.asarray(array)
+    # 下标数组在其他平台上保存时可能不是本机 intp，转换后不再是映射（见 flat_forest 模块说明）
+    for name in ('feature', 'left', 'roots'):
+        if arrays[name].dtype != np.intp:
+            arrays[name] = arrays[name].astype(np.intp)
+    forest = FlatForest(**arrays, **header['forest'])
+    return header, forest
@@ -0,0 +1,326 @@
+"""
+分析图表
+====================
+
+分析器的四张探索性分析图。每张图分为两步：
+
+- figure_data(summary): 从 AnalysisSummary 取出各图需要的聚合结果（直方图取值表、箱线图统计量、计数、相关矩阵、散点）
+- draw_*(data, path, dpi): 只根据这些聚合结果绘制并保存，可以在子进程中执行
+
+render_figures() 在进程池中并行绘图（Agg 后端，不需要显示器）。每张图的缓存键是聚合结果、绘图参数、
+绘图函数源码和 matplotlib 版本的 SHA-256，与渲染耗时一起记录在输出目录的 figure_cache.json 中；
+键未变化且图片仍存在时跳过该图。
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+# 设置中文字体
+plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
+plt.rcParams['axes.unicode_minus'] = False
+
+CACHE_FILE = 'figure_cache.json'
+
+
+def _hist(ax, weighted, bins):
+    """按不同取值表 (取值, 次数) 加权绘制直方图，精确模式下与直接对整列绘制相同"""
+    values, counts = weighted
+    ax.hist(values, bins=bins, weights=counts, edgecolor='black', alpha=0.7)
+
+
+def draw_price(data, path, dpi):
+    """价格分布分析：直方图、箱线图、各航司平均价格、提前天数 vs 价格"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+
+    _hist(axes[0, 0], data['price_hist'], bins=30)
+    axes[0, 0].set_title('价格分布直方图')
+    axes[0, 0].set_xlabel('价格 (元)')
+    axes[0, 0].set_ylabel('频数')
+
+    axes[0, 1].bxp([data['price_box']])
+    axes[0, 1].set_title('价格箱线图')
+    axes[0, 1].set_ylabel('价格 (元)')
+
+    airline_prices = data['airline_prices']
+    axes[1, 0].barh(range(len(airline_prices)), airline_prices.values)
+    axes[1, 0].set_yticks(range(len(airline_prices)))
+    axes[1, 0].set_yticklabels(airline_prices.index)
+    axes[1, 0].set_title('各航司平均价格')
+    axes[1, 0].set_xlabel('平均价格 (元)')
+
+    sample = data['scatter']
+    axes[1, 1].scatter(sample['提前天数'], sample['价格'], alpha=0.5)
+    axes[1, 1].set_title(data['scatter_title'])
+    axes[1, 1].set_xlabel('提前天数')
+    axes[1, 1].set_ylabel('价格 (元)')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+def draw_time(data, path, dpi):
+    """时间特征分析：起飞时段、飞行时长、中转次数、剩余座位"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+
+    if data['departure_periods'] is not None:
+        data['departure_periods'].plot(kind='bar', ax=axes[0, 0])
+        axes[0, 0].set_title('起飞时段分布')
+        axes[0, 0].set_xlabel('起飞时段')
+        axes[0, 0].set_ylabel('航班数')
+        axes[0, 0].tick_params(axis='x', rotation=45)
+
+    if data['duration_hist'] is not None:
+        _hist(axes[0, 1], data['duration_hist'], bins=30)
+        axes[0, 1].set_title('飞行时长分布')
+        axes[0, 1].set_xlabel('飞行时长 (分钟)')
+        axes[0, 1].set_ylabel('频数')
+
+    if data['transfers'] is not None:
+        data['transfers'].plot(kind='bar', ax=axes[1, 0])
+        axes[1, 0].set_title('中转次数分布')
+        axes[1, 0].set_xlabel('中转次数')
+        axes[1, 0].set_ylabel('航班数')
+        axes[1, 0].tick_params(axis='x', rotation=0)
+
+    _hist(axes[1, 1], data['seats_hist'], bins=20)
+    axes[1, 1].set_title('剩余座位分布')
+    axes[1, 1].set_xlabel('剩余座位数')
+    axes[1, 1].set_ylabel('频数')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+def draw_correlation(data, path, dpi):
+    """特征相关性热力图"""
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(data['correlation'], annot=True, cmap='coolwarm', center=0,
+                square=True, linewidths=1, cbar_kws={"shrink": 0.8})
+    plt.title('特征相关性热力图')
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+def draw_comprehensive(data, path, dpi):
+    """综合分析：航司份额、价格区间、座位状态、效率评分"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+
+    if data['airlines'] is not None:
+        data['airlines'].plot(kind='pie', ax=axes[0, 0], autopct='%1.1f%%')
+        axes[0, 0].set_title('航司市场份额 (前10)')
+        axes[0, 0].set_ylabel('')
+
+    if data['price_ranges'] is not None:
+        data['price_ranges'].plot(kind='bar', ax=axes[0, 1])
+        axes[0, 1].set_title('价格区间分布')
+        axes[0, 1].set_xlabel('价格区间')
+        axes[0, 1].set_ylabel('航班数')
+        axes[0, 1].tick_params(axis='x', rotation=45)
+
+    if data['seat_status'] is not None:
+        data['seat_status'].plot(kind='bar', ax=axes[1, 0])
+        axes[1, 0].set_title('座位状态分布')
+        axes[1, 0].set_xlabel('座位状态')
+        axes[1, 0].set_ylabel('航班数')
+        axes[1, 0].tick_params(axis='x', rotation=45)
+
+    if data['score_hist'] is not None:
+        _hist(axes[1, 1], data['score_hist'], bins=30)
+        axes[1, 1].set_title('效率评分分布')
+        axes[1, 1].set_xlabel('效率评分')
+        axes[1, 1].set_ylabel('频数')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+
+# (文件名, 绘图函数)，按分析报告中的顺序
+FIGURES = [
+    ('price_analysis.png', draw_price),
+    ('time_analysis.png', draw_time),
+    ('correlation_heatmap.png', draw_correlation),
+    ('comprehensive_analysis.png', draw_comprehensive),
+]
+
+
+def figure_data(summary):
+    """
+    各图需要的聚合结果
+
+    返回:
+        dict: {文件名: 数据}；数据为 None 表示该图缺少所需的列，不生成
+    """
+    featured = summary.featured_columns
+
+    def counts(name):
+        return summary.value_counts(name) if name in featured else None
+
+    def weighted(name):
+        return summary.sketches[name].weighted_values() if name in featured else None
+
+    sample = summary.sample.rows
+    scatter_title = f'提前天数 vs 价格 (随机抽样 {len(sample):,} 条)' if summary.sample.sampled else '提前天数 vs 价格'
+    transfers = counts('中转次数')
+    airlines = summary.value_counts('航司').head(10) if '航司' in summary.columns else None
+    return {
+        'price_analysis.png': {
+            'price_hist': weighted('价格'),
+            'price_box': summary.box_stats('价格'),
+            'airline_prices': summary.airline_price.mean().sort_values(ascending=False).head(10),
+            'scatter': sample,
+            'scatter_title': scatter_title,
+        },
+        'time_analysis.png': {
+            'departure_periods': counts('起飞时段'),
+            'duration_hist': weighted('飞行时长_分钟'),
+            'transfers': transfers.sort_index() if transfers is not None else None,
+            'seats_hist': weighted('剩余座位'),
+        },
+        'correlation_heatmap.png': {
+            'correlation': summary.covariance.corr(),
+        } if len(summary.covariance.columns) > 1 else None,
+        'comprehensive_analysis.png': {
+            'airlines': airlines,
+            'price_ranges': counts('价格区间'),
+            'seat_status': counts('座位状态'),
+            'score_hist': weighted('效率评分'),
+        },
+    }
+
+
+def _update_digest(digest, value):
+    """把绘图数据按内容（而不是对象标识）写入哈希"""
+    if isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value):
+            digest.update(repr(key).encode('utf-8'))
+            _update_digest(digest, value[key])
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'[')
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b']')
+    elif isinstance(value, pd.DataFrame):
+        digest.update(b'D')
+        _update_digest(digest, [list(map(str, value.columns)), value.index.to_numpy()]
+                       + [value[name].to_numpy() for name in value.columns])
+    elif isinstance(value, pd.Series):
+        digest.update(b'S')
+        _update_digest(digest, [str(value.name), str(value.index.name), value.index.to_numpy(), value.to_numpy()])
+    elif isinstance(value, np.ndarray):
+        if value.dtype.kind == 'O':
+            _update_digest(digest, [str(item) for item in value])
+        else:
+            digest.update(f'{value.dtype.str}{value.shape}'.encode('ascii'))
+            digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode('utf-8'))
+
+
+def figure_key(draw, data, dpi):
+    """图的缓存键：绘图数据、dpi、绘图函数源码和 matplotlib 版本的 SHA-256"""
+    digest = hashlib.sha256()
+    digest.update(inspect.getsource(draw).encode('utf-8'))
+    digest.update(f'{matplotlib.__version__}|{sns.__version__}|{dpi}'.encode('ascii'))
+    _update_digest(digest, data)
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """输出目录中 figure_cache.json 的读写：{文件名: {key, seconds, rendered}}"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, CACHE_FILE)
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def fresh(self, name, key):
+        """图片存在且缓存键未变化"""
+        entry = self.entries.get(name)
+        return entry is not None and entry['key'] == key and os.path.exists(os.path.join(self.output_dir, name))
+
+    def record(self, name, key, seconds):
+        self.entries[name] = {'key': key, 'seconds': round(seconds, 3),
+                              'rendered': datetime.now().isoformat(timespec='seconds')}
+
+    def save(self):
+        """原子写入"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix='.figure_cache-', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _render(draw, data, path, dpi):
+    start = time.perf_counter()
+    draw(data, path, dpi)
+    return time.perf_counter() - start
+
+
+def render_figures(summary, output_dir, dpi=300, workers=None):
+    """
+    并行绘制四张分析图，跳过输入未变化的图
+
+    参数:
+        summary: AnalysisSummary
+        output_dir: 输出目录
+        dpi: 图片分辨率
+        workers: 绘图进程数，None 表示 CPU 核数，1 表示在当前进程中依次绘制
+
+    返回:
+        list: [(文件名, 状态, 渲染秒数), ...]，状态为 'rendered' / 'cached' / 'skipped'（缺少所需的列）
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cache = FigureCache(output_dir)
+    datasets = figure_data(summary)
+    results = {}
+    jobs = []
+    for name, draw in FIGURES:
+        data = datasets[name]
+        if data is None:
+            results[name] = ('skipped', 0.0)
+            continue
+        key = figure_key(draw, data, dpi)
+        if cache.fresh(name, key):
+            results[name] = ('cached', 0.0)
+        else:
+            jobs.append((name, key, draw, data))
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render, draw, data, os.path.join(output_dir, name), dpi)
+                       for name, _, draw, data in jobs]
+            seconds = [future.result() for future in futures]
+    else:
+        seconds = [_render(draw, data, os.path.join(output_dir, name), dpi) for name, _, draw, data in jobs]
+    for (name, key, _, _), elapsed in zip(jobs, seconds):
+        cache.record(name, key, elapsed)
+        results[name] = ('rendered', elapsed)
+    if jobs:
+        cache.save()
+    return [(name, *results[name]) for name, _ in FIGURES]
@@ -0,0 +1,334 @@
+"""
+向量化特征计算
+====================
+
+分析器 feature_engineering 使用的逐列特征函数。原始数据中字符串列的取值非常有限
+（日期、起降时间、总时长、中转地、中转时长都只有几十到几千个不同值），因此：
+
+- 字符串解析（日期、时刻、时长、中转次数）先 pd.factorize 去重，只对唯一值解析一次，
+  再按编码广播回每一行；解析规则与原先逐行 .apply 的函数完全相同
+- 数值分段（起降时段、座位状态）用 np.digitize 一次完成，不再逐行比较
+
+输出的取值和 dtype 与逐行实现一致，特征 CSV 逐字节相同。
+
+增量特征工程（分析器 --incremental）：FeatureStats 保存依赖全量数据的统计量，
+FeatureState 记录已处理到原始 CSV 的哪个字节位置；新追加的行沿用特征数据集已使用的统计量，
+统计量漂移超过阈值时再全量重算。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# 时段分段：[6, 12) 上午，[12, 18) 下午，[18, 24) 晚上，其余（含缺失）凌晨
+TIME_PERIOD_EDGES = [6, 12, 18, 24]
+TIME_PERIOD_LABELS = pd.Index(['凌晨', '上午', '下午', '晚上', '凌晨'])
+
+# 剩余座位分段：<=2, <=5, <=9, 其余（含缺失）
+SEAT_EDGES = [2, 5, 9]
+SEAT_LABELS = pd.Index(['紧张(<=2)', '较少(3-5)', '中等(6-9)', '充足(>9)'])
+
+PRICE_BINS = [0, 400, 500, 600, 800, 10000]
+PRICE_LABELS = ['低价(<400)', '中低价(400-500)', '中价(500-600)', '中高价(600-800)', '高价(>800)']
+
+
+class DistinctValues:
+    """一列的去重视图：在唯一值上计算，再按编码广播回每一行"""
+
+    def __init__(self, series):
+        # 缺失值也作为一个唯一值参与计算，与逐行 .apply 对缺失值的处理一致
+        self.codes, self.uniques = pd.factorize(series, use_na_sentinel=False)
+        self.index = series.index
+
+    def broadcast(self, values):
+        """唯一值上的计算结果 -> 与原列对齐的 Series"""
+        # Index.take 对字符串直接在 Arrow 数组上取值，不必从逐元素的 numpy 数组重新构造
+        return pd.Series(pd.Index(values).take(self.codes), index=self.index)
+
+    def map(self, func):
+        """对每个唯一值调用一次 func"""
+        return self.broadcast([func(value) for value in self.uniques])
+
+
+def parse_duration(duration_str):
+    """解析时长字符串（如 2小时15分），返回分钟数"""
+    if '小时' in duration_str:
+        parts = duration_str.replace('小时', 'h').replace('分', 'm').split('h')
+        hours = int(parts[0])
+        minutes = int(parts[1].replace('m', '')) if 'm' in parts[1] else 0
+        return hours * 60 + minutes
+    return 0
+
+
+def parse_transfer_duration(duration_str):
+    """解析中转时长，返回分钟数"""
+    if pd.isna(duration_str) or duration_str == '':
+        return 0
+    duration_str = str(duration_str).lower().replace('h', '').replace('m', '')
+    if ' ' in duration_str:
+        parts = duration_str.split()
+        if len(parts) == 2:
+            return int(parts[0]) * 60 + int(parts[1])
+    return 0
+
+
+def transfer_count(layover):
+    """中转次数（按 / 分隔的中转地个数），缺失为 0"""
+    return len(str(layover).split('/')) if pd.notna(layover) else 0
+
+
+def time_period(hours):
+    """小时 -> 起降时段"""
+    return pd.Series(TIME_PERIOD_LABELS.take(np.digitize(hours, TIME_PERIOD_EDGES)), index=hours.index)
+
+
+def seat_category(seats):
+    """剩余座位 -> 座位状态"""
+    return pd.Series(SEAT_LABELS.take(np.digitize(seats, SEAT_EDGES, right=True)), index=seats.index)
+
+
+def date_parts(series):
+    """
+    按唯一值解析日期列并提取星期、月份、日
+
+    返回:
+        dict: {'日期': datetime Series, '星期': ..., '月份': ..., '日期数': ...}
+    """
+    distinct = DistinctValues(series)
+    parsed = pd.to_datetime(distinct.uniques)
+    return {
+        '日期': distinct.broadcast(parsed),
+        '星期': distinct.broadcast(parsed.dayofweek),
+        '月份': distinct.broadcast(parsed.month),
+        '日期数': distinct.broadcast(parsed.day),
+    }
+
+
+def clock_hour(series):
+    """按唯一值解析 HH:MM 时刻，返回小时"""
+    distinct = DistinctValues(series)
+    return distinct.broadcast(pd.to_datetime(distinct.uniques, format='%H:%M').hour)
+
+
+def _scalar(value):
+    # numpy 标量 -> Python 数值，便于写入 JSON；参与运算的结果与 numpy 标量相同
+    return value.item() if hasattr(value, 'item') else value
+
+
+class FeatureStats:
+    """
+    依赖全量数据的特征统计量
+
+    时长标准化 / 价格标准化 / 效率评分 使用飞行时长和价格的最小/最大值及剩余座位最大值，
+    主要航司 使用出现次数前 5 的航司。增量处理时新数据沿用特征数据集已使用的统计量。
+    """
+
+    def __init__(self, duration_min, duration_max, price_min, price_max, seats_max, airline_counts):
+        self.duration_min = duration_min
+        self.duration_max = duration_max
+        self.price_min = price_min
+        self.price_max = price_max
+        self.seats_max = seats_max
+        # {航司: 出现次数}，按 value_counts 的顺序
+        self.airline_counts = dict(airline_counts)
+
+    @classmethod
+    def from_frame(cls, df):
+        """从原始数据（或已含 飞行时长_分钟 的特征数据）计算，时长只解析唯一值"""
+        if '飞行时长_分钟' in df.columns:
+            minutes = df['飞行时长_分钟']
+        else:
+            minutes = pd.Series([parse_duration(value) for value in DistinctValues(df['总时长']).uniques])
+        counts = df['航司'].value_counts()
+        return cls(_scalar(minutes.min()), _scalar(minutes.max()), _scalar(df['价格'].min()),
+                   _scalar(df['价格'].max()), _scalar(df['剩余座位'].max()), zip(counts.index.tolist(), counts.tolist()))
+
+    @property
+    def top_airlines(self):
+        """出现次数前 5 的航司（次数相同时保持原有顺序）"""
+        ranked = sorted(self.airline_counts.items(), key=lambda item: -item[1])
+        return [airline for airline, _ in ranked[:5]]
+
+    def merge(self, other):
+        """合并两批数据的统计量"""
+        counts = dict(self.airline_counts)
+        for airline, count in other.airline_counts.items():
+            counts[airline] = counts.get(airline, 0) + count
+        return FeatureStats(min(self.duration_min, other.duration_min), max(self.duration_max, other.duration_max),
+                            min(self.price_min, other.price_min), max(self.price_max, other.price_max),
+                            max(self.seats_max, other.seats_max), counts)
+
+    def drift(self, observed):
+        """
+        observed（包含新数据后的统计量）相对本统计量的漂移
+
+        返回:
+            float: 各最小/最大值超出原范围的部分占原范围宽度的最大比例；主要航司改变时为 inf
+        """
+        if set(self.top_airlines) != set(observed.top_airlines):
+            return float('inf')
+
+        def range_drift(low, high, new_low, new_high):
+            moved = max(low - new_low, 0) + max(new_high - high, 0)
+            if moved == 0:
+                return 0.0
+            return moved / (high - low) if high > low else float('inf')
+
+        return max(range_drift(self.duration_min, self.duration_max, observed.duration_min, observed.duration_max),
+                   range_drift(self.price_min, self.price_max, observed.price_min, observed.price_max),
+                   range_drift(0, self.seats_max, 0, observed.seats_max))
+
+    def to_dict(self):
+        return {
+            'duration': [self.duration_min, self.duration_max],
+            'price': [self.price_min, self.price_max],
+            'seats_max': self.seats_max,
+            'airline_counts': self.airline_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(*data['duration'], *data['price'], data['seats_max'], data['airline_counts'].items())
+
+
+def spill_frame(df, directory):
+    """
+    把 DataFrame 的数据缓冲区写入 directory 下的临时文件，只返回元数据
+
+    进程池子进程用它代替直接返回 DataFrame：pickle 协议 5 把数值列的缓冲区带外导出，
+    父进程用 load_spilled() 映射文件、零拷贝还原，省去管道传输和反序列化时的内存复制。
+
+    返回:
+        tuple: (带内 pickle 数据, 文件路径, 各缓冲区字节数)
+    """
+    buffers = []
+    payload = pickle.dumps(df, protocol=5, buffer_callback=buffers.append)
+    fd, path = tempfile.mkstemp(dir=directory, prefix='spill-', suffix='.bin')
+    sizes = []
+    with os.fdopen(fd, 'wb') as f:
+        for buffer in buffers:
+            view = buffer.raw()
+            f.write(view)
+            sizes.append(view.nbytes)
+    return payload, path, sizes
+
+
+def load_spilled(spilled):
+    """spill_frame() 的逆操作；返回的 DataFrame 只读地引用映射的文件，调用方应尽快复制（如 pd.concat）"""
+    payload, path, sizes = spilled
+    if not sum(sizes):
+        return pickle.loads(payload, buffers=[b''] * len(sizes))
+    with open(path, 'rb') as f:
+        mapped = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    offsets = np.concatenate([[0], np.cumsum(sizes)]).tolist()
+    return pickle.loads(payload, buffers=[mapped[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])])
+
+
+def feature_state_file(featured_path):
+    """特征数据集对应的增量状态文件：flight_data_featured.csv -> flight_data_featured_state.json"""
+    return os.path.splitext(featured_path)[0] + '_state.json'
+
+
+def source_fingerprint(path, offset, window=65536):
+    """原始 CSV 开头和 offset 之前各 window 字节的 SHA-256，用于发现文件被改写（而非追加）"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        digest.update(f.read(min(window, offset)))
+        f.seek(max(offset - window, 0))
+        digest.update(f.read(offset - max(offset - window, 0)))
+    return digest.hexdigest()
+
+
+def project_path(path):
+    """相对项目根目录的路径（统一用 /），使提交到仓库的状态文件在其他检出和 CI 上同样有效"""
+    try:
+        return os.path.relpath(os.path.abspath(path), PROJECT_ROOT).replace(os.sep, '/')
+    except ValueError:
+        # Windows 上不在同一盘符，无法表示为相对路径
+        return os.path.abspath(path)
+
+
+class FeatureState:
+    """
+    增量特征工程的持久化状态（source 为相对项目根目录的路径）
+
+        {
+          "source": "data/raw/szx_yih_flight_data_cn.csv", "offset": 5234567, "fingerprint": "...",
+          "featured_bytes": 12345678, "rows": 61797,
+          "applied": {...},    # 特征数据集中已使用的 FeatureStats
+          "observed": {...}    # 截至 offset 的全部原始数据的 FeatureStats
+        }
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.data = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError):
+                self.data = {}
+
+    @property
+    def applied(self):
+        return FeatureStats.from_dict(self.data['applied'])
+
+    @property
+    def observed(self):
+        return FeatureStats.from_dict(self.data['observed'])
+
+    @property
+    def offset(self):
+        return self.data['offset']
+
+    def resume_problem(self, source, featured_path):
+        """
+        检查能否在上次的基础上增量处理
+
+        返回:
+            str: 不能增量处理的原因；可以时为 None
+        """
+        if not self.data:
+            return "没有增量状态"
+        # 旧版本记录的是绝对路径，join 遇到绝对路径时直接使用它
+        if os.path.abspath(source) != os.path.abspath(os.path.join(PROJECT_ROOT, self.data['source'])):
+            return "原始数据文件已更换"
+        if not os.path.exists(featured_path) or os.path.getsize(featured_path) != self.data['featured_bytes']:
+            return "特征数据集已被改动"
+        if not os.path.exists(source) or os.path.getsize(source) < self.offset:
+            return "原始数据文件已被截断"
+        if source_fingerprint(source, self.offset) != self.data['fingerprint']:
+            return "原始数据文件已被改写"
+        return None
+
+    def record(self, source, offset, featured_path, rows, applied, observed):
+        """记录本次处理结果（不自动保存）"""
+        self.data = {
+            'source': project_path(source),
+            'offset': offset,
+            'fingerprint': source_fingerprint(source, offset),
+            'featured_bytes': os.path.getsize(featured_path),
+            'rows': rows,
+            'applied': applied.to_dict(),
+            'observed': observed.to_dict(),
+            'updated': datetime.now().isoformat(timespec='seconds'),
+        }
+
+    def save(self):
+        """原子写入状态文件"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.feature-state-', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,215 @@
+"""
+数据集清单
+====================
+
+写入方（采集器、分析器）每次写完数据文件后更新 data/manifest.json，记录每个文件的：
+
+    行数、字节数、修改时间、SHA-256、采集日期 / 起飞日期的最小值和最大值
+
+读取方（调度器）只需 os.stat 一次确认文件未被其他程序改动（字节数和修改时间与清单一致），
+即可直接使用清单中的行数和日期范围，不再为了 len(df) 解析整个 CSV。
+清单缺失或过期时，rows() 调用 record() 补上：一次顺序读取同时计算哈希和行数，日期范围只解析两个日期列。
+只追加写入的文件可以用 record_append() 更新，只读取追加的部分。
+
+    {
+      "version": 1,
+      "files": {
+        "data/raw/szx_yih_flight_data_cn.csv": {
+          "rows": 61797, "bytes": 5234567, "mtime_ns": ..., "sha256": "...",
+          "dates": {"采集日期": ["2026-01-20", "2026-02-14"], "起飞日期": ["2026-01-21", "2026-03-16"]},
+          "updated": "2026-02-14T08:01:12"
+        }
+      }
+    }
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def scan_file(path):
+    """
+    一次顺序读取计算 SHA-256 和数据行数（换行数减去表头）
+
+    返回:
+        tuple: (sha256 十六进制, 数据行数)
+    """
+    digest = hashlib.sha256()
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    if last != b'\n':
+        lines += 1
+    return digest.hexdigest(), max(lines - 1, 0)
+
+
+def date_ranges(df):
+    """DataFrame 中各日期列的 [最小值, 最大值]（YYYY-MM-DD 字符串）"""
+    from src.utils.schema import DATE_COLUMNS
+    ranges = {}
+    for name in DATE_COLUMNS:
+        if name in df.columns and len(df):
+            values = df[name].dropna()
+            if len(values):
+                lo, hi = values.min(), values.max()
+                ranges[name] = [str(lo)[:10], str(hi)[:10]]
+    return ranges
+
+
+def _merge_ranges(old, new):
+    merged = {name: list(bounds) for name, bounds in (old or {}).items()}
+    for name, (lo, hi) in (new or {}).items():
+        if name in merged:
+            merged[name] = [min(merged[name][0], lo), max(merged[name][1], hi)]
+        else:
+            merged[name] = [lo, hi]
+    return merged
+
+
+class DatasetManifest:
+    """data/manifest.json 的读写"""
+
+    def __init__(self, path, root=PROJECT_ROOT):
+        """
+        参数:
+            path: 清单文件路径
+            root: 记录文件时使用相对该目录的路径作为键
+        """
+        self.path = path
+        self.root = root
+        self.files = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.files = json.load(f).get('files', {})
+            except (OSError, ValueError):
+                self.files = {}
+
+    def _key(self, path):
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, '/')
+
+    def entry(self, path):
+        """文件的清单条目；文件不存在或字节数/修改时间与清单不一致时返回 None"""
+        entry = self.files.get(self._key(path))
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size != entry['bytes'] or stat.st_mtime_ns != entry['mtime_ns']:
+            return None
+        return entry
+
+    def rows(self, path):
+        """
+        文件的数据行数：清单有效时 O(1)，否则扫描一次文件并写回清单
+
+        返回:
+            int: 行数，文件不存在时为 0
+        """
+        if not os.path.exists(path):
+            return 0
+        entry = self.entry(path)
+        if entry is None:
+            entry = self.record(path)
+            self.save()
+        return entry['rows']
+
+    def record(self, path, dates=None, merge_dates=False):
+        """
+        记录（或更新）一个文件的条目，不自动保存
+
+        参数:
+            path: 数据文件
+            dates: {日期列: [最小值, 最大值]}，见 date_ranges()
+            merge_dates: dates 只覆盖新追加的数据时为 True，与已有条目的范围合并；
+                         没有可合并的已有条目时从文件读取日期列重新计算
+
+        返回:
+            dict: 新条目
+        """
+        key = self._key(path)
+        previous = self.files.get(key)
+        if dates is None or (merge_dates and previous is None):
+            dates = self._file_dates(path)
+        elif merge_dates:
+            dates = _merge_ranges(previous.get('dates'), dates)
+
+        sha256, rows = scan_file(path)
+        stat = os.stat(path)
+        entry = {
+            'rows': rows,
+            'bytes': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+            'dates': dates,
+            'updated': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.files[key] = entry
+        return entry
+
+    def record_append(self, path, offset, dates):
+        """
+        文件在 offset 字节之后追加了数据时更新条目，只读取追加的部分
+
+        行数在原条目上累加，日期范围合并，sha256 为原哈希与追加字节的链式哈希。
+        原条目缺失或其字节数不等于 offset（追加前文件已被改动）时退回 record() 重新扫描。
+
+        返回:
+            dict: 新条目
+        """
+        key = self._key(path)
+        previous = self.files.get(key)
+        if previous is None or previous['bytes'] != offset:
+            return self.record(path, dates=dates, merge_dates=True)
+
+        digest = hashlib.sha256(previous['sha256'].encode('ascii'))
+        lines = 0
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                chunk = f.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                lines += chunk.count(b'\n')
+        stat = os.stat(path)
+        entry = {
+            'rows': previous['rows'] + lines,
+            'bytes': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': digest.hexdigest(),
+            'dates': _merge_ranges(previous.get('dates'), dates),
+            'updated': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.files[key] = entry
+        return entry
+
+    @staticmethod
+    def _file_dates(path):
+        # read_flight_csv 只解析文件中存在的日期列（只读清单的调度器不必载入 pandas）
+        from src.utils.schema import DATE_COLUMNS, read_flight_csv
+        return date_ranges(read_flight_csv(path, columns=DATE_COLUMNS, parse_dates=False))
+
+    def save(self):
+        """原子写入清单"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.manifest-', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'files': self.files}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
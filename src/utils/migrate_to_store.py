@@ -0,0 +1,112 @@
+"""
+CSV -> 分区列式存储 迁移工具
+====================================
+
+把 data/raw/ 下各航线的原始 CSV 分块读入并写入 PartitionedStore，合并小文件后校验行数；
+校验通过的航线写入 _FULL_HISTORY 标记，此后分析和扫描规划改从数据集读取。
+原 CSV 不做任何修改，可重复运行。
+
+默认跳过数据集中已经存在的 (航线, 采集日期) 分区：开启 WRITE_PARTITIONED_STORE 后采集器会同时写入
+当天的分区，迁移时再导入这些日期会重复写入。已有分区的内容以数据集为准，
+若怀疑某些分区不完整，用 --overwrite 先清空该航线的全部分区再完整导入。
+
+使用方法:
+    python src/utils/migrate_to_store.py                          # 迁移 config 中的全部航线
+    python src/utils/migrate_to_store.py --routes SZX-YIH --store-dir data/store
+    python src/utils/migrate_to_store.py --csv other.csv --routes SZX-YIH
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pandas as pd
+
+from config import STORE_DIR, load_routes, route_data_file
+from src.collectors.offer_parser import COLUMNS
+from src.utils.partitioned_store import PartitionedStore, INT_COLUMNS, FLOAT_COLUMNS
+
+CHUNK_ROWS = 500_000
+STRING_DTYPES = {name: str for name in COLUMNS if name not in INT_COLUMNS + FLOAT_COLUMNS}
+
+
+def migrate_route(store, origin, destination, csv_path, chunk_rows=CHUNK_ROWS, overwrite=False):
+    """
+    迁移单条航线
+
+    参数:
+        overwrite: 为 True 时先清空该航线的全部分区；否则跳过数据集中已存在的采集日期分区
+
+    返回:
+        tuple: (CSV 行数, 跳过的行数, 数据集中该航线的行数)
+    """
+    route_dir = os.path.join(store.root, f"route={origin}-{destination}")
+    if overwrite and os.path.isdir(route_dir):
+        shutil.rmtree(route_dir)
+    # 迁移开始前已存在的分区（之后本次写入的分区不算在内，同一采集日期跨多个分块时仍会继续写入）
+    existing = {fetch_date for _, _, fetch_date, _ in store.partitions(routes=[(origin, destination)])}
+
+    rows = skipped = 0
+    for chunk in pd.read_csv(csv_path, encoding='utf-8-sig', dtype=STRING_DTYPES, chunksize=chunk_rows):
+        rows += len(chunk)
+        if existing:
+            keep = ~chunk['采集日期'].isin(existing)
+            skipped += int((~keep).sum())
+            chunk = chunk[keep]
+        if len(chunk):
+            store.append(chunk[COLUMNS], origin, destination)
+        print(f"  已读取 {rows:,} 行（跳过已有分区 {skipped:,} 行）", flush=True)
+    store.compact(routes=[(origin, destination)])
+    stored = len(store.read(columns=['价格'], routes=[(origin, destination)]))
+    return rows, skipped, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把原始 CSV 迁移到分区列式存储')
+    parser.add_argument('--routes', default=None, help='航线列表，如 SZX-YIH,SZX-PEK（默认全部航线）')
+    parser.add_argument('--csv', default=None, help='指定源 CSV（只能配合单条航线使用）')
+    parser.add_argument('--store-dir', default=STORE_DIR, help='目标数据集目录')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='每次读取的 CSV 行数')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='先清空数据集中对应航线的已有分区（默认跳过已存在的采集日期分区）')
+    args = parser.parse_args()
+
+    if args.routes:
+        routes = [tuple(part.strip().upper().split('-')) for part in args.routes.split(',') if part.strip()]
+    else:
+        routes = load_routes()
+    if args.csv and len(routes) != 1:
+        parser.error('--csv 只能配合单条航线使用')
+
+    store = PartitionedStore(args.store_dir)
+    ok = True
+    for origin, destination in routes:
+        csv_path = args.csv or route_data_file(origin, destination)
+        if not os.path.exists(csv_path):
+            print(f"⚠️ {origin} -> {destination}: 找不到 {csv_path}，跳过")
+            continue
+        print(f"📦 {origin} -> {destination}: {csv_path}")
+        start = time.perf_counter()
+        rows, skipped, stored = migrate_route(store, origin, destination, csv_path, args.chunk_rows,
+                                              args.overwrite)
+        elapsed = time.perf_counter() - start
+        status = "✅" if rows == stored else "❌ 行数不一致"
+        ok = ok and rows == stored
+        if rows == stored and not args.csv:
+            store.mark_full_history(origin, destination)
+        print(f"{status} CSV {rows:,} 行（其中 {skipped:,} 行所在分区已存在，未重复导入）-> 数据集 {stored:,} 行，"
+              f"用时 {elapsed:.1f} 秒")
+
+    print(f"\n数据集目录: {args.store_dir}")
+    if not ok:
+        print("存在行数不一致的航线（已有分区与 CSV 不一致，可加 --overwrite 清空后重新迁移）")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+分区列式存储
+====================
+
+按 航线 / 采集日期 分区保存原始航班数据（Parquet + zstd 压缩），替代不断增长的单个 CSV：
+
+    data/store/route=SZX-YIH/fetch_date=2026-01-01/part-<写入时间>.parquet
+
+- 列投影: read(columns=[...]) 只解码需要的列
+- 分区裁剪: read(routes=..., since=..., until=...) 只打开匹配的分区目录
+- 追加写入: 每次写入生成新的 part 文件（先写临时文件再替换），已有文件从不修改；
+  compact() 把同一分区的多个 part 合并为一个
+
+读取时同一分区内按 part 文件名（写入时间）排序，行顺序与原 CSV 的追加顺序一致。
+
+采集器从启用起持续写入数据集；用迁移工具导入历史 CSV 后，航线目录下会写入 _FULL_HISTORY 标记，
+读取方（分析、规划）只在有该标记时才用数据集代替 CSV，避免读到不完整的历史。
+依赖 pyarrow，首次读写时才导入（pyarrow.dataset 会连带载入 pandas），只检查分区标记的调用方不必付出导入开销。
+"""
+
+import importlib.util
+import os
+import shutil
+import time
+
+from src.collectors.offer_parser import COLUMNS
+
+pa = ds = pq = None
+
+INT_COLUMNS = ('提前天数', '剩余座位')
+FLOAT_COLUMNS = ('价格',)
+COMPRESSION = 'zstd'
+FULL_HISTORY_MARKER = '_FULL_HISTORY'
+
+
+def _require_pyarrow():
+    global pa, ds, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError:  # pragma: no cover
+            raise ImportError("分区存储需要 pyarrow，请运行: pip install pyarrow") from None
+        pa, ds, pq = pyarrow, pyarrow.dataset, pyarrow.parquet
+
+
+def arrow_schema(columns=COLUMNS, int_columns=INT_COLUMNS, float_columns=FLOAT_COLUMNS):
+    """
+    固定 Arrow 模式（保证所有 part 文件类型一致，可以直接拼接），默认为原始数据的 13 列
+
+    参数:
+        columns: 列名顺序，未列入 int_columns / float_columns 的列为字符串
+    """
+    _require_pyarrow()
+    fields = []
+    for name in columns:
+        if name in int_columns:
+            fields.append(pa.field(name, pa.int64()))
+        elif name in float_columns:
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields)
+
+
+def _to_table(df, schema=None):
+    """把采集结果 DataFrame 转为固定模式的 Arrow 表（字符串列统一转为 str，缺失值保留为空）"""
+    _require_pyarrow()
+    schema = schema if schema is not None else arrow_schema()
+    columns = {}
+    for field in schema:
+        values = df[field.name]
+        if pa.types.is_string(field.type):
+            values = values.where(values.isna(), values.astype(str))
+        columns[field.name] = pa.array(values, type=field.type, from_pandas=True)
+    return pa.table(columns, schema=schema)
+
+
+class PartitionedStore:
+    """按 航线 / 采集日期 分区的 Parquet 数据集"""
+
+    def __init__(self, root, schema=None):
+        """
+        参数:
+            root: 数据集根目录
+            schema: Arrow 模式，默认为原始数据的 arrow_schema()
+        """
+        if pa is None and importlib.util.find_spec('pyarrow') is None:
+            raise ImportError("分区存储需要 pyarrow，请运行: pip install pyarrow")
+        self.root = root
+        self._schema = schema
+        self._seq = 0
+
+    @property
+    def schema(self):
+        """Arrow 模式（首次用到时才导入 pyarrow）"""
+        if self._schema is None:
+            self._schema = arrow_schema()
+        return self._schema
+
+    def _partition_dir(self, origin, destination, fetch_date):
+        return os.path.join(self.root, f"route={origin}-{destination}", f"fetch_date={fetch_date}")
+
+    def _new_part_name(self):
+        self._seq += 1
+        return f"part-{time.time_ns():020d}-{os.getpid()}-{self._seq:04d}.parquet"
+
+    def append(self, df, origin, destination, partition=None):
+        """
+        追加一批数据（可跨多个采集日期），每个采集日期写入一个新的 part 文件
+
+        参数:
+            partition: 指定分区名（YYYY-MM-DD）时整批写入该分区，不再按采集日期拆分
+
+        返回:
+            int: 写入的行数
+        """
+        if df is None or len(df) == 0:
+            return 0
+        _require_pyarrow()
+        groups = [(partition, df)] if partition is not None else df.groupby('采集日期', sort=False)
+        for fetch_date, part in groups:
+            directory = self._partition_dir(origin, destination, fetch_date)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, self._new_part_name())
+            tmp_path = path + '.tmp'
+            pq.write_table(_to_table(part, self.schema), tmp_path, compression=COMPRESSION)
+            os.replace(tmp_path, path)
+        return len(df)
+
+    def overwrite(self, df, origin, destination, partition):
+        """
+        整体替换一个分区：先写入新 part 文件，再删除该分区原有的 part 文件（重复执行结果相同）
+
+        返回:
+            int: 写入的行数
+        """
+        directory = self._partition_dir(origin, destination, partition)
+        existing = os.listdir(directory) if os.path.isdir(directory) else []
+        self.append(df, origin, destination, partition=partition)
+        for name in existing:
+            if name.endswith('.parquet'):
+                os.remove(os.path.join(directory, name))
+        return len(df)
+
+    def drop(self, origin, destination, fetch_date):
+        """删除一个分区"""
+        shutil.rmtree(self._partition_dir(origin, destination, fetch_date), ignore_errors=True)
+
+    def has_full_history(self, origin, destination):
+        """该航线是否已导入全部历史（迁移工具完成后写入标记）"""
+        return os.path.exists(os.path.join(self.root, f"route={origin}-{destination}", FULL_HISTORY_MARKER))
+
+    def mark_full_history(self, origin, destination):
+        """标记该航线已包含全部历史"""
+        route_dir = os.path.join(self.root, f"route={origin}-{destination}")
+        os.makedirs(route_dir, exist_ok=True)
+        with open(os.path.join(route_dir, FULL_HISTORY_MARKER), 'w', encoding='utf-8') as f:
+            f.write(time.strftime('%Y-%m-%dT%H:%M:%S') + '\n')
+
+    def routes(self):
+        """数据集中已有的航线列表"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(tuple(name[len('route='):].split('-', 1))
+                      for name in os.listdir(self.root) if name.startswith('route='))
+
+    def partitions(self, routes=None, since=None, until=None):
+        """
+        列出匹配的分区（分区裁剪只看目录名，不打开文件）
+
+        参数:
+            routes: [(出发地, 目的地), ...]，None 表示全部航线
+            since / until: 采集日期范围（含两端，YYYY-MM-DD），None 表示不限
+
+        返回:
+            list: [(出发地, 目的地, 采集日期, [part 文件路径, ...]), ...]，按航线、采集日期排序
+        """
+        result = []
+        for origin, destination in (routes if routes is not None else self.routes()):
+            route_dir = os.path.join(self.root, f"route={origin}-{destination}")
+            if not os.path.isdir(route_dir):
+                continue
+            for name in sorted(os.listdir(route_dir)):
+                if not name.startswith('fetch_date='):
+                    continue
+                fetch_date = name[len('fetch_date='):]
+                if (since and fetch_date < since) or (until and fetch_date > until):
+                    continue
+                directory = os.path.join(route_dir, name)
+                parts = sorted(os.path.join(directory, f) for f in os.listdir(directory)
+                               if f.endswith('.parquet'))
+                if parts:
+                    result.append((origin, destination, fetch_date, parts))
+        return result
+
+    def read(self, columns=None, routes=None, since=None, until=None, with_route=False, exclude=None):
+        """
+        读取数据
+
+        参数:
+            columns: 需要的列（列投影），None 表示模式中的全部列
+            routes / since / until: 分区裁剪条件，见 partitions()
+            with_route: 是否在最前面加上 出发地、目的地 两列
+            exclude: 跳过的分区集合 {(出发地, 目的地, 采集日期), ...}
+
+        返回:
+            DataFrame: 按航线、采集日期、写入顺序排列
+        """
+        _require_pyarrow()
+        columns = list(columns) if columns is not None else list(self.schema.names)
+        partitions = self.partitions(routes, since, until)
+        if exclude:
+            partitions = [p for p in partitions if p[:3] not in exclude]
+        files = [path for *_, parts in partitions for path in parts]
+        if not files:
+            import pandas as pd
+            df = pd.DataFrame({name: pd.Series(dtype=self.schema.field(name).type.to_pandas_dtype())
+                               for name in columns})
+        else:
+            # 多文件并行解码，结果按 files 顺序拼接
+            table = ds.dataset(files, schema=self.schema, format='parquet').to_table(columns=columns)
+            df = table.to_pandas()
+
+        if with_route:
+            origins, destinations = [], []
+            for origin, destination, _, parts in partitions:
+                rows = sum(pq.ParquetFile(path).metadata.num_rows for path in parts)
+                origins.extend([origin] * rows)
+                destinations.extend([destination] * rows)
+            df.insert(0, '目的地', destinations)
+            df.insert(0, '出发地', origins)
+        return df
+
+    def compact(self, routes=None, since=None, until=None):
+        """
+        把每个分区的多个 part 文件合并为一个（保持行顺序），减少小文件
+
+        返回:
+            int: 合并的分区数
+        """
+        merged = 0
+        for origin, destination, fetch_date, parts in self.partitions(routes, since, until):
+            if len(parts) < 2:
+                continue
+            _require_pyarrow()
+            table = pa.concat_tables(pq.read_table(path, schema=self.schema) for path in parts)
+            directory = os.path.dirname(parts[0])
+            path = os.path.join(directory, self._new_part_name())
+            tmp_path = path + '.tmp'
+            pq.write_table(table, tmp_path, compression=COMPRESSION)
+            os.replace(tmp_path, path)
+            for old in parts:
+                os.remove(old)
+            merged += 1
+        return merged
@@ -0,0 +1,302 @@
+"""
+价格区间压缩
+====================
+
+每天两次采集追加的行里，大部分与同一报价上一次的观测完全相同，只有采集日期和提前天数在变。
+本模块把快照流压缩为“价格有效区间”：同一报价在连续采集日里价格和剩余座位都不变的观测
+合并为一行 (有效起, 有效止)，价格或座位任一变化即开始新区间。
+
+    快照: 采集日期, 起飞日期, 提前天数, 航班号, ..., 剩余座位, 价格        （每次采集一行）
+    区间: 有效起, 有效止, 起飞日期, 航班号, ..., 槽位, 提前天数偏移, 剩余座位, 价格
+
+- 报价标识: 起飞日期 + 航班号/航司/类型/起降时间/时长/中转信息（KEY_COLUMNS）
+- 槽位: 同一采集日期内同一报价的第几次出现（每天两次采集时为 0 和 1）
+- 提前天数 = 起飞日期 - 采集日期 + 提前天数偏移（正常数据偏移恒为 0）
+- 区间覆盖有效起到有效止之间的每一个日历日；中间漏采的日子会把区间断开，因此无需另存采集日历
+
+expand_intervals 还原出的快照与原数据逐行一致（作为多重集合；同一采集日期内按槽位、起飞日期、
+价格排序，与采集器的写入顺序相同，只有同价报价之间的先后可能不同）。
+
+使用方法:
+    python src/utils/price_intervals.py                       # 压缩 config 中的全部航线
+    python src/utils/price_intervals.py --routes SZX-YIH --verify
+    python src/utils/price_intervals.py --incremental         # 只压缩区间文件最后一天及之后的采集日期
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from src.collectors.offer_parser import COLUMNS
+
+KEY_COLUMNS = ['起飞日期', '航班号', '航司', '类型', '起飞时间', '到达时间', '总时长', '中转地', '中转时长']
+RUN_COLUMNS = ['槽位', '提前天数偏移', '剩余座位', '价格']
+INTERVAL_COLUMNS = ['有效起', '有效止'] + KEY_COLUMNS + RUN_COLUMNS
+
+NUMERIC_COLUMNS = ['提前天数', '剩余座位', '价格']
+DATE_FORMAT = '%Y-%m-%d'
+EPOCH = pd.Timestamp('1970-01-01')
+
+
+def read_snapshots(path, since=None):
+    """
+    无损读取快照 CSV：字符串列保持原样（空串不转为缺失值），数值列按数值解析
+
+    参数:
+        path: 原始数据 CSV
+        since: 只保留采集日期晚于该日期的行（YYYY-MM-DD），None 表示全部
+    """
+    dtypes = {name: str for name in COLUMNS if name not in NUMERIC_COLUMNS}
+    df = pd.read_csv(path, encoding='utf-8-sig', dtype=dtypes, keep_default_na=False,
+                     na_values={name: [''] for name in NUMERIC_COLUMNS})
+    if since is not None:
+        df = df[df['采集日期'] > since].reset_index(drop=True)
+    return df[COLUMNS]
+
+
+def _day_numbers(dates):
+    """日期字符串 -> 距 1970-01-01 的天数（只解析不同的取值）"""
+    codes, uniques = pd.factorize(np.asarray(dates), use_na_sentinel=False)
+    return (pd.to_datetime(uniques, format=DATE_FORMAT) - EPOCH).days.to_numpy()[codes]
+
+
+def _day_strings(days):
+    """天数 -> 日期字符串数组（只格式化不同的取值）"""
+    uniques, codes = np.unique(days, return_inverse=True)
+    return (EPOCH + pd.to_timedelta(uniques, unit='D')).strftime(DATE_FORMAT).to_numpy()[codes]
+
+
+def compact_snapshots(df):
+    """
+    把快照压缩为价格有效区间
+
+    参数:
+        df: 快照数据（13 列原始格式）
+
+    返回:
+        DataFrame: INTERVAL_COLUMNS 列，按有效起、槽位、起飞日期、价格排序
+    """
+    if len(df) == 0:
+        return pd.DataFrame(columns=INTERVAL_COLUMNS)
+
+    snap = df[COLUMNS].reset_index(drop=True)
+    fetch_day = _day_numbers(snap['采集日期'])
+    dep_day = _day_numbers(snap['起飞日期'])
+    snap = snap.assign(
+        提前天数偏移=snap['提前天数'].to_numpy() - (dep_day - fetch_day),
+        槽位=snap.groupby(['采集日期'] + KEY_COLUMNS, sort=False, dropna=False).cumcount(),
+        _day=fetch_day,
+    )
+    snap['_offer'] = snap.groupby(KEY_COLUMNS + ['槽位'], sort=False, dropna=False).ngroup()
+    snap = snap.sort_values(['_offer', '_day'], kind='stable')
+
+    offer = snap['_offer'].to_numpy()
+    day = snap['_day'].to_numpy()
+    starts = np.ones(len(snap), dtype=bool)
+    starts[1:] = (offer[1:] != offer[:-1]) | (day[1:] != day[:-1] + 1)
+    for name in ('提前天数偏移', '剩余座位', '价格'):
+        values = snap[name].to_numpy()
+        changed = values[1:] != values[:-1]
+        if values.dtype.kind == 'f':
+            # 两侧都缺失视为未变化
+            changed &= ~(np.isnan(values[1:]) & np.isnan(values[:-1]))
+        starts[1:] |= changed
+    ends = np.append(starts[1:], True)
+
+    intervals = snap.loc[starts, KEY_COLUMNS + RUN_COLUMNS].reset_index(drop=True)
+    intervals.insert(0, '有效止', _day_strings(day[ends]))
+    intervals.insert(0, '有效起', _day_strings(day[starts]))
+    return _sorted(intervals)
+
+
+def _sorted(intervals):
+    return intervals.sort_values(['有效起', '槽位', '起飞日期', '价格'], kind='stable').reset_index(drop=True)
+
+
+def expand_intervals(intervals):
+    """
+    把价格区间还原为快照
+
+    返回:
+        DataFrame: 13 列原始格式，按采集日期、槽位、起飞日期、价格排序
+    """
+    if len(intervals) == 0:
+        return pd.DataFrame(columns=COLUMNS)
+
+    start = _day_numbers(intervals['有效起'])
+    lengths = _day_numbers(intervals['有效止']) - start + 1
+    repeat = np.repeat(np.arange(len(intervals)), lengths)
+    # 每行在所属区间内的序号
+    position = np.arange(len(repeat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    fetch_day = start[repeat] + position
+
+    dep_day = _day_numbers(intervals['起飞日期'])[repeat]
+
+    snap = intervals.iloc[repeat].reset_index(drop=True)
+    snap['采集日期'] = _day_strings(fetch_day)
+    snap['提前天数'] = dep_day - fetch_day + snap['提前天数偏移'].to_numpy()
+    snap = snap.sort_values(['采集日期', '槽位', '起飞日期', '价格'], kind='stable')
+    return snap[COLUMNS].reset_index(drop=True)
+
+
+def merge_intervals(old, new):
+    """
+    把新采集日期的区间接到已有区间之后：新区间的首日紧接旧区间的末日、且报价/槽位/价格/座位都相同时合并
+
+    参数:
+        old: 已有区间
+        new: 新快照压缩得到的区间（采集日期必须都晚于 old 的最后一天，见 truncate_last_day）
+
+    返回:
+        DataFrame: 合并后的区间
+    """
+    if len(old) == 0:
+        return _sorted(new)
+    if len(new) == 0:
+        return _sorted(old)
+
+    match_columns = KEY_COLUMNS + RUN_COLUMNS
+    tail = old[['有效止'] + match_columns].reset_index()
+    tail['_next'] = _day_strings(_day_numbers(tail['有效止']) + 1)
+    head = new[['有效起'] + match_columns].reset_index()
+    joined = head.merge(tail, left_on=['有效起'] + match_columns, right_on=['_next'] + match_columns,
+                        suffixes=('_new', '_old'))
+
+    merged = old.copy()
+    merged.loc[joined['index_old'].to_numpy(), '有效止'] = new.loc[joined['index_new'].to_numpy(), '有效止'].to_numpy()
+    remaining = new.drop(index=joined['index_new'].to_numpy())
+    return _sorted(pd.concat([merged, remaining], ignore_index=True))
+
+
+def truncate_last_day(intervals, last):
+    """
+    去掉区间在 last 这一天的部分
+
+    返回:
+        tuple: (截断后的区间, last 的前一天)
+    """
+    before = _day_strings(_day_numbers([last]) - 1)[0]
+    kept = intervals[intervals['有效起'] != last].copy()
+    kept.loc[kept['有效止'] == last, '有效止'] = before
+    return kept.reset_index(drop=True), before
+
+
+def _canonical(df):
+    return df[COLUMNS].sort_values(COLUMNS, kind='stable').reset_index(drop=True)
+
+
+def verify_round_trip(snapshots, intervals):
+    """还原出的快照与原快照是否逐行一致（不计行顺序）"""
+    restored = expand_intervals(intervals)
+    if len(restored) != len(snapshots):
+        return False
+    left = _canonical(snapshots)
+    right = _canonical(restored).astype(left.dtypes.to_dict())
+    return left.equals(right)
+
+
+def read_intervals(path):
+    """读取区间文件（字符串列保持原样）"""
+    dtypes = {name: str for name in ['有效起', '有效止'] + KEY_COLUMNS}
+    return pd.read_csv(path, encoding='utf-8-sig', dtype=dtypes, keep_default_na=False,
+                       na_values={name: [''] for name in RUN_COLUMNS})
+
+
+def is_interval_file(path):
+    """CSV 表头是否为区间格式"""
+    header = pd.read_csv(path, encoding='utf-8-sig', nrows=0).columns.tolist()
+    return header[:2] == ['有效起', '有效止']
+
+
+def write_intervals(intervals, path):
+    """原子写入区间文件"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    intervals[INTERVAL_COLUMNS].to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, path)
+
+
+def compact_route(csv_path, interval_path, incremental=False, verify=False):
+    """
+    压缩单条航线的原始 CSV 并写入区间文件
+
+    参数:
+        incremental: 区间文件已存在时只压缩其最后一天及之后的采集日期并合并
+        verify: 写入前校验还原结果与原快照一致（全量模式）
+
+    返回:
+        dict: 快照行数、区间行数、压缩比、文件大小、是否通过校验
+    """
+    old = None
+    since = None
+    if incremental and os.path.exists(interval_path):
+        old = read_intervals(interval_path)
+        if len(old):
+            # 最后一天可能只采集了一轮，从这一天起重新压缩
+            last = old['有效止'].max()
+            old, since = truncate_last_day(old, last)
+
+    snapshots = read_snapshots(csv_path, since=since)
+    intervals = compact_snapshots(snapshots)
+    verified = verify_round_trip(snapshots, intervals) if verify else None
+    if old is not None:
+        intervals = merge_intervals(old, intervals)
+    write_intervals(intervals, interval_path)
+
+    snapshot_rows = int((_day_numbers(intervals['有效止']) - _day_numbers(intervals['有效起']) + 1).sum())
+    return {
+        'snapshot_rows': snapshot_rows,
+        'interval_rows': len(intervals),
+        'ratio': snapshot_rows / max(len(intervals), 1),
+        'csv_bytes': os.path.getsize(csv_path),
+        'interval_bytes': os.path.getsize(interval_path),
+        'new_rows': len(snapshots),
+        'verified': verified,
+    }
+
+
+def main():
+    from config import load_routes, route_data_file, route_interval_file
+
+    parser = argparse.ArgumentParser(description='把原始快照压缩为价格有效区间')
+    parser.add_argument('--routes', default=None, help='航线列表，如 SZX-YIH,SZX-PEK（默认全部航线）')
+    parser.add_argument('--incremental', action='store_true', help='只压缩区间文件最后一天及之后的采集日期')
+    parser.add_argument('--verify', action='store_true', help='校验区间能无损还原为快照')
+    args = parser.parse_args()
+
+    if args.routes:
+        routes = [tuple(part.strip().upper().split('-')) for part in args.routes.split(',') if part.strip()]
+    else:
+        routes = load_routes()
+
+    ok = True
+    for origin, destination in routes:
+        csv_path = route_data_file(origin, destination)
+        if not os.path.exists(csv_path):
+            print(f"⚠️ {origin} -> {destination}: 找不到 {csv_path}，跳过")
+            continue
+        interval_path = route_interval_file(origin, destination)
+        start = time.perf_counter()
+        stats = compact_route(csv_path, interval_path, args.incremental, args.verify)
+        elapsed = time.perf_counter() - start
+        print(f"📉 {origin} -> {destination}: 快照 {stats['snapshot_rows']:,} 行 -> 区间 {stats['interval_rows']:,} 行 "
+              f"(压缩比 {stats['ratio']:.1f}x)，文件 {stats['csv_bytes'] / 1e6:,.1f} MB -> "
+              f"{stats['interval_bytes'] / 1e6:,.1f} MB，本次处理 {stats['new_rows']:,} 行，用时 {elapsed:.1f} 秒")
+        if stats['verified'] is not None:
+            ok = ok and stats['verified']
+            print(f"   {'✅ 还原校验通过' if stats['verified'] else '❌ 还原结果与原快照不一致'}")
+        print(f"   区间文件: {interval_path}")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
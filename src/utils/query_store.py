@@ -0,0 +1,425 @@
+"""
+航班价格查询库
+====================
+
+把采集器输出的原始 CSV 增量导入 SQLite，并建立索引，支持毫秒级查询：
+
+- 单个航班的价格历史: price_history('CZ3456', '2026-11-02')
+- 按起飞日期 / 采集日期范围扫描: range_scan(...)
+- 时间窗口内最便宜: cheapest_in_window(...)（每个起飞日期取截至 as_of 的最近一次采集）
+- 灵活日期搜索: flexible_search / flexible_calendar，±k 天内最低价（单调队列滑动窗口最小值，O(n)）
+
+增量导入按字节偏移记录每条航线 CSV 已导入的位置（CSV 只追加），再次同步只读取新增的行；
+文件变小（被回放工具重建）时重新导入该航线。
+
+使用方法:
+    python src/utils/query_store.py --sync
+    python src/utils/query_store.py --flight CZ3456 --date 2026-11-02
+    python src/utils/query_store.py --route SZX-YIH --dep-from 2026-11-01 --dep-to 2026-11-30 --cheapest
+    python src/utils/query_store.py --route SZX-YIH --date 2026-11-02 --flex 3
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import sys
+from collections import deque
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pandas as pd
+
+from src.collectors.offer_parser import COLUMNS
+
+# 与 COLUMNS 一一对应的 SQL 列名
+SQL_COLUMNS = ['fetch_date', 'dep_date', 'days_ahead', 'flight_no', 'airline', 'kind', 'dep_time',
+               'arr_time', 'duration', 'layover', 'layover_time', 'seats', 'price']
+FROM_SQL = dict(zip(SQL_COLUMNS, COLUMNS))
+STRING_DTYPES = {name: str for name in COLUMNS if name not in ('提前天数', '剩余座位', '价格')}
+CHUNK_ROWS = 200_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS offers (
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    fetch_date TEXT NOT NULL,
+    dep_date TEXT NOT NULL,
+    days_ahead INTEGER,
+    flight_no TEXT,
+    airline TEXT,
+    kind TEXT,
+    dep_time TEXT,
+    arr_time TEXT,
+    duration TEXT,
+    layover TEXT,
+    layover_time TEXT,
+    seats INTEGER,
+    price REAL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (origin, destination)
+);
+"""
+
+INDEXES = {
+    'idx_offers_flight': 'offers (flight_no, dep_date, fetch_date)',
+    'idx_offers_route_dep': 'offers (origin, destination, dep_date, fetch_date, price)',
+    'idx_offers_route_fetch': 'offers (origin, destination, fetch_date)',
+}
+
+
+class _BoundedReader(io.RawIOBase):
+    """只读取文件 [start, end) 字节范围的只读流，供 pandas 分块解析"""
+
+    def __init__(self, f, start, end):
+        self._f = f
+        self._remaining = end - start
+        f.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        data = self._f.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+def _complete_end(f, size):
+    """文件中最后一个换行符之后的位置（忽略正在写入的半行）"""
+    block = 1 << 16
+    pos = size
+    while pos > 0:
+        start = max(0, pos - block)
+        f.seek(start)
+        data = f.read(pos - start)
+        idx = data.rfind(b'\n')
+        if idx >= 0:
+            return start + idx + 1
+        pos = start
+    return 0
+
+
+def sliding_window_min(values, k):
+    """
+    居中滑动窗口最小值（窗口为 [i-k, i+k]），单调队列实现，O(n)
+
+    参数:
+        values: 数值列表，None / NaN 视为无数据
+        k: 窗口半径
+
+    返回:
+        list: 每个位置的 (最小值, 最小值所在下标)，窗口内没有数据时为 (None, None)
+    """
+    n = len(values)
+    result = []
+    window = deque()  # 下标队列，对应的值单调递增
+    right = 0
+    for i in range(n):
+        while right < n and right <= i + k:
+            value = values[right]
+            if value is not None and value == value:
+                while window and values[window[-1]] >= value:
+                    window.pop()
+                window.append(right)
+            right += 1
+        while window and window[0] < i - k:
+            window.popleft()
+        result.append((values[window[0]], window[0]) if window else (None, None))
+    return result
+
+
+def _shift(date_str, days):
+    return (datetime.strptime(date_str, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+class QueryStore:
+    """SQLite 航班价格查询库"""
+
+    def __init__(self, path):
+        """
+        参数:
+            path: SQLite 数据库文件路径，不存在时自动创建
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA cache_size=-131072')  # 最多 128 MB 页缓存，减少索引维护的随机 IO
+        self.conn.executescript(SCHEMA)
+        self.create_indexes()
+
+    def create_indexes(self):
+        for name, definition in INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+    def drop_indexes(self):
+        """批量导入空库时先删除索引，导入完成后 create_indexes 一次性建立（约快 2 倍）"""
+        for name in INDEXES:
+            self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 导入 ---
+
+    def ingest_frame(self, df, origin, destination):
+        """
+        导入一批原始数据（列为 COLUMNS），不提交事务
+
+        返回:
+            int: 导入的行数
+        """
+        if df is None or len(df) == 0:
+            return 0
+        columns = []
+        for name in COLUMNS:
+            values = df[name]
+            column = values.tolist()
+            if values.hasnans:
+                column = [None if isna else v for v, isna in zip(column, values.isna().tolist())]
+            columns.append(column)
+        n = len(df)
+        rows = zip([origin] * n, [destination] * n, *columns)
+        placeholders = ', '.join(['?'] * (len(SQL_COLUMNS) + 2))
+        self.conn.executemany(
+            f"INSERT INTO offers (origin, destination, {', '.join(SQL_COLUMNS)}) VALUES ({placeholders})", rows)
+        return len(df)
+
+    def sync_csv(self, origin, destination, csv_path, chunk_rows=CHUNK_ROWS):
+        """
+        把航线 CSV 中尚未导入的行增量导入
+
+        返回:
+            int: 本次导入的行数
+        """
+        if not os.path.exists(csv_path):
+            return 0
+        row = self.conn.execute("SELECT offset FROM sync_state WHERE origin = ? AND destination = ?",
+                                (origin, destination)).fetchone()
+        offset = row[0] if row else 0
+        size = os.path.getsize(csv_path)
+        if size < offset:
+            # 文件被重建，重新导入该航线
+            self.conn.execute("DELETE FROM offers WHERE origin = ? AND destination = ?", (origin, destination))
+            offset = 0
+
+        rows = 0
+        with open(csv_path, 'rb') as f:
+            end = _complete_end(f, size)
+            if end <= offset:
+                return 0
+            reader = io.BufferedReader(_BoundedReader(f, offset, end))
+            text = io.TextIOWrapper(reader, encoding='utf-8-sig' if offset == 0 else 'utf-8')
+            options = {} if offset == 0 else {'header': None, 'names': COLUMNS}
+            bulk = self.row_count() == 0
+            with self.conn:
+                if bulk:
+                    self.drop_indexes()
+                for chunk in pd.read_csv(text, dtype=STRING_DTYPES, chunksize=chunk_rows, **options):
+                    rows += self.ingest_frame(chunk, origin, destination)
+                if bulk:
+                    self.create_indexes()
+                self.conn.execute("INSERT OR REPLACE INTO sync_state (origin, destination, offset) VALUES (?, ?, ?)",
+                                  (origin, destination, end))
+        return rows
+
+    # --- 查询 ---
+
+    def _query(self, sql, params):
+        cursor = self.conn.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        df = pd.DataFrame(cursor.fetchall(), columns=names)
+        return df.rename(columns=FROM_SQL)
+
+    def price_history(self, flight_no, departure_date):
+        """
+        某航班某起飞日期在各次采集中的价格
+
+        返回:
+            DataFrame: 出发地, 目的地, 采集日期, 提前天数, 剩余座位, 价格（按采集日期排序）
+        """
+        return self._query(
+            "SELECT origin AS 出发地, destination AS 目的地, fetch_date, days_ahead, seats, price "
+            "FROM offers WHERE flight_no = ? AND dep_date = ? ORDER BY fetch_date",
+            (flight_no, departure_date))
+
+    def range_scan(self, origin, destination, dep_from=None, dep_to=None, fetch_from=None, fetch_to=None):
+        """
+        按起飞日期 / 采集日期范围读取某航线的原始记录（范围含两端，None 表示不限）
+
+        返回:
+            DataFrame: COLUMNS 各列，按起飞日期、采集日期排序
+        """
+        conditions = ["origin = ?", "destination = ?"]
+        params = [origin, destination]
+        for column, op, value in [('dep_date', '>=', dep_from), ('dep_date', '<=', dep_to),
+                                  ('fetch_date', '>=', fetch_from), ('fetch_date', '<=', fetch_to)]:
+            if value is not None:
+                conditions.append(f"{column} {op} ?")
+                params.append(value)
+        return self._query(
+            f"SELECT {', '.join(SQL_COLUMNS)} FROM offers WHERE {' AND '.join(conditions)} "
+            f"ORDER BY dep_date, fetch_date", params)
+
+    def _latest_sql(self, as_of):
+        """
+        每个起飞日期截至 as_of 的最近一次采集日期
+
+        与 offers 连接时使用 CROSS JOIN 固定连接顺序（SQLite 不会重排 CROSS JOIN），
+        先得到每天一行的 latest，再按 (航线, 起飞日期, 采集日期) 索引回查，避免扫描整条航线
+        """
+        sql = ("SELECT dep_date, MAX(fetch_date) AS fetch_date FROM offers "
+               "WHERE origin = ? AND destination = ? AND dep_date BETWEEN ? AND ?")
+        if as_of is not None:
+            sql += " AND fetch_date <= ?"
+        return sql + " GROUP BY dep_date"
+
+    def daily_min_prices(self, origin, destination, dep_from, dep_to, as_of=None):
+        """
+        窗口内每个起飞日期的最低价（取截至 as_of 的最近一次采集）
+
+        返回:
+            DataFrame: 起飞日期, 采集日期, 价格
+        """
+        params = [origin, destination, dep_from, dep_to] + ([as_of] if as_of is not None else [])
+        return self._query(
+            f"WITH latest AS ({self._latest_sql(as_of)}) "
+            "SELECT o.dep_date, o.fetch_date, MIN(o.price) AS price FROM latest l "
+            "CROSS JOIN offers o ON o.origin = ? AND o.destination = ? "
+            "AND o.dep_date = l.dep_date AND o.fetch_date = l.fetch_date "
+            "GROUP BY o.dep_date ORDER BY o.dep_date",
+            params + [origin, destination])
+
+    def cheapest_in_window(self, origin, destination, dep_from, dep_to, as_of=None, limit=5):
+        """
+        起飞日期窗口内最便宜的航班（每个起飞日期只看截至 as_of 的最近一次采集）
+
+        返回:
+            DataFrame: COLUMNS 各列，按价格升序，最多 limit 行
+        """
+        params = [origin, destination, dep_from, dep_to] + ([as_of] if as_of is not None else [])
+        columns = ', '.join(f"o.{c}" for c in SQL_COLUMNS)
+        return self._query(
+            f"WITH latest AS ({self._latest_sql(as_of)}) "
+            f"SELECT {columns} FROM latest l "
+            "CROSS JOIN offers o ON o.origin = ? AND o.destination = ? "
+            "AND o.dep_date = l.dep_date AND o.fetch_date = l.fetch_date "
+            "ORDER BY o.price, o.dep_date LIMIT ?",
+            params + [origin, destination, limit])
+
+    def flexible_calendar(self, origin, destination, dep_from, dep_to, k, as_of=None):
+        """
+        灵活日期日历：窗口内每个起飞日期 d，给出 [d-k, d+k] 内的最低价及其日期
+
+        返回:
+            DataFrame: 起飞日期, 当天最低价, 灵活最低价, 最低价日期
+        """
+        daily = self.daily_min_prices(origin, destination, _shift(dep_from, -k), _shift(dep_to, k), as_of)
+        prices = dict(zip(daily['起飞日期'], daily['价格']))
+        start = datetime.strptime(dep_from, '%Y-%m-%d') - timedelta(days=k)
+        n_days = (datetime.strptime(dep_to, '%Y-%m-%d') - start).days + k + 1
+        dates = [(start + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(n_days)]
+        values = [prices.get(d) for d in dates]
+        window_min = sliding_window_min(values, k)
+
+        rows = []
+        for i in range(k, n_days - k):
+            best, idx = window_min[i]
+            rows.append((dates[i], values[i], best, dates[idx] if idx is not None else None))
+        return pd.DataFrame(rows, columns=['起飞日期', '当天最低价', '灵活最低价', '最低价日期'])
+
+    def flexible_search(self, origin, destination, departure_date, k, as_of=None):
+        """
+        灵活日期搜索：departure_date ±k 天内最低价
+
+        返回:
+            tuple: (最低价, 起飞日期)，没有数据时为 (None, None)
+        """
+        row = self.flexible_calendar(origin, destination, departure_date, departure_date, k, as_of).iloc[0]
+        return row['灵活最低价'], row['最低价日期']
+
+    def row_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM offers").fetchone()[0]
+
+
+def sync_routes(store, routes, file_for_route):
+    """增量导入多条航线的 CSV，返回 {航线: 导入行数}"""
+    return {(o, d): store.sync_csv(o, d, file_for_route(o, d)) for o, d in routes}
+
+
+def main():
+    from config import QUERY_DB_FILE, load_routes, route_data_file
+
+    parser = argparse.ArgumentParser(description='航班价格查询')
+    parser.add_argument('--db', default=QUERY_DB_FILE, help='SQLite 数据库路径')
+    parser.add_argument('--sync', action='store_true', help='先从原始 CSV 增量导入')
+    parser.add_argument('--route', default=None, help='航线，如 SZX-YIH（默认第一条配置航线）')
+    parser.add_argument('--flight', default=None, help='航班号，配合 --date 查询价格历史')
+    parser.add_argument('--date', default=None, help='起飞日期 YYYY-MM-DD')
+    parser.add_argument('--dep-from', default=None, help='起飞日期范围起点')
+    parser.add_argument('--dep-to', default=None, help='起飞日期范围终点')
+    parser.add_argument('--fetch-from', default=None, help='采集日期范围起点')
+    parser.add_argument('--fetch-to', default=None, help='采集日期范围终点')
+    parser.add_argument('--as-of', default=None, help='只使用该采集日期及之前的数据')
+    parser.add_argument('--cheapest', action='store_true', help='起飞日期范围内最便宜的航班')
+    parser.add_argument('--flex', type=int, default=None, help='灵活日期搜索半径 k（±k 天）')
+    parser.add_argument('--limit', type=int, default=10, help='最多显示的行数')
+    args = parser.parse_args()
+
+    routes = load_routes()
+    origin, destination = tuple(args.route.upper().split('-')) if args.route else routes[0]
+
+    with QueryStore(args.db) as store:
+        if args.sync:
+            for (o, d), rows in sync_routes(store, routes, route_data_file).items():
+                print(f"📥 {o} -> {d}: 导入 {rows} 行")
+
+        if args.flight:
+            if not args.date:
+                parser.error('--flight 需要配合 --date')
+            result = store.price_history(args.flight.upper(), args.date)
+            title = f"{args.flight.upper()} {args.date} 价格历史"
+        elif args.flex is not None:
+            dep_from = args.dep_from or args.date
+            dep_to = args.dep_to or args.date
+            if not dep_from:
+                parser.error('--flex 需要配合 --date 或 --dep-from/--dep-to')
+            result = store.flexible_calendar(origin, destination, dep_from, dep_to, args.flex, args.as_of)
+            title = f"{origin} -> {destination} 灵活日期 ±{args.flex} 天"
+        elif args.cheapest:
+            if not (args.dep_from and args.dep_to):
+                parser.error('--cheapest 需要配合 --dep-from 和 --dep-to')
+            result = store.cheapest_in_window(origin, destination, args.dep_from, args.dep_to,
+                                              args.as_of, args.limit)
+            title = f"{origin} -> {destination} {args.dep_from} ~ {args.dep_to} 最便宜航班"
+        elif args.dep_from or args.dep_to or args.fetch_from or args.fetch_to:
+            result = store.range_scan(origin, destination, args.dep_from, args.dep_to,
+                                      args.fetch_from, args.fetch_to)
+            title = f"{origin} -> {destination} 范围查询"
+        else:
+            print(f"数据库: {args.db}  共 {store.row_count():,} 行")
+            return
+
+        print(f"\n{title}（共 {len(result)} 行）")
+        print(result.head(args.limit).to_string(index=False) if len(result) else "无数据")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+数据模式
+====================
+
+原始数据和特征数据各列的紧凑类型，所有读取 CSV 的地方统一通过 read_flight_csv 加载：
+
+- 重复度高的字符串列（航司、类型、中转地、时段、区间等）读为 category
+- 提前天数、剩余座位、各类小时/星期/月份读为 int8 / int16
+- 价格和派生的浮点特征读为 float32
+- 采集日期、起飞日期解析为日期
+- columns 参数按需投影，只解析用到的列
+- iter_flight_csv 按字节分块逐块读取，供内存受限的流式分析使用
+
+特征工程需要与历史输出逐字节一致，因此分析器读取原始数据时关闭 category 和 float32，
+只使用小整数和列投影。
+"""
+
+import io
+
+import pandas as pd
+
+from src.collectors.offer_parser import COLUMNS as RAW_COLUMNS
+
+DATE_COLUMNS = ['采集日期', '起飞日期']
+
+CATEGORY_COLUMNS = ['航班号', '航司', '类型', '起飞时间', '到达时间', '总时长', '中转地', '中转时长',
+                    '起飞时段', '到达时段', '价格区间', '座位状态']
+
+INT_DTYPES = {
+    '提前天数': 'int16',
+    '剩余座位': 'int8',
+    '采集_星期': 'int8', '采集_月份': 'int8', '采集_日期': 'int8',
+    '起飞_星期': 'int8', '起飞_月份': 'int8', '起飞_日期': 'int8',
+    '起飞小时': 'int8', '到达小时': 'int8',
+    '飞行时长_分钟': 'int16', '中转时长_分钟': 'int16',
+    '中转次数': 'int8', '是否有中转': 'int8', '主要航司': 'int8',
+}
+
+FLOAT_COLUMNS = ['价格', '价格_百元', '性价比', '时间压力', '时长标准化', '价格标准化', '效率评分']
+
+# 分析器生成的特征数据集列顺序（原始 13 列 + 派生 23 列）
+FEATURED_COLUMNS = RAW_COLUMNS + [
+    '采集_星期', '采集_月份', '采集_日期', '起飞_星期', '起飞_月份', '起飞_日期',
+    '起飞小时', '到达小时', '起飞时段', '到达时段', '飞行时长_分钟', '中转时长_分钟',
+    '中转次数', '是否有中转', '主要航司', '价格_百元', '价格区间', '座位状态',
+    '性价比', '时间压力', '时长标准化', '价格标准化', '效率评分',
+]
+
+
+def flight_dtypes(columns, categorical=True, float32=True):
+    """
+    给定列的紧凑类型映射（不包含日期列，日期列由 read_flight_csv 单独解析）
+
+    返回:
+        dict: {列名: dtype}
+    """
+    dtypes = {}
+    for name in columns:
+        if name in INT_DTYPES:
+            dtypes[name] = INT_DTYPES[name]
+        elif float32 and name in FLOAT_COLUMNS:
+            dtypes[name] = 'float32'
+        elif categorical and name in CATEGORY_COLUMNS:
+            dtypes[name] = 'category'
+    return dtypes
+
+
+def read_flight_csv(path, columns=None, categorical=True, float32=True, parse_dates=True):
+    """
+    按统一模式读取原始或特征 CSV
+
+    参数:
+        path: CSV 路径
+        columns: 需要的列，None 表示全部列
+        categorical: 字符串列是否读为 category
+        float32: 价格等浮点列是否读为 float32
+        parse_dates: 是否把采集日期、起飞日期解析为日期
+
+    返回:
+        DataFrame
+    """
+    header = pd.read_csv(path, encoding='utf-8-sig', nrows=0).columns.tolist()
+    return _read_rows(lambda: path, header, columns, categorical, float32, parse_dates)
+
+
+def read_flight_csv_tail(path, offset, columns=None, categorical=True, float32=True, parse_dates=True):
+    """
+    只读取 CSV 中 offset 字节之后追加的完整行（表头仍取自文件开头），用于增量处理
+
+    参数:
+        path: CSV 路径
+        offset: 上次读到的位置，必须位于行首
+        其余参数同 read_flight_csv
+
+    返回:
+        tuple: (DataFrame, 新的 offset)；末尾尚未写完的行留到下次读取
+    """
+    header = pd.read_csv(path, encoding='utf-8-sig', nrows=0).columns.tolist()
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+    data = data[:data.rfind(b'\n') + 1]
+    if not data.strip():
+        usecols = [name for name in (columns if columns is not None else header) if name in header]
+        return pd.DataFrame(columns=usecols), offset + len(data)
+    df = _read_rows(lambda: io.BytesIO(data), header, columns, categorical, float32, parse_dates,
+                    header=None, names=header, encoding='utf-8')
+    return df, offset + len(data)
+
+
+def iter_flight_csv(path, chunk_bytes=64 * 1024 * 1024, columns=None, categorical=True, float32=True,
+                    parse_dates=True):
+    """
+    按约 chunk_bytes 字节一块（在行尾切分）逐块读取 CSV，内存只与分块大小有关
+
+    参数:
+        path: CSV 路径
+        chunk_bytes: 每块读取的字节数（至少包含一整行）
+        其余参数同 read_flight_csv
+
+    返回:
+        生成器: 依次产出各块 DataFrame（行序与文件一致）
+    """
+    header = pd.read_csv(path, encoding='utf-8-sig', nrows=0).columns.tolist()
+    with open(path, 'rb') as f:
+        f.readline()
+        rest = b''
+        while True:
+            block = f.read(chunk_bytes)
+            data = rest + block
+            end = data.rfind(b'\n') + 1 if block else len(data)
+            data, rest = data[:end], data[end:]
+            if data.strip():
+                yield _read_rows(lambda: io.BytesIO(data), header, columns, categorical, float32, parse_dates,
+                                 header=None, names=header, encoding='utf-8')
+            if not block:
+                break
+
+
+def _read_rows(source, file_columns, columns, categorical, float32, parse_dates, **kwargs):
+    usecols = [name for name in (columns if columns is not None else file_columns) if name in file_columns]
+    dtypes = flight_dtypes(usecols, categorical, float32)
+    dates = [name for name in DATE_COLUMNS if name in usecols] if parse_dates else []
+    options = {'encoding': 'utf-8-sig', **kwargs}
+    if dates:
+        options['date_format'] = '%Y-%m-%d'
+    try:
+        return pd.read_csv(source(), usecols=usecols, dtype=dtypes, parse_dates=dates, **options)
+    except ValueError:
+        # 整数列含缺失值等异常数据时，整数列退回 pandas 默认推断
+        dtypes = {name: dtype for name, dtype in dtypes.items() if name not in INT_DTYPES}
+        return pd.read_csv(source(), usecols=usecols, dtype=dtypes, parse_dates=dates, **options)
@@ -0,0 +1,502 @@
+"""
+单遍可合并统计量
+====================
+
+分析报告和图表需要的统计量都可以逐块累积、块间合并，内存只与分块大小和类别数有关，与历史长度无关：
+
+- RunningMoments: 计数、均值、方差（Welford / Chan 合并公式）、最小值、最大值、缺失数
+- QuantileSketch: 分位数草图。不同取值不超过 max_distinct 时保存精确的取值计数，分位数与 pandas 完全一致；
+  超过后折叠为 DDSketch 对数分桶，任意分位数的相对误差不超过 alpha（默认 0.5%），桶数只随取值范围的对数增长
+- CategoryCounts: 类别计数（value_counts / nunique）
+- GroupedMean: 分组求和与计数（groupby().mean()）
+- CovarianceAccumulator: 相关系数矩阵（Chan 合并公式），与 DataFrame.corr() 一样按列对剔除缺失值
+- ReservoirSample: 固定大小的均匀随机样本（每行一个随机键，保留键最小的 size 行），用于散点图
+- AnalysisSummary: 分析器基础统计、报告和图表用到的以上全部统计量
+
+精度说明:
+    计数、最小/最大值、类别计数、分组均值为精确值；均值、标准差、相关系数与一次性计算只有浮点求和顺序的差异；
+    中位数和四分位数在精确模式下与 pandas 相同，折叠后相对误差 <= alpha；
+    直方图由草图的取值计数绘制，折叠后每个取值被归入宽度约 2 * alpha 的对数桶；
+    散点图只绘制均匀样本（默认 20000 点）。
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def _scalar(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def distinct_counts(series):
+    """
+    一次排序得到一列的升序不同取值、各自次数和缺失数，该列的矩、分位数和直方图都由它计算
+
+    整数列保持原类型，最小/最大值与 pandas 输出一致（如 1 而不是 1.0）
+
+    返回:
+        tuple: (values, counts, nulls)
+    """
+    values = series.to_numpy()
+    if values.dtype.kind not in 'iuf':
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+    values, counts = np.unique(values, return_counts=True)
+    nulls = 0
+    if values.dtype.kind == 'f' and len(values) and np.isnan(values[-1]):
+        # np.unique 把所有 NaN 合并为排在最后的一项
+        nulls = int(counts[-1])
+        values, counts = values[:-1], counts[:-1]
+    return values, counts, nulls
+
+
+def _add_counts(keys, counts, new_keys, new_counts):
+    """合并两组 (取值, 次数)，返回按取值排序的结果"""
+    merged, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    return merged, np.bincount(inverse, weights=np.concatenate([counts, new_counts])).astype(np.int64)
+
+
+class RunningMoments:
+    """计数、均值、方差、最小/最大值"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.nulls = 0
+
+    def update(self, values, counts, nulls=0):
+        """
+        累积一批数据
+
+        参数:
+            values / counts / nulls: 升序不同取值、各自次数和缺失数，见 distinct_counts()
+        """
+        other = RunningMoments()
+        other.nulls = nulls
+        if len(values):
+            weights = counts.astype(float)
+            as_float = values.astype(float)
+            other.count = int(counts.sum())
+            other.mean = (as_float * weights).sum() / other.count
+            other.m2 = (weights * (as_float - other.mean) ** 2).sum()
+            other.min, other.max = _scalar(values[0]), _scalar(values[-1])
+        self.merge(other)
+
+    def merge(self, other):
+        if not other.count:
+            self.nulls += other.nulls
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            self.nulls += other.nulls
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self.nulls += other.nulls
+
+    @property
+    def std(self):
+        """样本标准差（ddof=1，与 pandas 一致）"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float('nan')
+
+
+class QuantileSketch:
+    """
+    可合并的分位数草图
+
+    精确模式：保存 (取值, 次数)；不同取值超过 max_distinct（None 表示不折叠）后折叠为 DDSketch：
+    正数 x 归入桶 ceil(log_gamma(x))，gamma = (1 + alpha) / (1 - alpha)，桶的代表值与桶内任意值的相对误差 <= alpha；
+    负数按绝对值另存一组桶，0 单独计数。
+    """
+
+    def __init__(self, alpha=0.005, max_distinct=65536):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.max_distinct = max_distinct
+        self.count = 0
+        self.exact = True
+        self.values = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+        # 折叠后: (桶号数组, 次数数组)
+        self.positive = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.negative = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.zeros = 0
+
+    def update(self, values, counts):
+        """累积一批 (不同取值, 次数)，见 distinct_counts()"""
+        if len(values):
+            self._add(values.astype(float), counts)
+
+    def merge(self, other):
+        if other.exact:
+            self._add(other.values, other.counts)
+            return
+        if self.exact:
+            self._collapse()
+        self.count += other.count
+        self.zeros += other.zeros
+        self.positive = _add_counts(*self.positive, *other.positive)
+        self.negative = _add_counts(*self.negative, *other.negative)
+
+    def _add(self, values, counts):
+        self.count += int(counts.sum())
+        if self.exact:
+            self.values, self.counts = _add_counts(self.values, self.counts, values, counts)
+            if self.max_distinct is not None and len(self.values) > self.max_distinct:
+                self._collapse()
+            return
+        self._add_buckets(values, counts)
+
+    def _collapse(self):
+        self.exact = False
+        values, counts = self.values, self.counts
+        self.values, self.counts = np.empty(0), np.empty(0, dtype=np.int64)
+        self._add_buckets(values, counts)
+
+    def _add_buckets(self, values, counts):
+        log_gamma = math.log(self.gamma)
+        for sign, mask in ((1, values > 0), (-1, values < 0)):
+            if mask.any():
+                keys = np.ceil(np.log(np.abs(values[mask])) / log_gamma).astype(np.int64)
+                if sign > 0:
+                    self.positive = _add_counts(*self.positive, keys, counts[mask])
+                else:
+                    self.negative = _add_counts(*self.negative, keys, counts[mask])
+        self.zeros += int(counts[values == 0].sum())
+
+    def weighted_values(self):
+        """
+        升序的 (取值, 次数)；折叠后取值为各桶的代表值
+
+        返回:
+            tuple: (values, counts)
+        """
+        if self.exact:
+            return self.values, self.counts
+        represent = lambda keys: 2 * self.gamma ** keys.astype(float) / (self.gamma + 1)
+        neg_keys, neg_counts = self.negative
+        pos_keys, pos_counts = self.positive
+        values = np.concatenate([-represent(neg_keys)[::-1], [0.0] if self.zeros else [], represent(pos_keys)])
+        counts = np.concatenate([neg_counts[::-1], [self.zeros] if self.zeros else [], pos_counts])
+        return values, counts.astype(np.int64)
+
+    def _at_ranks(self, ranks):
+        values, counts = self.weighted_values()
+        return values[np.searchsorted(np.cumsum(counts), np.asarray(ranks), side='right')]
+
+    def quantile(self, q):
+        """线性插值分位数（与 pandas Series.quantile 相同的定义）"""
+        if not self.count:
+            return float('nan')
+        position = (self.count - 1) * q
+        low = math.floor(position)
+        a, b = self._at_ranks([low, min(low + 1, self.count - 1)])
+        t = position - low
+        # 与 numpy 的线性插值相同的写法
+        return float(b - (b - a) * (1 - t)) if t >= 0.5 else float(a + (b - a) * t)
+
+    def median(self):
+        """中位数（偶数个时取中间两个的平均，与 pandas Series.median 相同）"""
+        if not self.count:
+            return float('nan')
+        half = (self.count - 1) / 2
+        a, b = self._at_ranks([math.floor(half), math.ceil(half)])
+        return float((a + b) / 2)
+
+
+class CategoryCounts:
+    """类别计数，按首次出现顺序保存"""
+
+    def __init__(self):
+        self.counts = {}
+
+    def update(self, series):
+        for value, count in series.value_counts(sort=False).items():
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+
+    def merge(self, other):
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+
+    def value_counts(self):
+        """与 Series.value_counts() 相同的形式：按次数降序"""
+        counts = pd.Series(self.counts, dtype='int64')
+        return counts.sort_values(ascending=False, kind='stable')
+
+    def nunique(self):
+        return sum(1 for count in self.counts.values() if count)
+
+
+class GroupedMean:
+    """分组均值：每组的和与计数"""
+
+    def __init__(self):
+        self.sums = {}
+        self.counts = {}
+
+    def update(self, keys, values):
+        grouped = values.groupby(keys, observed=True).agg(['sum', 'count'])
+        for key, (total, count) in zip(grouped.index, grouped.to_numpy()):
+            self.sums[key] = self.sums.get(key, 0.0) + total
+            self.counts[key] = self.counts.get(key, 0) + int(count)
+
+    def merge(self, other):
+        for key, total in other.sums.items():
+            self.sums[key] = self.sums.get(key, 0.0) + total
+            self.counts[key] = self.counts.get(key, 0) + other.counts[key]
+
+    def mean(self):
+        return pd.Series({key: self.sums[key] / self.counts[key] for key in self.sums if self.counts[key]},
+                         dtype=float)
+
+
+class CovarianceAccumulator:
+    """
+    多列相关系数矩阵，与 DataFrame.corr() 一样按列对使用两列都不缺失的行
+
+    对每一对列 (i, j) 保存行数、两列各自的均值和离差平方和、协离差，块间用 Chan 公式合并
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.count = np.zeros((k, k))
+        # mean[i, j] / m2[i, j]: 列 i 在 (i, j) 都不缺失的行上的均值 / 离差平方和
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.comoment = np.zeros((k, k))
+
+    def update(self, df):
+        values = df[self.columns].to_numpy(dtype=float, na_value=np.nan)
+        valid = ~np.isnan(values)
+        other = CovarianceAccumulator(self.columns)
+        if valid.all():
+            if not len(values):
+                return
+            column_mean = values.mean(axis=0)
+            centered = values - column_mean
+            other.count[:] = len(values)
+            other.mean[:] = column_mean[:, None]
+            other.m2[:] = (centered ** 2).sum(axis=0)[:, None]
+            other.comoment = centered.T @ centered
+        else:
+            k = len(self.columns)
+            for i in range(k):
+                for j in range(i, k):
+                    rows = valid[:, i] & valid[:, j]
+                    if not rows.any():
+                        continue
+                    a, b = values[rows, i], values[rows, j]
+                    da, db = a - a.mean(), b - b.mean()
+                    other.count[i, j] = other.count[j, i] = rows.sum()
+                    other.mean[i, j], other.mean[j, i] = a.mean(), b.mean()
+                    other.m2[i, j], other.m2[j, i] = da @ da, db @ db
+                    other.comoment[i, j] = other.comoment[j, i] = da @ db
+        self.merge(other)
+
+    def merge(self, other):
+        count = self.count + other.count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(count > 0, self.count * other.count / count, 0.0)
+            delta = other.mean - self.mean
+            self.m2 = self.m2 + other.m2 + delta ** 2 * weight
+            self.comoment = self.comoment + other.comoment + delta * delta.T * weight
+            self.mean = np.where(count > 0, self.mean + delta * np.where(count > 0, other.count / count, 0.0),
+                                 0.0)
+        self.count = count
+
+    def corr(self):
+        """Pearson 相关系数矩阵（DataFrame）"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr[self.count < 2] = np.nan
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+class ReservoirSample:
+    """固定大小的均匀随机样本，可合并；size 为 None 时保留全部行"""
+
+    def __init__(self, columns, size=20000, seed=0):
+        self.columns = list(columns)
+        self.size = size
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.empty(0)
+        self.rows = pd.DataFrame(columns=self.columns)
+
+    @property
+    def sampled(self):
+        """是否只保留了部分行"""
+        return len(self.rows) < self.seen
+
+    def update(self, df):
+        self.seen += len(df)
+        self._keep(self.rng.random(len(df)), df[self.columns])
+
+    def merge(self, other):
+        self.seen += other.seen
+        self._keep(other.keys, other.rows)
+
+    def _keep(self, keys, rows):
+        keys = np.concatenate([self.keys, keys])
+        rows = pd.concat([self.rows, rows.reset_index(drop=True)], ignore_index=True) if len(self.rows) else \
+            rows.reset_index(drop=True)
+        if self.size is not None and len(keys) > self.size:
+            keep = np.sort(np.argpartition(keys, self.size)[:self.size])
+            keys, rows = keys[keep], rows.iloc[keep].reset_index(drop=True)
+        self.keys, self.rows = keys, rows
+
+
+class AnalysisSummary:
+    """
+    分析报告和图表用到的全部统计量，逐块 update() 累积，也可以 merge() 其他分块的结果
+
+    update() 的两个参数是同一批行的原始数据和特征数据；内存只与类别数、草图大小和样本大小有关。
+    每个数值列只排序一次（distinct_counts），矩、分位数、箱线图和直方图都由不同取值表计算；
+    每个类别列只计数一次，报告和图表共用同一份结果，不再各自扫描数据。
+    """
+
+    CATEGORY_COLUMNS = ['航司', '类型', '中转地', '起飞时段', '中转次数', '价格区间', '座位状态']
+    DISTRIBUTION_COLUMNS = ['价格', '剩余座位', '提前天数', '飞行时长_分钟', '效率评分']
+    CORRELATION_COLUMNS = ['提前天数', '剩余座位', '价格', '飞行时长_分钟', '中转时长_分钟', '中转次数', '性价比']
+    SAMPLE_COLUMNS = ['提前天数', '价格']
+    DATE_COLUMNS = ['采集日期', '起飞日期']
+
+    def __init__(self, alpha=0.005, max_distinct=65536, sample_size=20000, seed=0):
+        self.alpha = alpha
+        self.max_distinct = max_distinct
+        self.rows = 0
+        self.columns = None
+        self.featured_columns = None
+        self.dtypes = None
+        self.nulls = None
+        self.numeric_columns = []
+        self.dates = {}
+        self.moments = {}
+        self.sketches = {}
+        self.categories = {name: CategoryCounts() for name in self.CATEGORY_COLUMNS}
+        self.airline_price = GroupedMean()
+        self.covariance = None
+        self.sample = ReservoirSample(self.SAMPLE_COLUMNS, size=sample_size, seed=seed)
+
+    @classmethod
+    def from_frames(cls, df, df_featured):
+        """已载入内存的完整数据：分位数不折叠、散点保留全部行，所有统计量都是精确值"""
+        summary = cls(max_distinct=None, sample_size=None)
+        summary.update(df, df_featured)
+        return summary
+
+    def _start(self, df, df_featured):
+        self.columns = list(df.columns)
+        self.featured_columns = list(df_featured.columns)
+        self.dtypes = df.dtypes
+        self.nulls = pd.Series(0, index=self.columns, dtype='int64')
+        self.numeric_columns = df.select_dtypes(include='number').columns.tolist()
+        for name in dict.fromkeys(self.numeric_columns + self.DISTRIBUTION_COLUMNS):
+            if name in df_featured.columns:
+                self.moments[name] = RunningMoments()
+                self.sketches[name] = QuantileSketch(self.alpha, self.max_distinct)
+        self.covariance = CovarianceAccumulator([name for name in self.CORRELATION_COLUMNS
+                                                 if name in df_featured.columns])
+
+    def update(self, df, df_featured):
+        """
+        累积一个分块
+
+        参数:
+            df: 原始数据分块（日期为字符串，决定数据类型、缺失值和日期范围）
+            df_featured: 同一批行的特征数据
+        """
+        if self.columns is None:
+            self._start(df, df_featured)
+        self.rows += len(df)
+        self.nulls = self.nulls.add(df.isnull().sum(), fill_value=0).astype('int64')
+        for name in self.DATE_COLUMNS:
+            if name in df.columns:
+                values = pd.Series(df[name].unique()).dropna()
+                if len(values):
+                    lo, hi = _scalar(values.min()), _scalar(values.max())
+                    old = self.dates.get(name)
+                    self.dates[name] = (min(old[0], lo), max(old[1], hi)) if old else (lo, hi)
+        for name, moments in self.moments.items():
+            values, counts, nulls = distinct_counts(df_featured[name])
+            moments.update(values, counts, nulls)
+            self.sketches[name].update(values, counts)
+        for name, counts in self.categories.items():
+            if name in df_featured.columns:
+                counts.update(df_featured[name])
+        if '航司' in df_featured.columns:
+            self.airline_price.update(df_featured['航司'], df_featured['价格'])
+        self.covariance.update(df_featured)
+        if set(self.SAMPLE_COLUMNS) <= set(df_featured.columns):
+            self.sample.update(df_featured)
+
+    def merge(self, other):
+        """合并另一个（相同列的）汇总"""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns, self.featured_columns = other.columns, other.featured_columns
+            self.dtypes, self.numeric_columns = other.dtypes, other.numeric_columns
+            self.nulls = other.nulls.copy()
+            self.moments = {name: RunningMoments() for name in other.moments}
+            self.sketches = {name: QuantileSketch(self.alpha, self.max_distinct) for name in other.sketches}
+            self.covariance = CovarianceAccumulator(other.covariance.columns)
+        else:
+            self.nulls = self.nulls.add(other.nulls, fill_value=0).astype('int64')
+        self.rows += other.rows
+        for name, (lo, hi) in other.dates.items():
+            old = self.dates.get(name)
+            self.dates[name] = (min(old[0], lo), max(old[1], hi)) if old else (lo, hi)
+        for name in other.moments:
+            self.moments[name].merge(other.moments[name])
+            self.sketches[name].merge(other.sketches[name])
+        for name in self.categories:
+            self.categories[name].merge(other.categories[name])
+        self.airline_price.merge(other.airline_price)
+        self.covariance.merge(other.covariance)
+        self.sample.merge(other.sample)
+        return self
+
+    def describe(self):
+        """与 DataFrame.describe() 相同形式的数值列统计（分位数来自草图）"""
+        stats = {}
+        for name in self.numeric_columns:
+            moments, sketch = self.moments[name], self.sketches[name]
+            stats[name] = [moments.count, moments.mean, moments.std, moments.min,
+                           sketch.quantile(0.25), sketch.median(), sketch.quantile(0.75), moments.max]
+        return pd.DataFrame(stats, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+                            dtype=float)
+
+    def value_counts(self, name):
+        """类别列的 value_counts()（索引名和序列名也与 pandas 相同）"""
+        return self.categories[name].value_counts().rename_axis(name).rename('count')
+
+    def box_stats(self, name, whis=1.5):
+        """
+        matplotlib Axes.bxp 使用的箱线图统计量（与 Axes.boxplot 的默认算法相同）
+
+        返回:
+            dict: med / q1 / q3 / whislo / whishi / fliers（离群值只保留不同取值）
+        """
+        sketch = self.sketches[name]
+        values, _ = sketch.weighted_values()
+        q1, q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+        low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+        inside = values[(values >= low) & (values <= high)]
+        return {
+            'med': sketch.median(), 'q1': q1, 'q3': q3,
+            # 折叠后桶代表值可能略超出数据范围，须限制在真实最小/最大值之内
+            'whislo': max(inside.min(), self.moments[name].min) if len(inside) else q1,
+            'whishi': min(inside.max(), self.moments[name].max) if len(inside) else q3,
+            'fliers': values[(values < low) | (values > high)],
+        }
@@ -0,0 +1,208 @@
+"""
+冷热分层存储
+====================
+
+分区数据集（STORE_DIR）只保留最近的逐条明细（热数据）；整月移出热窗口后，该月明细按
+“每个报价每天一行”聚合为最低 / 中位 / 最高价，写入冷数据集（COLD_STORE_DIR）的一个月分区：
+
+    热: data/store/route=SZX-YIH/fetch_date=2026-03-01/part-*.parquet        （每天一个分区，原始 13 列）
+    冷: data/store_cold/route=SZX-YIH/fetch_date=2025-12-01/part-*.parquet   （每月一个分区，目录名为当月 1 日，
+                                                                                13 列 + 价格_最低/价格_最高/观测次数）
+
+冷数据的 价格 列为当天中位价、剩余座位 为当天最低值，因此两层都能按原始 13 列读取，
+分析和训练通过 TieredStore.read() 透明地拿到“近期明细 + 历史日聚合”。
+冷分区内按报价、采集日期排序，价格不变的连续天数在 Parquet 中以游程编码存储。
+
+- roll(): 只处理整月移出热窗口的分区，每行明细一生只被聚合一次，摊到每次运行的代价与新增数据量相当；
+  热窗口因此在 hot_days 到 hot_days + 30 天之间
+- 先写冷分区（与该月已有的冷数据合并）、再删除热分区；中途失败重跑结果相同，读取时同一天以热数据为准
+
+使用方法:
+    python src/utils/tiered_store.py                     # 按 config 的 HOT_RETENTION_DAYS 滚动全部航线
+    python src/utils/tiered_store.py --hot-days 30 --routes SZX-YIH
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, PROJECT_ROOT)
+
+import pandas as pd
+
+from src.collectors.offer_parser import COLUMNS
+from src.utils.partitioned_store import PartitionedStore, arrow_schema, INT_COLUMNS, FLOAT_COLUMNS
+from src.utils.price_intervals import KEY_COLUMNS
+
+AGGREGATE_COLUMNS = ['价格_最低', '价格_最高', '观测次数']
+COLD_COLUMNS = COLUMNS + AGGREGATE_COLUMNS
+
+
+def cold_schema():
+    """冷数据的 Arrow 模式：原始 13 列 + 聚合列"""
+    return arrow_schema(COLD_COLUMNS, INT_COLUMNS + ('观测次数',), FLOAT_COLUMNS + ('价格_最低', '价格_最高'))
+
+
+def month_start(date):
+    """YYYY-MM-DD -> 当月 1 日"""
+    return date[:8] + '01'
+
+
+def daily_aggregates(df):
+    """
+    把明细聚合为每个报价每个采集日期一行
+
+    参数:
+        df: 原始 13 列明细
+
+    返回:
+        DataFrame: COLD_COLUMNS 各列，价格为中位价，剩余座位为最低值，按报价、采集日期排序
+    """
+    grouped = df.groupby(KEY_COLUMNS + ['采集日期'], sort=True, dropna=False)
+    result = grouped.agg(
+        提前天数=('提前天数', 'first'),
+        剩余座位=('剩余座位', 'min'),
+        价格=('价格', 'median'),
+        价格_最低=('价格', 'min'),
+        价格_最高=('价格', 'max'),
+        观测次数=('价格', 'size'),
+    ).reset_index()
+    return result[COLD_COLUMNS]
+
+
+class TieredStore:
+    """热数据明细 + 冷数据日聚合"""
+
+    def __init__(self, hot_root, cold_root, hot_days=60):
+        """
+        参数:
+            hot_root: 热数据集目录（即采集器写入的 STORE_DIR）
+            cold_root: 冷数据集目录
+            hot_days: 至少保留明细的采集天数（含当天）
+        """
+        self.hot = PartitionedStore(hot_root)
+        self.cold = PartitionedStore(cold_root, schema=cold_schema())
+        self.hot_days = hot_days
+
+    def cutoff(self, today=None):
+        """
+        热数据的起始日期（YYYY-MM-DD）：hot_days 天前所在月份的 1 日，早于它的整月移入冷数据
+        """
+        today = datetime.strptime(today, '%Y-%m-%d') if today else datetime.now()
+        return month_start((today - timedelta(days=self.hot_days - 1)).strftime('%Y-%m-%d'))
+
+    def has_full_history(self, origin, destination):
+        return self.hot.has_full_history(origin, destination)
+
+    def roll(self, routes=None, today=None):
+        """
+        把整月移出热窗口的明细聚合写入冷数据并删除
+
+        参数:
+            routes: [(出发地, 目的地), ...]，None 表示热数据中的全部航线
+            today: 当前采集日期，None 表示今天
+
+        返回:
+            tuple: (处理的热分区数, 聚合前行数, 聚合后行数)
+        """
+        cutoff = self.cutoff(today)
+        months = {}
+        for origin, destination, fetch_date, _ in self.hot.partitions(routes):
+            if fetch_date < cutoff:
+                months.setdefault((origin, destination, month_start(fetch_date)), []).append(fetch_date)
+
+        partitions = rows_in = rows_out = 0
+        for (origin, destination, month), dates in sorted(months.items()):
+            route = [(origin, destination)]
+            detail = self.hot.read(routes=route, since=dates[0], until=dates[-1])
+            aggregates = daily_aggregates(detail)
+            rows_out += len(aggregates)
+            # 该月已有冷数据（补录或上次中途失败）时合并，同一天以本次聚合为准
+            existing = self.cold.read(routes=route, since=month, until=month)
+            if len(existing):
+                existing = existing[~existing['采集日期'].isin(dates)]
+                aggregates = pd.concat([existing, aggregates], ignore_index=True)
+                aggregates = aggregates.sort_values(KEY_COLUMNS + ['采集日期'], kind='stable')
+            self.cold.overwrite(aggregates, origin, destination, month)
+            for fetch_date in dates:
+                self.hot.drop(origin, destination, fetch_date)
+            partitions += len(dates)
+            rows_in += len(detail)
+        return partitions, rows_in, rows_out
+
+    def read(self, columns=None, routes=None, since=None, until=None, aggregates=False):
+        """
+        读取冷热两层（列为原始 13 列，每条航线冷数据在前）
+
+        参数:
+            columns: 需要的原始列，None 表示全部 13 列
+            routes / since / until: 采集日期范围等裁剪条件，见 PartitionedStore.partitions()
+            aggregates: 是否附加 价格_最低/价格_最高/观测次数（热数据分别为 价格、价格、1）
+
+        返回:
+            DataFrame
+        """
+        columns = list(columns) if columns is not None else list(COLUMNS)
+        extra = AGGREGATE_COLUMNS if aggregates else []
+        frames = []
+        for origin, destination in (routes if routes is not None else self._routes()):
+            route = [(origin, destination)]
+            hot_dates = {p[2] for p in self.hot.partitions(route, since, until)}
+            cold = self.cold.read(columns=list(dict.fromkeys(columns + extra + ['采集日期'])), routes=route,
+                                  since=month_start(since) if since else None, until=until)
+            keep = ~cold['采集日期'].isin(hot_dates)
+            if since:
+                keep &= cold['采集日期'] >= since
+            if until:
+                keep &= cold['采集日期'] <= until
+            frames.append(cold.loc[keep, columns + extra])
+
+            hot = self.hot.read(columns=list(dict.fromkeys(columns + (['价格'] if aggregates else []))),
+                                routes=route, since=since, until=until)
+            if aggregates:
+                hot = hot.assign(价格_最低=hot['价格'], 价格_最高=hot['价格'], 观测次数=1)
+            frames.append(hot[columns + extra])
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return pd.DataFrame(columns=columns + extra)
+        return pd.concat(frames, ignore_index=True)
+
+    def _routes(self):
+        return sorted(set(self.hot.routes()) | set(self.cold.routes()))
+
+
+def _dir_stats(store, routes):
+    partitions = store.partitions(routes)
+    files = [path for *_, parts in partitions for path in parts]
+    return len(partitions), sum(os.path.getsize(path) for path in files)
+
+
+def main():
+    from config import COLD_STORE_DIR, HOT_RETENTION_DAYS, STORE_DIR, load_routes
+
+    parser = argparse.ArgumentParser(description='把整月移出热窗口的明细聚合移入冷数据')
+    parser.add_argument('--routes', default=None, help='航线列表，如 SZX-YIH,SZX-PEK（默认全部航线）')
+    parser.add_argument('--hot-days', type=int, default=HOT_RETENTION_DAYS, help='至少保留明细的采集天数')
+    parser.add_argument('--today', default=None, help='当前日期 YYYY-MM-DD（默认今天）')
+    args = parser.parse_args()
+
+    if args.routes:
+        routes = [tuple(part.strip().upper().split('-')) for part in args.routes.split(',') if part.strip()]
+    else:
+        routes = load_routes()
+
+    store = TieredStore(STORE_DIR, COLD_STORE_DIR, args.hot_days)
+    start = time.perf_counter()
+    partitions, rows_in, rows_out = store.roll(routes, args.today)
+    print(f"🧊 移出热窗口 (早于 {store.cutoff(args.today)}) 的分区 {partitions} 个: "
+          f"{rows_in:,} 行明细 -> {rows_out:,} 行日聚合，用时 {time.perf_counter() - start:.1f} 秒")
+    for name, tier in (('热数据', store.hot), ('冷数据', store.cold)):
+        count, size = _dir_stats(tier, routes)
+        print(f"   {name}: {count} 个分区, {size / 1e6:,.1f} MB  ({tier.root})")
+
+
+if __name__ == "__main__":
+    main()